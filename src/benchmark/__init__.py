@@ -0,0 +1,14 @@
+from load_log.startup import lazy_exports
+
+__all__ = [
+    'build_corpus',
+    'run_suite',
+    'compare'
+]
+
+# 基准测试会导入几乎所有模块，只在使用时才加载
+__getattr__ = lazy_exports(__name__, {
+    'build_corpus': 'benchmark.corpus',
+    'run_suite': 'benchmark.suite',
+    'compare': 'benchmark.suite'
+})
@@ -0,0 +1,128 @@
+import json
+import os
+import random
+from typing import *
+
+from gui.grid import Grid
+from gui.map_binary import write_binary_map
+
+# 语料生成完成后写入的标记文件；生成中途被打断的目录没有标记，下次会重新生成
+MARKER_NAME: Final[str] = 'corpus.json'
+CORPUS_VERSION: Final[int] = 1
+
+# 随机地图内部的图块分布：以空地为主，夹杂墙、传送带与陷阱
+MAP_TILES: Final[str] = '......#><^v@'
+
+
+def synthetic_rows(size: int, seed: int = 0) -> List[str]:
+    """
+    生成一张带外墙的随机地图，起点在左上角，终点在右下角。
+
+    参数:
+        size (int): 地图边长，至少为 3。
+        seed (int): 随机种子。
+
+    返回:
+        List[str]: 每行一个字符串，可以直接交给 Grid.from_rows。
+    """
+    rng: random.Random = random.Random(seed)
+    wall: str = '#' * size
+    rows: List[str] = [wall]
+    for _ in range(size - 2):
+        rows.append('#' + ''.join(rng.choices(MAP_TILES, k=size - 2)) + '#')
+    rows.append(wall)
+    rows[1] = '#S' + rows[1][2:]
+    rows[size - 2] = rows[size - 2][:size - 2] + 'E#'
+    return rows
+
+
+def write_json_map(rows: List[str], path: str) -> None:
+    """
+    逐行写出 JSON 地图，不在内存中构建整张地图的 JSON 文本。
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for y, row in enumerate(rows):
+            f.write(json.dumps(list(row)))
+            f.write(',\n' if y < len(rows) - 1 else '\n')
+        f.write(']')
+
+
+def write_mod_tree(root: str, count: int, seed: int = 0) -> None:
+    """
+    生成含有 count 个模组包的模组目录，每个包都有 pack.json、level.json、file.json 与一张地图。
+    """
+    rng: random.Random = random.Random(seed)
+    colors: List[str] = ['red', 'green', 'yellow', 'blue', 'purple', 'aqua']
+    width: int = len(str(count))
+    for i in range(count):
+        name: str = f'pack{i:0{width}d}'
+        pack_path: str = os.path.join(root, name)
+        os.makedirs(os.path.join(pack_path, 'map'), exist_ok=True)
+        with open(os.path.join(pack_path, 'pack.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'title': {'text': f'模组 {i}', 'color': rng.choice(colors)},
+                'describe': f'自动生成的模组包 {i}',
+                'file': name
+            }, f, ensure_ascii=False)
+        with open(os.path.join(pack_path, 'level.json'), 'w', encoding='utf-8') as f:
+            json.dump([{'text': '第一关', 'color': 'green'}], f, ensure_ascii=False)
+        with open(os.path.join(pack_path, 'file.json'), 'w', encoding='utf-8') as f:
+            json.dump(['level.json'], f)
+        write_json_map(synthetic_rows(7, seed + i), os.path.join(pack_path, 'map', 'level.json'))
+
+
+def build_corpus(root: str, map_sizes: Iterable[int], pack_counts: Iterable[int], seed: int = 0) -> dict:
+    """
+    在 root 下生成基准测试语料；已经生成过的部分直接复用。
+
+    目录结构：
+        maps/<边长>.json、maps/<边长>.lmap: 同一张随机地图的两种格式。
+        mods/<包数>/: 含有对应数量模组包的模组目录。
+
+    参数:
+        root (str): 语料目录。
+        map_sizes (Iterable[int]): 地图边长。
+        pack_counts (Iterable[int]): 模组包数量。
+        seed (int): 随机种子，相同的种子生成相同的语料。
+
+    返回:
+        dict: {'maps': {边长: {'json': 路径, 'lmap': 路径}}, 'mods': {包数: 目录}}
+    """
+    corpus: dict = {'maps': {}, 'mods': {}}
+    map_root: str = os.path.join(root, 'maps')
+    os.makedirs(map_root, exist_ok=True)
+    for size in map_sizes:
+        json_path: str = os.path.join(map_root, f'{size}.json')
+        lmap_path: str = os.path.join(map_root, f'{size}.lmap')
+        marker: str = os.path.join(map_root, f'{size}.{MARKER_NAME}')
+        if not is_complete(marker, seed):
+            rows: List[str] = synthetic_rows(size, seed)
+            write_json_map(rows, json_path)
+            write_binary_map(Grid.from_rows(rows), lmap_path)
+            del rows
+            mark_complete(marker, seed)
+        corpus['maps'][size] = {'json': json_path, 'lmap': lmap_path}
+
+    for count in pack_counts:
+        mod_root: str = os.path.join(root, 'mods', str(count))
+        marker = os.path.join(mod_root, MARKER_NAME)
+        if not is_complete(marker, seed):
+            os.makedirs(mod_root, exist_ok=True)
+            write_mod_tree(mod_root, count, seed)
+            mark_complete(marker, seed)
+        corpus['mods'][count] = mod_root
+    return corpus
+
+
+def is_complete(marker: str, seed: int) -> bool:
+    try:
+        with open(marker, 'r', encoding='utf-8') as f:
+            return json.load(f) == {'version': CORPUS_VERSION, 'seed': seed}
+    except (OSError, ValueError):
+        return False
+
+
+def mark_complete(marker: str, seed: int) -> None:
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump({'version': CORPUS_VERSION, 'seed': seed}, f)
@@ -0,0 +1,371 @@
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from typing import *
+
+import gui.key_input
+from benchmark.corpus import build_corpus
+from gui.key_input import KeyInput
+from gui.map import MAP_CACHE, map_loop, read_map
+from gui.menu import menu_loop
+from gui.palette import ALL_COLORS
+from gui.render import FrameRenderer
+from load_config.load_config_color import parse_color
+from load_mod.mod import mod_menu, mod_pack_path
+from load_mod.mod_index import ModIndex
+
+RESULT_VERSION: Final[int] = 1
+
+# 默认语料规模
+MAP_SIZES: Final[Tuple[int, ...]] = (7, 100, 1000, 4000)
+PACK_COUNTS: Final[Tuple[int, ...]] = (10, 1000, 50000)
+
+# 每个用例最多运行的次数，以及达到最少次数后不再继续运行的累计耗时（秒）
+REPEAT: Final[int] = 5
+MIN_REPEAT: Final[int] = 1
+TIME_BUDGET: Final[float] = 3.0
+
+# 默认的回归阈值：中位耗时或峰值内存增加超过 10% 视为回归
+THRESHOLD: Final[float] = 0.1
+
+# 无头运行时假定的终端大小
+TERMINAL_COLUMNS: Final[int] = 120
+TERMINAL_LINES: Final[int] = 40
+
+# 每次地图循环用例输入的移动次数
+MAP_MOVES: Final[int] = 200
+
+COLOR_CONFIG_PATH: Final[str] = '../config/color.json'
+DEFAULT_CORPUS_PATH: Final[str] = os.path.join(tempfile.gettempdir(), 'labyrinth-benchmark')
+
+
+class NullStream(io.TextIOBase):
+    """
+    代替标准输出的空输出流，只统计写入的字符数。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.written: int = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.written += len(text)
+        return len(text)
+
+
+class ScriptedInput(KeyInput):
+    """
+    按预先给定的顺序产生按键的输入，代替终端。
+
+    每次等待输入时只产生一个按键，不等待时（timeout 为 0）不产生按键，
+    因此地图循环的每个按键都会单独渲染一帧。按键用完后再等待输入会抛出 RuntimeError，
+    避免脚本写错时用例永远不结束。
+    """
+
+    def __init__(self, script: Iterable[str]):
+        super().__init__()
+        self.script: Iterator[str] = iter(script)
+
+    def poll(self, timeout: Optional[float]) -> None:
+        if timeout == 0:
+            return
+        key: Optional[str] = next(self.script, None)
+        if key is None:
+            raise RuntimeError('Key script exhausted')
+        self.queue.append(key)
+
+
+@contextmanager
+def headless() -> Iterator[NullStream]:
+    """
+    把标准输出换成 NullStream，并固定终端大小，结束时恢复。
+    按键输入由每个用例在准备阶段用 use_script 安装。
+    """
+    stream: NullStream = NullStream()
+    saved_input: Optional[KeyInput] = gui.key_input.KEY_INPUT
+    saved_env: Dict[str, Optional[str]] = {name: os.environ.get(name) for name in ('COLUMNS', 'LINES')}
+    os.environ['COLUMNS'] = str(TERMINAL_COLUMNS)
+    os.environ['LINES'] = str(TERMINAL_LINES)
+    try:
+        with redirect_stdout(stream):
+            yield stream
+    finally:
+        gui.key_input.KEY_INPUT = saved_input
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def use_script(script: Iterable[str]) -> None:
+    """
+    让 get_input 返回按脚本产生按键的输入。
+    """
+    gui.key_input.KEY_INPUT = ScriptedInput(script)
+
+
+class Case(NamedTuple):
+    """
+    一个基准测试用例：每次运行前调用 setup（不计时），再把它的返回值交给 run 计时。
+    """
+    name: str
+    run: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+
+
+def map_cases(size: int, paths: dict, color_dict: dict) -> List[Case]:
+    """
+    返回：
+        List[Case]: 一张地图上的 read_map、整张地图的一帧渲染与 map_loop 用例。
+    """
+    rng: random.Random = random.Random(size)
+    moves: List[str] = rng.choices('wasd', k=MAP_MOVES) + ['esc']
+    # 帧率不设上限，每个按键都立即渲染
+    render_config: dict = {'fps': 1e9}
+
+    def cold(path: str) -> Callable[[], str]:
+        def setup() -> str:
+            MAP_CACHE.clear()
+            return path
+        return setup
+
+    def warm() -> str:
+        # 计时的读取命中缓存，缓存为空时先在准备阶段读取一次
+        read_map(paths['json'])
+        return paths['json']
+
+    def loop_setup() -> dict:
+        use_script(moves)
+        return read_map(paths['json'])
+
+    def frame_setup() -> Tuple[FrameRenderer, dict]:
+        # 关闭镜头，一帧绘制整张地图
+        return FrameRenderer(color_dict, ALL_COLORS, {'camera': False}), read_map(paths['json'])
+
+    def frame(state: Tuple[FrameRenderer, dict]) -> None:
+        renderer, map_data = state
+        renderer.render(map_data['map'], map_data['player_y'], map_data['player_x'])
+
+    return [
+        Case(f'read_map.json/{size}', read_map, cold(paths['json'])),
+        Case(f'read_map.lmap/{size}', read_map, cold(paths['lmap'])),
+        Case(f'read_map.cached/{size}', read_map, warm),
+        Case(f'render.full/{size}', frame, frame_setup),
+        Case(f'map_loop/{size}', lambda map_data: map_loop(map_data, color_dict, ALL_COLORS, render_config),
+             loop_setup)
+    ]
+
+
+def mod_cases(count: int, mod_root: str, cache_root: str) -> List[Case]:
+    """
+    返回：
+        List[Case]: 一个模组目录上的菜单、模组发现与模组菜单用例。
+    """
+    entries: List[str] = [f'菜单项 {i}' for i in range(count)]
+    mod_index: ModIndex = ModIndex(os.path.join(cache_root, str(count)))
+    # 先完整扫描一次，计时的扫描只做增量检查
+    mod_pack_path(mod_root, mod_index)
+    pack_list: List[str] = mod_pack_path(mod_root)
+
+    def scripted(script: List[str]) -> Callable[[], None]:
+        return lambda: use_script(script)
+
+    return [
+        Case(f'menu_loop/{count}', lambda _: menu_loop(entries), scripted(['s'] * 100 + ['enter'])),
+        Case(f'menu_loop.search/{count}', lambda _: menu_loop(entries),
+             scripted(['/', '1', 'enter', 'enter'])),
+        Case(f'mod_pack_path.walk/{count}', lambda _: mod_pack_path(mod_root)),
+        Case(f'mod_pack_path.index/{count}', lambda _: mod_pack_path(mod_root, mod_index)),
+        Case(f'mod_menu/{count}', lambda _: menu_loop(mod_menu(pack_list, ALL_COLORS)[1]),
+             scripted(['s'] * 30 + ['enter']))
+    ]
+
+
+def measure(case: Case, repeat: int = REPEAT, budget: float = TIME_BUDGET) -> dict:
+    """
+    多次运行一个用例，统计耗时，并在 tracemalloc 下额外运行一次记录峰值内存。
+
+    参数:
+        case (Case): 用例。
+        repeat (int): 最多运行的次数。
+        budget (float): 累计耗时超过该值（秒）后不再继续运行。
+
+    返回:
+        dict: {'runs': 次数, 'median': 中位耗时, 'min': 最短耗时（秒）, 'peak_kib': 峰值内存（KiB）}
+    """
+    times: List[float] = []
+    while len(times) < repeat and (len(times) < MIN_REPEAT or sum(times) < budget):
+        state: Any = case.setup()
+        start: float = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+
+    state = case.setup()
+    tracemalloc.start()
+    try:
+        case.run(state)
+        peak: int = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        'runs': len(times),
+        'median': times[len(times) // 2],
+        'min': times[0],
+        'peak_kib': peak / 1024
+    }
+
+
+def run_suite(corpus_path: str = DEFAULT_CORPUS_PATH, map_sizes: Iterable[int] = MAP_SIZES,
+              pack_counts: Iterable[int] = PACK_COUNTS, repeat: int = REPEAT,
+              only: str = None, report: Callable[[str, dict], None] = None) -> dict:
+    """
+    生成（或复用）语料并运行所有用例。
+
+    参数:
+        corpus_path (str): 语料目录。
+        map_sizes (Iterable[int]): 地图边长。
+        pack_counts (Iterable[int]): 模组包数量。
+        repeat (int): 每个用例最多运行的次数。
+        only (str): 只运行名称中包含该字符串的用例。
+        report (Callable[[str, dict], None]): 每个用例完成后的回调。
+
+    返回:
+        dict: 可以直接保存为 JSON 的结果，compare 用它与另一次结果比较。
+    """
+    corpus: dict = build_corpus(corpus_path, map_sizes, pack_counts)
+    color_dict: dict = parse_color(COLOR_CONFIG_PATH)
+
+    cases: List[Case] = []
+    for size, paths in corpus['maps'].items():
+        cases.extend(map_cases(size, paths, color_dict))
+    for count, mod_root in corpus['mods'].items():
+        cases.extend(mod_cases(count, mod_root, os.path.join(corpus_path, 'cache')))
+
+    results: Dict[str, dict] = {}
+    with headless():
+        for case in cases:
+            if only and only not in case.name:
+                continue
+            results[case.name] = measure(case, repeat)
+            if report is not None:
+                report(case.name, results[case.name])
+    MAP_CACHE.clear()
+
+    return {
+        'version': RESULT_VERSION,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> List[str]:
+    """
+    比较两次运行的结果，找出中位耗时或峰值内存增加超过阈值的用例。只比较两次都运行过的用例。
+
+    参数:
+        baseline (dict): 作为基准的结果。
+        current (dict): 新的结果。
+        threshold (float): 允许增加的比例。
+
+    返回:
+        List[str]: 每个回归一行说明，没有回归时为空列表。
+    """
+    regressions: List[str] = []
+    for name, new in current['results'].items():
+        old: Optional[dict] = baseline['results'].get(name)
+        if old is None:
+            continue
+        for key, unit, scale in (('median', 'ms', 1000), ('peak_kib', 'KiB', 1)):
+            if old[key] > 0 and new[key] > old[key] * (1 + threshold):
+                regressions.append(f'{name} {key}: {old[key] * scale:.3f} {unit} -> {new[key] * scale:.3f} {unit} '
+                                   f'(+{(new[key] / old[key] - 1) * 100:.1f}%)')
+    return regressions
+
+
+def format_result(name: str, result: dict) -> str:
+    return (f'{name:<32} {result["median"] * 1000:>12.3f} ms  min {result["min"] * 1000:>12.3f} ms  '
+            f'peak {result["peak_kib"]:>12.1f} KiB  ({result["runs"]} 次)')
+
+
+def parse_sizes(text: str) -> List[int]:
+    return [int(size) for size in text.split(',') if size]
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：
+        python -m benchmark.suite run [--output 结果.json] [--corpus 目录] [--maps 7,100] [--packs 10,1000]
+                                      [--repeat N] [--only 名称]
+        python -m benchmark.suite compare 基准.json 结果.json [--threshold 0.1]
+
+    compare 在有回归时返回 1。
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    options: Dict[str, Optional[str]] = {
+        '--output': None, '--corpus': None, '--maps': None, '--packs': None,
+        '--repeat': None, '--only': None, '--threshold': None
+    }
+    # 选项后面必须跟着取值，位于末尾或后面紧跟另一个选项时提示用法
+    missing: bool = False
+    for option in options:
+        if option in args:
+            position: int = args.index(option)
+            if position + 1 == len(args) or args[position + 1] in options:
+                missing = True
+                break
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+
+    if not missing and args == ['run']:
+        result: dict = run_suite(
+            options['--corpus'] or DEFAULT_CORPUS_PATH,
+            parse_sizes(options['--maps']) if options['--maps'] else MAP_SIZES,
+            parse_sizes(options['--packs']) if options['--packs'] else PACK_COUNTS,
+            int(options['--repeat']) if options['--repeat'] else REPEAT,
+            options['--only'],
+            lambda name, case_result: print(format_result(name, case_result), file=sys.stderr)
+        )
+        text: str = json.dumps(result, ensure_ascii=False, indent=2)
+        if options['--output']:
+            with open(options['--output'], 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            print(text)
+        return 0
+
+    if not missing and len(args) == 3 and args[0] == 'compare':
+        with open(args[1], 'r', encoding='utf-8') as f:
+            baseline: dict = json.load(f)
+        with open(args[2], 'r', encoding='utf-8') as f:
+            current: dict = json.load(f)
+        threshold: float = float(options['--threshold']) if options['--threshold'] else THRESHOLD
+        regressions: List[str] = compare(baseline, current, threshold)
+        for line in regressions:
+            print(line)
+        if not regressions:
+            print(f'没有超过 {threshold * 100:.0f}% 的回归')
+        return 1 if regressions else 0
+
+    print('用法: python -m benchmark.suite run [--output 结果.json] [--corpus 目录] [--maps 7,100] '
+          '[--packs 10,1000] [--repeat N] [--only 名称]\n'
+          '      python -m benchmark.suite compare 基准.json 结果.json [--threshold 0.1]')
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,8 @@
-import keyboard
+from gui.key_input import get_input
 
 
 def clear_button() -> None:
-    max_attempts = 100  # 限制最大尝试次数
-    for _ in range(max_attempts):
-        if not keyboard.is_pressed(keyboard.read_key()):
-            break
+    """
+    丢弃按键提示之后残留的按键，避免它们被下一个界面读到。
+    """
+    get_input().flush()
@@ -0,0 +1,20 @@
+from engine.engine import *
+from engine.realtime import RealtimeEngine, TICK_RATE
+from engine.solver import solve
+
+__all__ = [
+    'Engine',
+    'GameState',
+    'MOVE',
+    'BLOCKED',
+    'RESET',
+    'WIN',
+    'RELOAD',
+    'BACK',
+    'IGNORED',
+    'TransitionTable',
+    'transition_table',
+    'RealtimeEngine',
+    'TICK_RATE',
+    'solve'
+]
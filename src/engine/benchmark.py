@@ -0,0 +1,73 @@
+import random
+import sys
+import time
+from typing import *
+
+from engine.engine import Engine
+from gui.grid import Grid
+
+# 随机动作序列：以移动为主，偶尔夹杂无关按键
+ACTIONS: Final[str] = 'wasdwasdwasdx'
+
+
+def synthetic_map(size: int, seed: int = 0) -> dict:
+    """
+    生成一张带外墙的随机地图，包含墙、陷阱、传送带和一个终点。
+
+    参数:
+        size (int): 地图边长。
+        seed (int): 随机种子。
+
+    返回:
+        dict: 与 read_map 相同结构的地图数据（不含图块索引）。
+    """
+    rng: random.Random = random.Random(seed)
+    rows: List[List[str]] = [
+        ['#' if y in (0, size - 1) or x in (0, size - 1) else rng.choice('......#><^v@') for x in range(size)]
+        for y in range(size)
+    ]
+    rows[1][1] = 'S'
+    rows[size - 2][size - 2] = 'E'
+    return {'map': Grid.from_rows(rows), 'player_y': 1, 'player_x': 1}
+
+
+def benchmark(map_data: dict, steps: int = 1_000_000, seed: int = 0) -> float:
+    """
+    测量引擎的吞吐量。到达终点或收到退出事件时重置到起点继续。
+
+    参数:
+        map_data (dict): 地图数据。
+        steps (int): 执行的步数。
+        seed (int): 动作序列的随机种子。
+
+    返回:
+        float: 每秒执行的步数。
+    """
+    rng: random.Random = random.Random(seed)
+    actions: List[str] = [rng.choice(ACTIONS) for _ in range(min(steps, 65536))]
+    engine: Engine = Engine(map_data)
+    step = engine.step
+    count: int = len(actions)
+
+    begin: float = time.perf_counter()
+    for i in range(steps):
+        if step(actions[i % count])[1] == 'win':
+            engine.reset()
+    elapsed: float = time.perf_counter() - begin
+    return steps / elapsed
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：python -m engine.benchmark [地图边长] [步数]
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    size: int = int(args[0]) if args else 200
+    steps: int = int(args[1]) if len(args) > 1 else 1_000_000
+    rate: float = benchmark(synthetic_map(size), steps)
+    print(f'{size}x{size}: {steps} steps, {rate:,.0f} steps/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
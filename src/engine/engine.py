@@ -0,0 +1,287 @@
+from typing import *
+
+# 按键到移动方向 (行增量, 列增量) 的映射
+DIRECTIONS: Final[Dict[str, Tuple[int, int]]] = {
+    'w': (-1, 0),
+    's': (1, 0),
+    'a': (0, -1),
+    'd': (0, 1)
+}
+
+# 传送带图块到位移的映射：踩上传送带后沿箭头方向再前进两格
+CONVEYORS: Final[Dict[str, Tuple[int, int]]] = {
+    '>': (0, 2),
+    '<': (0, -2),
+    '^': (-2, 0),
+    'v': (2, 0)
+}
+
+# '!' 为定时陷阱：回合模式下始终有效，实时模式下周期性地开启与关闭
+TIMED_HAZARD: Final[str] = '!'
+HAZARDS: Final[str] = '@X!'
+WALL: Final[str] = '#'
+EXIT: Final[str] = 'E'
+
+# step 返回的事件
+MOVE: Final[str] = 'move'          # 玩家移动到了新位置（包括被传送带推动）
+BLOCKED: Final[str] = 'blocked'    # 撞墙或越界，位置不变
+RESET: Final[str] = 'reset'        # 踩到陷阱，回到起点
+WIN: Final[str] = 'win'            # 到达终点
+RELOAD: Final[str] = 'reload'      # 玩家要求重新开始关卡
+BACK: Final[str] = 'back'          # 玩家要求退出关卡
+IGNORED: Final[str] = 'ignored'    # 与游戏无关的按键
+
+# 单元格被踏入时的结果类别，见 TransitionTable
+BLOCK: Final[int] = 0      # 墙、地图外，以及会把玩家推出地图的传送带
+FLOOR: Final[int] = 1
+HAZARD: Final[int] = 2     # '@' 与 'X'
+TIMED: Final[int] = 3      # 定时陷阱 '!'，是否有效由引擎决定
+GOAL: Final[int] = 4       # 终点 'E'
+CONVEYOR: Final[int] = 5   # 5 到 8 为四种传送带，对应 CONVEYORS 中的顺序
+# 踏入定时陷阱时 TransitionTable.step 返回的事件，回合模式下等同于 RESET
+TIMED_RESET: Final[str] = 'timed_reset'
+
+
+class GameState(NamedTuple):
+    """
+    游戏状态：玩家的当前位置。不可变，可以安全地保存用于回放或搜索。
+    """
+    player_y: int
+    player_x: int
+
+
+class TransitionTable:
+    """
+    关卡加载时编译的移动转移表：每一步移动只需要几次数组下标运算，不再逐个比较图块。
+
+    地图被翻译成带一圈 BLOCK 边框的一维类别数组 kinds，坐标 (y, x) 对应下标
+    (y + 1) * stride + (x + 1)。从单元格 cell 向方向 d 移动的结果只取决于被踏入单元格的类别，
+    因此 (cell, d) 的转移是 outcomes[d][kinds[cell + moves[d]]] = (位移, 事件)，
+    移动后的下标为 cell + 位移。会把玩家推出地图的传送带在编译时就被标记为 BLOCK，
+    移动时不再需要边界检查。整张表每个单元格只占一个字节。
+
+    移动规则与 Engine 相同，求解器与机器人可以直接在下标空间中使用这张表。
+    地图在游玩中不会改变，修改网格后需要重新编译。
+    """
+
+    __slots__ = ('height', 'width', 'stride', 'kinds', 'moves', 'outcomes')
+
+    def __init__(self, map_):
+        """
+        参数:
+            map_: Grid 或 ChunkedGrid。
+        """
+        self.height: int = map_.height
+        self.width: int = map_.width
+        self.stride: int = self.width + 2
+
+        table: bytearray = bytearray([FLOOR]) * 256
+        table[map_.encode(WALL)] = BLOCK
+        for tile in HAZARDS:
+            table[map_.encode(tile)] = HAZARD
+        table[map_.encode(TIMED_HAZARD)] = TIMED
+        table[map_.encode(EXIT)] = GOAL
+        for i, tile in enumerate(CONVEYORS):
+            table[map_.encode(tile)] = CONVEYOR + i
+
+        edge: bytes = bytes([BLOCK])
+        border: bytes = edge * self.stride
+        rows: List[bytes] = [border]
+        for y in range(self.height):
+            rows.append(edge + map_.row_codes(y).translate(table) + edge)
+        rows.append(border)
+        self.kinds: bytearray = bytearray(b''.join(rows))
+
+        # 传送带最多推两格，只有距离边缘两格以内、指向边缘的传送带会把玩家推出地图
+        for i, (dy, dx) in enumerate(CONVEYORS.values()):
+            kind: bytes = bytes([CONVEYOR + i])
+            for distance in range(max(abs(dy), abs(dx))):
+                if dy:
+                    y: int = distance if dy < 0 else self.height - 1 - distance
+                    if 0 <= y < self.height:
+                        line: slice = slice((y + 1) * self.stride + 1, (y + 1) * self.stride + 1 + self.width)
+                        self.kinds[line] = self.kinds[line].replace(kind, edge)
+                else:
+                    x: int = distance if dx < 0 else self.width - 1 - distance
+                    if 0 <= x < self.width:
+                        column: slice = slice(self.stride + x + 1, (self.height + 1) * self.stride, self.stride)
+                        self.kinds[column] = self.kinds[column].replace(kind, edge)
+
+        self.moves: Tuple[int, ...] = tuple(dy * self.stride + dx for dy, dx in DIRECTIONS.values())
+        pushes: Tuple[int, ...] = tuple(dy * self.stride + dx for dy, dx in CONVEYORS.values())
+        self.outcomes: Tuple[Tuple[Tuple[int, str], ...], ...] = tuple(
+            ((0, BLOCKED), (move, MOVE), (move, RESET), (move, TIMED_RESET), (move, WIN),
+             *((move + push, MOVE) for push in pushes))
+            for move in self.moves
+        )
+
+    def index(self, y: int, x: int) -> int:
+        """
+        返回：
+            int: 坐标 (y, x) 在类别数组中的下标。
+        """
+        return (y + 1) * self.stride + x + 1
+
+    def position(self, cell: int) -> Tuple[int, int]:
+        """
+        返回：
+            Tuple[int, int]: 下标 cell 对应的坐标 (行, 列)。
+        """
+        y, x = divmod(cell, self.stride)
+        return y - 1, x - 1
+
+    def step(self, cell: int, direction: int) -> Tuple[int, str]:
+        """
+        O(1) 查询一步移动的结果。
+
+        参数:
+            cell (int): 当前位置的下标。
+            direction (int): 移动方向，DIRECTIONS 中的顺序（w、s、a、d）。
+
+        返回:
+            Tuple[int, str]: 移动后的下标与事件。BLOCKED 时下标不变；RESET 与 TIMED_RESET 时
+            下标为陷阱所在的单元格，由调用方把玩家送回起点。
+        """
+        offset, event = self.outcomes[direction][self.kinds[cell + self.moves[direction]]]
+        return cell + offset, event
+
+    @property
+    def nbytes(self) -> int:
+        """
+        返回：
+            int: 类别数组占用的字节数。
+        """
+        return len(self.kinds)
+
+
+def transition_table(map_data: dict) -> Optional[TransitionTable]:
+    """
+    返回地图数据的转移表：parse_map 已编译并放在 map_data['transitions'] 中时直接共享，否则现场编译。
+
+    参数:
+        map_data (dict): read_map 返回的地图数据。
+
+    返回:
+        Optional[TransitionTable]: 转移表。开放世界的网格没有 row_codes，不能整体编译，返回 None。
+    """
+    table: Optional[TransitionTable] = map_data.get('transitions')
+    if table is None and hasattr(map_data['map'], 'row_codes'):
+        table = TransitionTable(map_data['map'])
+    return table
+
+
+# 按键到 TransitionTable 中移动方向编号的映射
+DIRECTION_INDEX: Final[Dict[str, int]] = {key: i for i, key in enumerate(DIRECTIONS)}
+
+
+class Engine:
+    """
+    不含任何输入输出的游戏引擎。
+
+    移动规则与 map_loop 一致：墙 '#' 阻挡移动，陷阱 '@'/'X'/'!' 把玩家送回起点，
+    传送带 '>' '<' '^' 'v' 把玩家沿箭头方向再推两格，到达 'E' 时胜利。
+    移动或被传送带推动到地图之外时视为被阻挡。
+
+    每一步移动都是 TransitionTable 中的一次查表，转移表由 parse_map 随原始地图一起编译并被所有副本共享。
+    无法整体编译的地图（开放世界的 WorldGrid）逐步按图块判断。
+    """
+
+    def __init__(self, map_data: dict):
+        """
+        参数:
+            map_data (dict): read_map 返回的地图数据。
+        """
+        self.map_ = map_data['map']
+        self.height: int = self.map_.height
+        self.width: int = self.map_.width
+        self.start: GameState = GameState(map_data['player_y'], map_data['player_x'])
+        self.state: GameState = self.start
+        self.table: Optional[TransitionTable] = transition_table(map_data)
+
+    def reset(self) -> GameState:
+        """
+        把玩家放回起点。
+
+        返回:
+            GameState: 重置后的状态。
+        """
+        self.state = self.start
+        return self.state
+
+    def hazard_active(self, y: int, x: int) -> bool:
+        """
+        返回：
+            bool: (y, x) 处的陷阱当前是否有效。回合模式下陷阱始终有效，实时引擎会覆盖此方法。
+        """
+        return True
+
+    def step(self, action: str) -> Tuple[GameState, str]:
+        """
+        执行一个动作并推进游戏状态。
+
+        参数:
+            action (str): 按键名称，'w' 'a' 's' 'd' 为移动，'r' 为重新开始，'esc' 为退出。
+
+        返回:
+            Tuple[GameState, str]: 动作执行后的状态和事件（见模块中的事件常量）。
+        """
+        direction: Optional[int] = DIRECTION_INDEX.get(action)
+        if direction is None:
+            if action == 'r':
+                return self.state, RELOAD
+            if action == 'esc':
+                return self.state, BACK
+            return self.state, IGNORED
+        if self.table is None:
+            return self.step_tiles(DIRECTIONS[action])
+
+        # 与 TransitionTable.step 相同的查表，内联以省去方法调用
+        table: TransitionTable = self.table
+        stride: int = table.stride
+        cell: int = (self.state.player_y + 1) * stride + self.state.player_x + 1
+        offset, event = table.outcomes[direction][table.kinds[cell + table.moves[direction]]]
+        if event == BLOCKED:
+            return self.state, BLOCKED
+        new_y, new_x = divmod(cell + offset, stride)
+        if event == TIMED_RESET:
+            event = RESET if self.hazard_active(new_y - 1, new_x - 1) else MOVE
+        if event == RESET:
+            self.state = self.start
+            return self.state, RESET
+        self.state = GameState(new_y - 1, new_x - 1)
+        return self.state, event
+
+    def step_tiles(self, delta: Tuple[int, int]) -> Tuple[GameState, str]:
+        """
+        不经过转移表、逐个判断图块执行一步移动，用于无法编译的地图。
+
+        参数:
+            delta (Tuple[int, int]): 移动方向 (行增量, 列增量)。
+
+        返回:
+            Tuple[GameState, str]: 移动后的状态和事件。
+        """
+        new_y: int = self.state.player_y + delta[0]
+        new_x: int = self.state.player_x + delta[1]
+        if not (0 <= new_y < self.height and 0 <= new_x < self.width):
+            return self.state, BLOCKED
+
+        tile: str = self.map_.get(new_y, new_x)
+        if tile == WALL:
+            return self.state, BLOCKED
+        if tile in HAZARDS and self.hazard_active(new_y, new_x):
+            self.state = self.start
+            return self.state, RESET
+        if tile == EXIT:
+            self.state = GameState(new_y, new_x)
+            return self.state, WIN
+
+        push: Optional[Tuple[int, int]] = CONVEYORS.get(tile)
+        if push is not None:
+            new_y += push[0]
+            new_x += push[1]
+            if not (0 <= new_y < self.height and 0 <= new_x < self.width):
+                return self.state, BLOCKED
+
+        self.state = GameState(new_y, new_x)
+        return self.state, MOVE
@@ -0,0 +1,547 @@
+import json
+import logging
+import os
+import random
+import sys
+import time
+from array import array
+from typing import *
+
+from gui.grid import Grid
+
+WALL: Final[int] = ord('#')
+FLOOR: Final[int] = ord('.')
+# 生成过程中起点到终点的保留路线，装饰时跳过，最后还原为空地
+PATH: Final[int] = 0x01
+CONVEYOR_PUSH: Final[Dict[str, Tuple[int, int]]] = {'>': (0, 2), '<': (0, -2), '^': (-2, 0), 'v': (2, 0)}
+
+# 生成配置的默认值，见 config/generator_config.json
+#   density: 各种图块占空地的比例，conveyor 为四种传送带的总比例
+#   cave_fill: 洞穴初始随机填充的墙的比例；cave_steps: 元胞自动机的迭代次数
+#   world_exit_chance: 开放世界中每个区块含有终点的概率
+DEFAULT_GENERATOR_CONFIG: Final[dict] = {
+    'algorithm': 'backtracker',
+    'density': {'@': 0.01, 'X': 0.0, '!': 0.005, '~': 0.02, 'conveyor': 0.01},
+    'cave_fill': 0.45,
+    'cave_steps': 4,
+    'world_exit_chance': 0.02
+}
+GENERATOR_CONFIG_PATH: Final[str] = '../config/generator_config.json'
+# 逐个房间打通的算法（backtracker、kruskal、wilson）在 Python 中每个房间要执行几十条语句，
+# 房间数超过该值（约 501x501 的地图，生成约 0.5 秒）时改用整行生成的 binary_tree
+SLOW_ALGORITHM_MAX_ROOMS: Final[int] = 250 * 250
+SLOW_ALGORITHMS: Final[Tuple[str, ...]] = ('backtracker', 'kruskal', 'wilson')
+
+
+class Maze:
+    """
+    生成中的地图：一个 height * width 的扁平 bytearray，每个单元格一个字节（图块字符的编码）。
+
+    迷宫算法在“房间”坐标中工作：房间 (i, j) 位于地图的 (2i + 1, 2j + 1)，
+    相邻两个房间之间的单元格是它们之间的墙。地图边长为偶数时最后一行/列保持为墙。
+    """
+
+    def __init__(self, height: int, width: int):
+        if height < 5 or width < 5:
+            raise ValueError('Map must be at least 5x5')
+        self.height: int = height
+        self.width: int = width
+        self.rooms_y: int = (height - 1) // 2
+        self.rooms_x: int = (width - 1) // 2
+        self.data: bytearray = bytearray([WALL]) * (height * width)
+
+    def room(self, cell: int) -> int:
+        """
+        返回：
+            int: 房间编号 cell 在地图数据中的下标。
+        """
+        i, j = divmod(cell, self.rooms_x)
+        return (2 * i + 1) * self.width + 2 * j + 1
+
+    def carve(self, cell: int, other: int) -> None:
+        """
+        打通两个相邻房间（两个房间与它们之间的墙都变成空地）。
+        """
+        a: int = self.room(cell)
+        b: int = self.room(other)
+        self.data[a] = self.data[b] = self.data[(a + b) // 2] = FLOOR
+
+    def neighbors(self, cell: int) -> List[int]:
+        """
+        返回：
+            List[int]: 与房间 cell 相邻的房间编号（上、下、左、右中存在的）。
+        """
+        i, j = divmod(cell, self.rooms_x)
+        found: List[int] = []
+        if i > 0:
+            found.append(cell - self.rooms_x)
+        if i < self.rooms_y - 1:
+            found.append(cell + self.rooms_x)
+        if j > 0:
+            found.append(cell - 1)
+        if j < self.rooms_x - 1:
+            found.append(cell + 1)
+        return found
+
+    def room_path(self, start: int, goal: int) -> None:
+        """
+        在已经生成的迷宫中用广度优先搜索找到两个房间之间的路线，并标记为保留路线。
+        """
+        rooms: int = self.rooms_y * self.rooms_x
+        parent: array = array('i', [-1]) * rooms
+        parent[start] = start
+        queue: List[int] = [start]
+        for cell in queue:
+            if cell == goal:
+                break
+            a: int = self.room(cell)
+            for other in self.neighbors(cell):
+                if parent[other] < 0 and self.data[(a + self.room(other)) // 2] != WALL:
+                    parent[other] = cell
+                    queue.append(other)
+        cell = goal
+        while True:
+            self.data[self.room(cell)] = PATH
+            if cell == start:
+                return
+            self.data[(self.room(cell) + self.room(parent[cell])) // 2] = PATH
+            cell = parent[cell]
+
+
+def backtracker(maze: Maze, rng: random.Random, config: dict) -> Tuple[int, int]:
+    """
+    递归回溯（深度优先）迷宫：走廊长而曲折，死路少。用显式栈代替递归。
+
+    返回:
+        Tuple[int, int]: 起点与终点在地图数据中的下标。
+    """
+    rooms: int = maze.rooms_y * maze.rooms_x
+    visited: bytearray = bytearray(rooms)
+    stack: array = array('i', [0])
+    visited[0] = 1
+    maze.data[maze.room(0)] = FLOOR
+    while stack:
+        cell: int = stack[-1]
+        options: List[int] = [other for other in maze.neighbors(cell) if not visited[other]]
+        if not options:
+            stack.pop()
+            continue
+        other: int = rng.choice(options)
+        visited[other] = 1
+        maze.carve(cell, other)
+        stack.append(other)
+    maze.room_path(0, rooms - 1)
+    return maze.room(0), maze.room(rooms - 1)
+
+
+def kruskal(maze: Maze, rng: random.Random, config: dict) -> Tuple[int, int]:
+    """
+    随机 Kruskal 迷宫：按随机顺序打通连接两个不同集合的墙，分支多、走廊短。
+
+    返回:
+        Tuple[int, int]: 起点与终点在地图数据中的下标。
+    """
+    rooms: int = maze.rooms_y * maze.rooms_x
+    parent: array = array('i', range(rooms))
+
+    def find(cell: int) -> int:
+        # 路径减半
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    # 墙编号：房间编号 * 2 + 方向（0 为右，1 为下）
+    walls: array = array('i', (
+        cell * 2 + direction
+        for cell in range(rooms)
+        for direction in (0, 1)
+        if (direction == 0 and cell % maze.rooms_x < maze.rooms_x - 1)
+        or (direction == 1 and cell < rooms - maze.rooms_x)
+    ))
+    rng.shuffle(walls)
+    for wall in walls:
+        cell, direction = divmod(wall, 2)
+        other: int = cell + 1 if direction == 0 else cell + maze.rooms_x
+        a: int = find(cell)
+        b: int = find(other)
+        if a != b:
+            parent[a] = b
+            maze.carve(cell, other)
+    maze.room_path(0, rooms - 1)
+    return maze.room(0), maze.room(rooms - 1)
+
+
+def wilson(maze: Maze, rng: random.Random, config: dict) -> Tuple[int, int]:
+    """
+    Wilson 算法：用擦除回路的随机游走生成均匀随机的生成树，没有方向偏好。
+    开始阶段的随机游走较慢，适合中小尺寸的地图。
+
+    返回:
+        Tuple[int, int]: 起点与终点在地图数据中的下标。
+    """
+    rooms: int = maze.rooms_y * maze.rooms_x
+    in_tree: bytearray = bytearray(rooms)
+    # 随机游走中每个房间最后一次离开的方向（下一个房间的编号）
+    step: array = array('i', [0]) * rooms
+    in_tree[rooms - 1] = 1
+    maze.data[maze.room(rooms - 1)] = FLOOR
+    order: List[int] = list(range(rooms))
+    rng.shuffle(order)
+    for begin in order:
+        cell: int = begin
+        while not in_tree[cell]:
+            step[cell] = rng.choice(maze.neighbors(cell))
+            cell = step[cell]
+        cell = begin
+        while not in_tree[cell]:
+            in_tree[cell] = 1
+            maze.carve(cell, step[cell])
+            cell = step[cell]
+    maze.room_path(0, rooms - 1)
+    return maze.room(0), maze.room(rooms - 1)
+
+
+def binary_tree(maze: Maze, rng: random.Random, config: dict) -> Tuple[int, int]:
+    """
+    二叉树迷宫：每个房间随机打通北墙或东墙。每一行只依赖自己的随机数，
+    整行用 bytes.translate 与切片赋值一次生成，不逐格执行 Python 代码，适合超大地图。
+    迷宫有向东北的偏向，北边一行和东边一列是贯通的走廊。
+
+    起点在左下角，终点在右上角：从任意房间沿打通的方向一直走都会到达右上角。
+
+    返回:
+        Tuple[int, int]: 起点与终点在地图数据中的下标。
+    """
+    rooms_x: int = maze.rooms_x
+    width: int = maze.width
+    data: bytearray = maze.data
+    # 随机字节小于 128 时打通北墙，否则打通东墙
+    north_table: bytes = bytes(FLOOR if i < 128 else WALL for i in range(256))
+    east_table: bytes = bytes(WALL if i < 128 else FLOOR for i in range(256))
+    north_mark: bytes = bytes(1 if i < 128 else 0 for i in range(256))
+    floors: bytes = bytes([FLOOR]) * rooms_x
+    # 每一行中向北的房间标记为 1；每行保存一个 bytes（而不是每格一个对象），用于回溯起点到终点的路线
+    marks: List[bytes] = []
+    for i in range(maze.rooms_y):
+        row: int = (2 * i + 1) * width
+        data[row + 1:row + 2 * rooms_x:2] = floors
+        if i == 0:
+            # 第一行只能向东
+            data[row + 2:row + 2 * rooms_x - 1:2] = floors[1:]
+            marks.append(bytes(rooms_x))
+            continue
+        coins: bytearray = bytearray(rng.randbytes(rooms_x))
+        # 最后一列只能向北
+        coins[-1] = 0
+        data[row + 2:row + 2 * rooms_x - 1:2] = coins[:-1].translate(east_table)
+        data[row - width + 1:row - width + 2 * rooms_x:2] = coins.translate(north_table)
+        marks.append(coins.translate(north_mark))
+
+    # 从左下角出发：在一行中向东走到第一个向北的房间，再向北进入上一行，第一行一直向东走到终点
+    j: int = 0
+    for i in range(maze.rooms_y - 1, -1, -1):
+        k: int = marks[i].find(1, j) if i > 0 else rooms_x - 1
+        row = (2 * i + 1) * width
+        data[row + 2 * j + 1:row + 2 * k + 2] = bytes([PATH]) * (2 * (k - j) + 1)
+        if i > 0:
+            data[row - width + 2 * k + 1] = PATH
+        j = k
+    return maze.room((maze.rooms_y - 1) * rooms_x), maze.room(rooms_x - 1)
+
+
+def cave_step(rows: List[int], full: int) -> List[int]:
+    """
+    元胞自动机的一次迭代：3x3 邻域（含自身）中至少 5 个墙的单元格变为墙。
+
+    每一行是一个大整数，第 x 位表示第 x 列是否为墙。邻域计数用按位加法器在整行上并行计算，
+    因此每一行只需要几十次大整数运算，而不是逐格计算。
+    """
+    height: int = len(rows)
+    result: List[int] = [rows[0]]
+    for y in range(1, height - 1):
+        # 4 位计数器，逐个加上 9 个邻域位平面
+        counter: List[int] = [0, 0, 0, 0]
+        for row in (rows[y - 1], rows[y], rows[y + 1]):
+            for plane in (row, (row << 1) & full, row >> 1):
+                carry: int = plane
+                for bit in range(4):
+                    counter[bit], carry = counter[bit] ^ carry, counter[bit] & carry
+                    if not carry:
+                        break
+        c0, c1, c2, c3 = counter
+        result.append(c3 | (c2 & (c1 | c0)))
+    result.append(rows[-1])
+    return result
+
+
+def caves(maze: Maze, rng: random.Random, config: dict) -> Tuple[int, int]:
+    """
+    元胞自动机洞穴：随机填充墙后迭代平滑，得到开阔、不规则的洞穴。
+    洞穴本身不保证连通，因此再开出一条从左上角蜿蜒到右下角的保留路线。
+
+    返回:
+        Tuple[int, int]: 起点与终点在地图数据中的下标。
+    """
+    height: int = maze.height
+    width: int = maze.width
+    data: bytearray = maze.data
+    full: int = (1 << width) - 1
+    border: int = (1 << (width - 1)) | 1
+    threshold: int = int(min(max(config['cave_fill'], 0.0), 1.0) * 256)
+    fill_table: bytes = bytes(ord('1') if i < threshold else ord('0') for i in range(256))
+
+    rows: List[int] = [full]
+    for _ in range(height - 2):
+        rows.append(int(rng.randbytes(width).translate(fill_table), 2) | border)
+    rows.append(full)
+    for _ in range(config['cave_steps']):
+        rows = cave_step(rows, full)
+        rows = [full] + [row | border for row in rows[1:-1]] + [full]
+
+    tile_table: bytes = bytes.maketrans(b'01', bytes([FLOOR, WALL]))
+    for y, row in enumerate(rows):
+        data[y * width:(y + 1) * width] = format(row, f'0{width}b').encode('ascii').translate(tile_table)
+
+    # 保留路线：每一行向目标列（对角线加随机偏移）横向走一段，再向下一行
+    x: int = 1
+    for y in range(1, height - 1):
+        if y == height - 2:
+            target: int = width - 2
+        else:
+            target = round(1 + (width - 3) * (y - 1) / max(height - 3, 1)) + rng.randint(-8, 8)
+            target = min(max(target, 1), width - 2)
+        low, high = min(x, target), max(x, target)
+        data[y * width + low:y * width + high + 1] = bytes([PATH]) * (high - low + 1)
+        x = target
+    return width + 1, (height - 2) * width + width - 2
+
+
+# 算法名称到生成函数的映射，生成函数打通地图并标记保留路线，返回起点与终点
+ALGORITHMS: Final[Dict[str, Callable[[Maze, random.Random, dict], Tuple[int, int]]]] = {
+    'backtracker': backtracker,
+    'kruskal': kruskal,
+    'wilson': wilson,
+    'binary_tree': binary_tree,
+    'caves': caves
+}
+
+
+def decorate(maze: Maze, rng: random.Random, density: Dict[str, float]) -> None:
+    """
+    按密度在空地上随机放置陷阱、水面与传送带，保留路线上的单元格不会被占用，
+    因此生成的关卡总是可以通关。传送带只放在推动后仍落在空地上的位置。
+    每个图块只需要与放置数量成正比的随机取样，不扫描整张地图。
+    """
+    data: bytearray = maze.data
+    size: int = len(data)
+    width: int = maze.width
+    floors: int = data.count(FLOOR)
+    for tile, ratio in density.items():
+        count: int = int(floors * ratio)
+        # 空地不足时放弃，不会陷入死循环
+        attempts: int = count * 4 + 100
+        while count > 0 and attempts > 0:
+            attempts -= 1
+            cell: int = rng.randrange(size)
+            if data[cell] != FLOOR:
+                continue
+            if tile == 'conveyor':
+                arrow: str = rng.choice('><^v')
+                dy, dx = CONVEYOR_PUSH[arrow]
+                y, x = divmod(cell, width)
+                if not (0 <= y + dy < maze.height and 0 <= x + dx < width) \
+                        or data[cell + dy * width + dx] not in (FLOOR, PATH):
+                    continue
+                data[cell] = ord(arrow)
+            else:
+                data[cell] = ord(tile)
+            count -= 1
+
+
+def generate(height: int, width: int, algorithm: str = None, seed: int = 0, config: dict = None) -> Grid:
+    """
+    生成一个可以通关的关卡。相同的参数与种子总是生成相同的关卡。
+
+    backtracker、kruskal 与 wilson 逐个房间打通，只用于不超过 SLOW_ALGORITHM_MAX_ROOMS 个房间
+    （约 501x501）的地图；更大的地图自动改用 binary_tree，避免生成耗时数秒到数十秒。
+
+    参数:
+        height (int): 地图行数。
+        width (int): 地图列数。
+        algorithm (str): ALGORITHMS 中的算法名称，默认取配置中的 algorithm。
+        seed (int): 随机种子。
+        config (dict): 生成配置，缺省项取 DEFAULT_GENERATOR_CONFIG。
+
+    返回:
+        Grid: 地图网格，左上角附近为起点 'S'，另一端为终点 'E'。
+
+    异常:
+        ValueError: 未知的算法或地图过小。
+    """
+    config = {**DEFAULT_GENERATOR_CONFIG, **(config or {})}
+    algorithm = algorithm or config['algorithm']
+    carve: Optional[Callable[[Maze, random.Random, dict], Tuple[int, int]]] = ALGORITHMS.get(algorithm)
+    if carve is None:
+        raise ValueError(f'Unknown maze algorithm: {algorithm}')
+
+    rng: random.Random = random.Random(seed)
+    maze: Maze = Maze(height, width)
+    if algorithm in SLOW_ALGORITHMS and maze.rooms_y * maze.rooms_x > SLOW_ALGORITHM_MAX_ROOMS:
+        logging.warning(f'Maze algorithm {algorithm} is too slow for {height}x{width}, using binary_tree')
+        carve = binary_tree
+    start, exit_ = carve(maze, rng, config)
+    decorate(maze, rng, config['density'])
+    data: bytearray = maze.data.translate(bytes.maketrans(bytes([PATH]), bytes([FLOOR])))
+    data[start] = ord('S')
+    data[exit_] = ord('E')
+    return Grid(height, width, data, [chr(i) for i in range(256)], {})
+
+
+# 开放世界区块可以使用的算法：只有生成完美迷宫的算法能保证区块的所有房间互相连通
+WORLD_ALGORITHMS: Final[Tuple[str, ...]] = ('backtracker', 'kruskal', 'wilson', 'binary_tree')
+
+
+def chunk_door(seed: int, chunk_y: int, chunk_x: int, side: str, rooms: int) -> int:
+    """
+    返回：
+        int: 区块 (chunk_y, chunk_x) 的上墙（side 为 'top'）或左墙（'left'）上的门所对应的房间列/行。
+        只取决于种子与区块坐标，相邻区块生成时可以独立算出同一扇门。
+    """
+    return random.Random(f'{seed}:{chunk_y}:{chunk_x}:{side}').randrange(rooms)
+
+
+def generate_chunk(size: int, chunk_y: int, chunk_x: int, seed: int = 0, config: dict = None) -> bytes:
+    """
+    生成开放世界中的一个区块。相同的种子与区块坐标总是生成相同的区块。
+
+    区块是 size + 1 见方的迷宫去掉最后一行和最后一列：第 0 行与第 0 列是区块与上方、左方区块之间的墙，
+    最后一行与最后一列的墙由下方与右方的区块提供。每个区块在上墙和左墙上各开一扇门，
+    因此整个世界是连通的；四扇门之间以及它们到左上角房间的路线不放置陷阱，
+    左上角的房间总是可以作为出生点。按配置中 world_exit_chance 的概率在区块中放置一个终点。
+
+    参数:
+        size (int): 区块边长，必须是不小于 4 的偶数。
+        chunk_y (int): 区块行号。
+        chunk_x (int): 区块列号。
+        seed (int): 世界的随机种子。
+        config (dict): 生成配置，缺省项取 DEFAULT_GENERATOR_CONFIG。
+
+    返回:
+        bytes: size * size 个图块编码，行优先。
+
+    异常:
+        ValueError: 区块边长不合法或算法不能用于开放世界。
+    """
+    if size < 4 or size % 2:
+        raise ValueError(f'World chunk size must be an even number of at least 4: {size}')
+    config = {**DEFAULT_GENERATOR_CONFIG, **(config or {})}
+    algorithm: str = config['algorithm']
+    if algorithm not in WORLD_ALGORITHMS:
+        raise ValueError(f'Maze algorithm cannot be used for world chunks: {algorithm}')
+
+    rng: random.Random = random.Random(f'{seed}:{chunk_y}:{chunk_x}')
+    maze: Maze = Maze(size + 1, size + 1)
+    ALGORITHMS[algorithm](maze, rng, config)
+    rooms_y: int = maze.rooms_y
+    rooms_x: int = maze.rooms_x
+    width: int = maze.width
+
+    # 本区块的上门与左门，以及下方、右方区块通向本区块的门
+    top: int = chunk_door(seed, chunk_y, chunk_x, 'top', rooms_x)
+    left: int = chunk_door(seed, chunk_y, chunk_x, 'left', rooms_y)
+    bottom: int = chunk_door(seed, chunk_y + 1, chunk_x, 'top', rooms_x)
+    right: int = chunk_door(seed, chunk_y, chunk_x + 1, 'left', rooms_y)
+    for door in (top, left * rooms_x, (rooms_y - 1) * rooms_x + bottom, right * rooms_x + rooms_x - 1):
+        maze.room_path(0, door)
+    maze.data[2 * top + 1] = PATH
+    maze.data[(2 * left + 1) * width] = PATH
+
+    decorate(maze, rng, config['density'])
+    data: bytearray = maze.data.translate(bytes.maketrans(bytes([PATH]), bytes([FLOOR])))
+    if rng.random() < config['world_exit_chance']:
+        data[maze.room(rng.randrange(1, rooms_y * rooms_x))] = ord('E')
+    return b''.join(data[y * width:y * width + size] for y in range(size))
+
+
+def write_json_level(map_: Grid, path: str) -> None:
+    """
+    逐行写出 JSON 地图（与 asset/map 中的格式相同），每次只在内存中构造一行。
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for y in range(map_.height):
+            line: str = map_.row_codes(y).decode('latin-1')
+            f.write('  ["' + '", "'.join(line) + ('"],\n' if y < map_.height - 1 else '"]\n'))
+        f.write(']')
+
+
+def write_level(map_: Grid, path: str) -> None:
+    """
+    按扩展名写出 read_map 可以读取的地图：.lmap 为二进制地图，其他为 JSON。
+    """
+    if os.path.splitext(path)[1].lower() == '.lmap':
+        from gui.map_binary import write_binary_map
+        write_binary_map(map_, path)
+    else:
+        write_json_level(map_, path)
+
+
+def read_generator_config(path: str) -> dict:
+    """
+    读取生成配置，文件中缺少的项取默认值；文件不存在时使用默认配置。
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config: dict = json.load(f)
+    except FileNotFoundError:
+        return dict(DEFAULT_GENERATOR_CONFIG)
+    return {**DEFAULT_GENERATOR_CONFIG, **config}
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：python -m engine.generator <输出.json|.lmap> [--size 高x宽] [--algorithm 算法]
+                                           [--seed N] [--config 配置.json]
+    超过约 501x501 的地图总是用 binary_tree 生成（见 generate）。
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    options: Dict[str, Optional[str]] = {'--size': '41x41', '--algorithm': None, '--seed': '0',
+                                         '--config': GENERATOR_CONFIG_PATH}
+    # 选项后面必须跟着取值，位于末尾或后面紧跟另一个选项时提示用法
+    missing: bool = False
+    for option in options:
+        if option in args:
+            position: int = args.index(option)
+            if position + 1 == len(args) or args[position + 1] in options:
+                missing = True
+                break
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+    # 尺寸与种子不是整数、或地图小于 5x5 时同样提示用法
+    height, _, width = options['--size'].lower().partition('x')
+    size: Tuple[int, int] = (0, 0)
+    seed: int = 0
+    try:
+        size = (int(height), int(width or height))
+        seed = int(options['--seed'])
+    except ValueError:
+        missing = True
+    if missing or len(args) != 1 or (options['--algorithm'] and options['--algorithm'] not in ALGORITHMS) \
+            or min(size) < 5:
+        print('用法: python -m engine.generator <输出.json|.lmap> [--size 高x宽] [--seed N] [--config 配置.json]\n'
+              f'      [--algorithm {"|".join(ALGORITHMS)}]\n'
+              f'      超过约 501x501 的地图总是使用 binary_tree 算法')
+        return 2
+
+    begin: float = time.perf_counter()
+    map_: Grid = generate(*size, options['--algorithm'], seed, read_generator_config(options['--config']))
+    generated: float = time.perf_counter()
+    write_level(map_, args[0])
+    print(f'已生成 {map_.height}x{map_.width} 地图 {args[0]}（生成 {generated - begin:.2f} 秒，'
+          f'写出 {time.perf_counter() - generated:.2f} 秒）')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import re
+from typing import *
+
+from engine.engine import *
+from engine.timers import TimerHeap
+
+# 每秒的模拟刻数
+TICK_RATE: Final[int] = 20
+
+WATER: Final[str] = '~'
+# 水面动画依次显示的字符，以及每一帧持续的刻数
+WATER_FRAMES: Final[str] = '~≈'
+WATER_PERIOD: Final[int] = 10
+
+# 定时陷阱开启与关闭各自持续的刻数，以及关闭时显示的字符
+HAZARD_ON: Final[int] = 40
+HAZARD_OFF: Final[int] = 30
+HAZARD_IDLE: Final[str] = ','
+
+
+def find_tiles(map_, tiles: str) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    逐行扫描地图，查找指定图块的所有坐标。只在关卡开始时调用一次。
+
+    参数:
+        map_: Grid 或 ChunkedGrid。
+        tiles (str): 要查找的图块。
+
+    返回:
+        Dict[str, List[Tuple[int, int]]]: 图块到坐标列表的映射。
+
+    异常:
+        ValueError: 地图不能逐行扫描（开放世界）。
+    """
+    if not hasattr(map_, 'row_codes'):
+        raise ValueError('Realtime mode needs a map that can be scanned row by row, open worlds are turn-based only')
+    found: Dict[str, List[Tuple[int, int]]] = {tile: [] for tile in tiles}
+    lookup: Dict[int, List[Tuple[int, int]]] = {map_.encode(tile): found[tile] for tile in tiles}
+    pattern: re.Pattern = re.compile(b'[' + re.escape(bytes(lookup)) + b']')
+    for y in range(map_.height):
+        codes: bytes = map_.row_codes(y)
+        for match in pattern.finditer(codes):
+            lookup[codes[match.start()]].append((y, match.start()))
+    return found
+
+
+class RealtimeEngine(Engine):
+    """
+    实时模式的游戏引擎：在回合引擎的移动规则之上，按固定刻推进图块行为。
+
+    图块行为由定时器堆驱动，每一刻只处理到期的图块，不扫描整张地图：
+        - 水面 '~' 在 WATER_FRAMES 之间循环显示（纯显示效果，不影响移动）。
+        - 定时陷阱 '!' 开启 HAZARD_ON 刻、关闭 HAZARD_OFF 刻交替进行；
+          关闭时可以通过，开启时站在上面的玩家被送回起点。
+    显示效果保存在 overlay 中（坐标 -> 显示字符），渲染器用它覆盖地图上的字符。
+    """
+
+    def __init__(self, map_data: dict):
+        """
+        参数:
+            map_data (dict): read_map 返回的地图数据。
+        """
+        super().__init__(map_data)
+        self.tick_count: int = 0
+        self.timers: TimerHeap[Tuple[str, int, int]] = TimerHeap()
+        self.overlay: Dict[Tuple[int, int], str] = {}
+        self.inactive: Set[Tuple[int, int]] = set()
+
+        tiles: Dict[str, List[Tuple[int, int]]] = find_tiles(self.map_, WATER + TIMED_HAZARD)
+        for y, x in tiles[WATER]:
+            # 按坐标错开相位，水面呈现波纹效果
+            self.timers.schedule((y + x) % WATER_PERIOD + 1, (WATER, y, x))
+        for y, x in tiles[TIMED_HAZARD]:
+            self.timers.schedule(HAZARD_ON, (TIMED_HAZARD, y, x))
+
+    def hazard_active(self, y: int, x: int) -> bool:
+        return (y, x) not in self.inactive
+
+    def tick(self) -> Tuple[GameState, str, List[Tuple[int, int]]]:
+        """
+        推进一个模拟刻，处理所有到期的图块行为。
+
+        返回:
+            Tuple[GameState, str, List[Tuple[int, int]]]: 当前状态、事件（玩家被开启的陷阱送回起点时
+            为 RESET，否则为 IGNORED），以及显示内容发生变化的单元格。
+        """
+        self.tick_count += 1
+        event: str = IGNORED
+        changed: List[Tuple[int, int]] = []
+        for tile, y, x in self.timers.pop_due(self.tick_count):
+            position: Tuple[int, int] = (y, x)
+            if tile == WATER:
+                frame: int = WATER_FRAMES.find(self.overlay.get(position, WATER))
+                self.overlay[position] = WATER_FRAMES[(frame + 1) % len(WATER_FRAMES)]
+                self.timers.schedule(self.tick_count + WATER_PERIOD, (tile, y, x))
+            elif position in self.inactive:
+                self.inactive.discard(position)
+                del self.overlay[position]
+                self.timers.schedule(self.tick_count + HAZARD_ON, (tile, y, x))
+                if (self.state.player_y, self.state.player_x) == position:
+                    self.state = self.start
+                    event = RESET
+            else:
+                self.inactive.add(position)
+                self.overlay[position] = HAZARD_IDLE
+                self.timers.schedule(self.tick_count + HAZARD_OFF, (tile, y, x))
+            changed.append(position)
+        return self.state, event, changed
@@ -0,0 +1,200 @@
+import heapq
+import sys
+from array import array
+from typing import *
+
+from engine.engine import BLOCK, CONVEYOR, GOAL, HAZARD, MOVE, TIMED, WIN, TransitionTable, transition_table
+
+# 传送带图块及其推动的位移，与 Engine 的 CONVEYORS 相同
+CONVEYOR_KEYS: Final[str] = '><^v'
+CONVEYOR_PUSH: Final[Tuple[Tuple[int, int], ...]] = ((0, 2), (0, -2), (-2, 0), (2, 0))
+# 转移表中移动方向编号对应的按键
+MOVE_KEYS: Final[str] = 'wsad'
+
+# 自动选择算法时，面积较大、终点不多、没有传送带且比较开阔的地图使用 A*；
+# 迷宫类地图（墙多）或有传送带时启发函数帮助有限，BFS 更快
+ASTAR_AREA: Final[int] = 250_000
+ASTAR_MAX_EXITS: Final[int] = 8
+ASTAR_MAX_BLOCKED: Final[float] = 0.25
+
+
+def positions(kinds: bytearray, kind: int) -> List[int]:
+    """
+    返回：
+        List[int]: 类别数组中所有等于 kind 的下标。
+    """
+    found: List[int] = []
+    index: int = kinds.find(kind)
+    while index >= 0:
+        found.append(index)
+        index = kinds.find(kind, index + 1)
+    return found
+
+
+def rebuild(parent: array, moved: bytearray, start: int, last: int, final_move: int) -> str:
+    """
+    沿父指针回溯，得到从起点出发的按键序列。
+    """
+    keys: List[str] = [MOVE_KEYS[final_move]]
+    while last != start:
+        keys.append(MOVE_KEYS[moved[last]])
+        last = parent[last]
+    keys.reverse()
+    return ''.join(keys)
+
+
+def bfs(table: TransitionTable, start: int) -> Optional[str]:
+    """
+    在转移表上做广度优先搜索，返回步数最少的按键序列。
+    陷阱只会把玩家送回已访问过的起点，对最短路而言等同于墙。
+
+    参数:
+        table (TransitionTable): 地图的转移表。
+        start (int): 起点下标。
+
+    返回:
+        Optional[str]: 按键序列，无解时返回 None。
+    """
+    kinds: bytearray = table.kinds
+    moves: Tuple[int, ...] = table.moves
+    outcomes: Tuple[Tuple[Tuple[int, str], ...], ...] = table.outcomes
+    parent: array = array('l', bytes(array('l').itemsize * len(kinds)))
+    moved: bytearray = bytearray(len(kinds))
+    seen: bytearray = bytearray(len(kinds))
+    seen[start] = 1
+    queue: List[int] = [start]
+
+    # 遍历过程中向列表追加元素，for 循环会继续处理新加入的节点
+    for cell in queue:
+        for direction in range(4):
+            offset, event = outcomes[direction][kinds[cell + moves[direction]]]
+            if event == WIN:
+                return rebuild(parent, moved, start, cell, direction)
+            if event != MOVE:
+                continue
+            landing: int = cell + offset
+            if not seen[landing]:
+                seen[landing] = 1
+                parent[landing] = cell
+                moved[landing] = direction
+                queue.append(landing)
+    return None
+
+
+def astar(table: TransitionTable, start: int, exits: List[int]) -> Optional[str]:
+    """
+    A* 搜索。没有传送带时每步只移动一格，启发函数取到最近终点的曼哈顿距离；
+    有传送带时每步最多移动三格，启发函数取曼哈顿距离除以三（向上取整）。两者都是可采纳的，结果仍然最优。
+
+    参数:
+        table (TransitionTable): 地图的转移表。
+        start (int): 起点下标。
+        exits (List[int]): 所有终点的下标。
+
+    返回:
+        Optional[str]: 按键序列，无解时返回 None。
+    """
+    if not exits:
+        return None
+    kinds: bytearray = table.kinds
+    stride: int = table.stride
+    moves: Tuple[int, ...] = table.moves
+    outcomes: Tuple[Tuple[Tuple[int, str], ...], ...] = table.outcomes
+    goals: List[Tuple[int, int]] = [divmod(e, stride) for e in exits]
+    reach: int = 3 if any(kinds.count(CONVEYOR + i) for i in range(4)) else 1
+
+    def heuristic(cell: int) -> int:
+        y, x = divmod(cell, stride)
+        return (min(abs(y - gy) + abs(x - gx) for gy, gx in goals) + reach - 1) // reach
+
+    parent: Dict[int, int] = {start: start}
+    moved: Dict[int, int] = {}
+    cost: Dict[int, int] = {start: 0}
+    # 堆元素为 (f, -g, 下标)：f 相同时优先扩展走得更远的节点，开阔地图上可大幅减少扩展数
+    heap: List[Tuple[int, int, int]] = [(heuristic(start), 0, start)]
+
+    while heap:
+        _, negative_g, cell = heapq.heappop(heap)
+        g: int = -negative_g
+        if g > cost[cell]:
+            continue
+        for direction in range(4):
+            offset, event = outcomes[direction][kinds[cell + moves[direction]]]
+            if event == WIN:
+                # 启发函数在终点处为 0，弹出的节点代价已是最优，第一次碰到终点即为最短路
+                keys: List[str] = [MOVE_KEYS[direction]]
+                while cell != start:
+                    keys.append(MOVE_KEYS[moved[cell]])
+                    cell = parent[cell]
+                keys.reverse()
+                return ''.join(keys)
+            if event != MOVE:
+                continue
+            landing: int = cell + offset
+            if g + 1 < cost.get(landing, sys.maxsize):
+                cost[landing] = g + 1
+                parent[landing] = cell
+                moved[landing] = direction
+                heapq.heappush(heap, (g + 1 + heuristic(landing), -g - 1, landing))
+    return None
+
+
+def solve(map_data: dict, method: str = 'auto') -> Optional[str]:
+    """
+    求出通关所需的最短按键序列，移动规则与 Engine 完全一致。
+
+    参数:
+        map_data (dict): read_map 返回的地图数据。
+        method (str): 'bfs'、'astar' 或 'auto'（按 ASTAR_* 阈值自动选择）。
+
+    返回:
+        Optional[str]: 由 'w' 'a' 's' 'd' 组成的按键序列，无法通关时返回 None。
+
+    异常:
+        ValueError: 未知的搜索方法，或地图是无法整体编译的开放世界。
+    """
+    table: Optional[TransitionTable] = transition_table(map_data)
+    if table is None:
+        raise ValueError('Open worlds cannot be solved')
+    kinds: bytearray = table.kinds
+    start: int = table.index(map_data['player_y'], map_data['player_x'])
+
+    if method == 'auto':
+        area: int = table.height * table.width
+        # 不计转移表四周的边框
+        border: int = 2 * table.stride + 2 * table.height
+        blocked: int = kinds.count(BLOCK) - border + kinds.count(HAZARD) + kinds.count(TIMED)
+        open_map: bool = blocked <= area * ASTAR_MAX_BLOCKED
+        no_conveyors: bool = not any(kinds.count(CONVEYOR + i) for i in range(4))
+        few_exits: bool = kinds.count(GOAL) <= ASTAR_MAX_EXITS
+        method = 'astar' if area >= ASTAR_AREA and open_map and no_conveyors and few_exits else 'bfs'
+
+    if method == 'bfs':
+        return bfs(table, start)
+    if method == 'astar':
+        exits: List[int] = positions(kinds, GOAL)
+        return astar(table, start, exits)
+    raise ValueError(f'Unknown solver method: {method}')
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：python -m engine.solver <地图文件> [bfs|astar|auto]
+    """
+    from gui.map import parse_map
+
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    if not 1 <= len(args) <= 2:
+        print('用法: python -m engine.solver <地图文件> [bfs|astar|auto]')
+        return 2
+
+    keys: Optional[str] = solve(parse_map(args[0]), args[1] if len(args) == 2 else 'auto')
+    if keys is None:
+        print('无法通关')
+        return 1
+    print(f'最短 {len(keys)} 步: {keys}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import heapq
+from typing import *
+
+T = TypeVar('T')
+
+
+class TimerHeap(Generic[T]):
+    """
+    按模拟刻（tick）排序的定时器最小堆。
+
+    每个定时器是一个到期刻和一个任意载荷。pop_due 只取出已经到期的定时器，
+    因此每一刻的开销只与到期的定时器数量有关，而与定时器总数无关（取出为 O(log n)）。
+    同一刻到期的定时器按加入顺序返回。
+
+    取消是惰性的：被取消的定时器留在堆中，到达堆顶时才被丢弃，因此取消为 O(1)。
+    """
+
+    def __init__(self):
+        self.heap: List[Tuple[int, int, T]] = []
+        # 加入顺序，用于同一刻到期时的稳定排序，也避免比较载荷；同时作为定时器的编号
+        self.sequence: int = 0
+        # 尚未到期且没有被取消的定时器编号
+        self.pending: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def schedule(self, tick: int, payload: T) -> int:
+        """
+        加入一个在第 tick 刻到期的定时器。
+
+        返回:
+            int: 定时器编号，用于 cancel。
+        """
+        handle: int = self.sequence
+        heapq.heappush(self.heap, (tick, handle, payload))
+        self.pending.add(handle)
+        self.sequence += 1
+        return handle
+
+    def cancel(self, handle: int) -> bool:
+        """
+        取消一个定时器。
+
+        返回:
+            bool: 定时器尚未到期且没有被取消过时返回 True。
+        """
+        if handle not in self.pending:
+            return False
+        self.pending.discard(handle)
+        return True
+
+    def discard_cancelled(self) -> None:
+        """
+        丢弃堆顶被取消的定时器。
+        """
+        heap: List[Tuple[int, int, T]] = self.heap
+        while heap and heap[0][1] not in self.pending:
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[int]:
+        """
+        返回：
+            Optional[int]: 最早到期的刻，没有定时器时为 None。
+        """
+        self.discard_cancelled()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, tick: int) -> List[T]:
+        """
+        取出所有到期刻不晚于 tick 的定时器。
+
+        返回:
+            List[T]: 到期定时器的载荷，按到期刻与加入顺序排列。
+        """
+        due: List[T] = []
+        heap: List[Tuple[int, int, T]] = self.heap
+        pending: Set[int] = self.pending
+        while heap and heap[0][0] <= tick:
+            _, handle, payload = heapq.heappop(heap)
+            if handle in pending:
+                pending.discard(handle)
+                due.append(payload)
+        return due
@@ -1,3 +1,6 @@
-from game.game_main_loop import *
+from load_log.startup import lazy_exports
 
 __all__ = ['start_game']
+
+# 子模块在第一次访问其导出名称时才导入
+__getattr__ = lazy_exports(__name__, {'start_game': 'game.game_main_loop'})
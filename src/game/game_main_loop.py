@@ -1,17 +1,19 @@
 from typing import *
 
-import keyboard
 
 from clear_screen import *
+from gui.key_input import get_input
 from gui import *
 
 LEVEL: Final[List] = [
     'test.json'
 ]
+# 关卡的运行模式（'turn' 或 'realtime'），未列出的关卡为回合模式
+LEVEL_MODE: Final[Dict[str, str]] = {}
 QUIT: Final[int] = 1
 
 
-def game_loop(choose: int, map_path: str, color_dict: dict, all_color: dict) -> str:
+def game_loop(choose: int, map_path: str, color_dict: dict, all_color: dict, render_config: dict = None) -> str:
     """
     主游戏循环函数，根据选择的地图路径和关卡索引执行游戏逻辑。
 
@@ -29,15 +31,16 @@ def game_loop(choose: int, map_path: str, color_dict: dict, all_color: dict) ->
         # noinspection PyTypeHints
         map_data: dict = read_map(f'{map_path}{LEVEL[choose]}')
 
-        # 执行当前地图的游戏循环逻辑
-        result: str = map_loop(map_data, color_dict, all_color)
+        # 按关卡的运行模式执行当前地图的游戏循环逻辑
+        result: str = play_map(map_data, color_dict, all_color, render_config,
+                               LEVEL_MODE.get(LEVEL[choose], 'turn'))
 
         # 根据游戏循环的结果决定下一步操作
         if result == 'win':
             # 胜利时结束当前关卡并返回完成状态
             clear()
             print('恭喜过关！')
-            keyboard.read_key()
+            get_input().read_key()
             clear_button()
             clear()
             return 'finish'
@@ -49,7 +52,8 @@ def game_loop(choose: int, map_path: str, color_dict: dict, all_color: dict) ->
             return 'finish'
 
 
-def trigger_game_choose(choose: int, map_path: str, color_dict: dict, all_color: dict) -> Optional[bool]:
+def trigger_game_choose(choose: int, map_path: str, color_dict: dict, all_color: dict,
+                        render_config: dict = None) -> Optional[bool]:
     """
     触发游戏选择逻辑，根据用户选择执行游戏循环直到满足退出条件。
 
@@ -67,7 +71,7 @@ def trigger_game_choose(choose: int, map_path: str, color_dict: dict, all_color:
             return True
 
         # 调用游戏循环函数，传入用户选择和地图路径，并获取返回状态
-        cond: str = game_loop(choose, map_path, color_dict, all_color)
+        cond: str = game_loop(choose, map_path, color_dict, all_color, render_config)
 
         # 根据游戏循环的返回状态决定下一步操作
         if cond == 'finish':
@@ -78,7 +82,7 @@ def trigger_game_choose(choose: int, map_path: str, color_dict: dict, all_color:
             continue
 
 
-def start_game(menu_path: str, map_path: str, color_dict: dict, all_color: dict) -> None:
+def start_game(menu_path: str, map_path: str, color_dict: dict, all_color: dict, render_config: dict = None) -> None:
     """
     启动游戏主循环，显示菜单并根据用户选择触发相应操作。
 
@@ -95,6 +99,6 @@ def start_game(menu_path: str, map_path: str, color_dict: dict, all_color: dict)
         # 显示菜单并获取用户选择
         choose: int = menu_loop(menu_)
 
-        if_break: bool = trigger_game_choose(choose, map_path, color_dict, all_color)
+        if_break: bool = trigger_game_choose(choose, map_path, color_dict, all_color, render_config)
         if if_break:
             break
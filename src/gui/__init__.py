@@ -1,11 +1,22 @@
-from gui.map import *
-from gui.menu import *
-from gui.print_about import *
+from load_log.startup import lazy_exports
 
 __all__ = [
     'print_about',
     'read_menu',
     'menu_loop',
     'read_map',
-    'map_loop'
+    'map_loop',
+    'realtime_loop',
+    'play_map'
 ]
+
+# 子模块在第一次访问其导出名称时才导入，例如地图模块直到进入游戏才加载
+__getattr__ = lazy_exports(__name__, {
+    'print_about': 'gui.print_about',
+    'read_menu': 'gui.menu',
+    'menu_loop': 'gui.menu',
+    'read_map': 'gui.map',
+    'map_loop': 'gui.map',
+    'realtime_loop': 'gui.realtime',
+    'play_map': 'gui.realtime'
+})
@@ -0,0 +1,238 @@
+import re
+from typing import *
+
+# 非 Latin-1 图块可借用的编码：C1/C0 控制字符，永远不会作为图块出现在地图中
+CONTROL_CODES: Final[Tuple[int, ...]] = (*range(0x80, 0xA0), *range(0x00, 0x20))
+
+# 加载时建立索引的图块：起点、终点、陷阱与传送带
+INDEXED_TILES: Final[str] = 'SE@X><^v'
+
+
+class GridRow:
+    """
+    Grid 中某一行的只读视图（支持写回），不复制底层数据。
+
+    提供与 list[str] 相同的下标、长度和迭代接口，使 map_[y][x] 形式的旧代码可以继续工作。
+    """
+
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid: 'Grid', y: int):
+        self.grid: Grid = grid
+        self.offset: int = y * grid.width
+
+    def __len__(self) -> int:
+        return self.grid.width
+
+    def __getitem__(self, x: int) -> str:
+        return self.grid.tiles[self.grid.data[self.offset + self.grid.check_x(x)]]
+
+    def __setitem__(self, x: int, cell: str) -> None:
+        self.grid.data[self.offset + self.grid.check_x(x)] = self.grid.encode(cell)
+
+    def __iter__(self) -> Iterator[str]:
+        tiles = self.grid.tiles
+        return (tiles[code] for code in self.codes())
+
+    def codes(self) -> memoryview:
+        """
+        返回：
+            memoryview: 该行的图块编码视图（零拷贝）。
+        """
+        return self.grid.view[self.offset:self.offset + self.grid.width]
+
+
+class Grid:
+    """
+    紧凑的二维地图网格。
+
+    地图以行优先顺序存放在一个扁平的 bytearray 中，每个单元格占一个字节（图块编码）。
+    单字节字符（Latin-1）的编码就是其码位，其他字符会被分配到地图中未使用的控制字符编码上，
+    编码与字符的对应关系保存在 tiles / codes 表中。
+
+    与 JSON 解码得到的 list[list[str]] 相比，每个单元格从一个 8 字节指针变为 1 个字节，
+    同时仍然支持 grid[y][x]、len(grid) 以及逐行迭代，兼容旧的 map_data['map'] 用法。
+    """
+
+    __slots__ = ('height', 'width', 'data', 'view', 'tiles', 'codes')
+
+    def __init__(self, height: int, width: int, data: bytearray, tiles: List[str], codes: Dict[str, int]):
+        """
+        参数:
+            height (int): 行数。
+            width (int): 列数。
+            data (bytearray): 长度为 height * width 的图块编码。
+            tiles (List[str]): 编码到字符的映射表（长度为 256）。
+            codes (Dict[str, int]): 非 Latin-1 字符到编码的映射表。
+        """
+        self.height: int = height
+        self.width: int = width
+        self.data: bytearray = data
+        self.view: memoryview = memoryview(data)
+        self.tiles: List[str] = tiles
+        self.codes: Dict[str, int] = codes
+
+    @classmethod
+    def from_rows(cls, rows: list) -> 'Grid':
+        """
+        从 JSON 解码得到的二维字符列表构建网格。
+
+        参数:
+            rows (list): 二维列表，每个元素为单个字符；也可以是字符串列表，每个字符串为一行。较短的行以空格补齐。
+
+        返回:
+            Grid: 构建好的网格。
+
+        异常:
+            ValueError: 如果地图为空或单元格不是单个字符。
+        """
+        if not rows:
+            raise ValueError('Map is empty')
+
+        width: int = max(len(row) for row in rows)
+        lines: list = []
+        for y, row in enumerate(rows):
+            line: str = ''.join(row)
+            # 字符串行的每个字符就是一个单元格；列表行只比较总长度时 '' 与 'ab' 会互相抵消，
+            # 没有空单元格且总长度相等，每个单元格才恰好是一个字符
+            if len(line) != len(row) or (not isinstance(row, str) and '' in row):
+                raise ValueError(f'Map cell must be a single character (row {y})')
+            lines.append(line.ljust(width))
+        text: str = ''.join(lines)
+
+        tiles: List[str] = [chr(i) for i in range(256)]
+        codes: Dict[str, int] = {}
+        wide: Set[str] = {cell for cell in set(text) if ord(cell) > 0xFF}
+        if wide:
+            # 把非 Latin-1 字符映射到地图中未出现的编码上
+            used: Set[int] = {ord(cell) for cell in set(text)} - {ord(cell) for cell in wide}
+            free: Iterator[int] = (i for i in CONTROL_CODES if i not in used)
+            for cell in sorted(wide):
+                code: int = next(free, -1)
+                if code < 0:
+                    raise ValueError('Too many distinct tiles in map')
+                tiles[code] = cell
+                codes[cell] = code
+            text = text.translate({ord(cell): code for cell, code in codes.items()})
+
+        return cls(len(rows), width, bytearray(text.encode('latin-1')), tiles, codes)
+
+    def check_x(self, x: int) -> int:
+        """
+        校验并规范化列下标，负数下标与 list 行为一致。
+        """
+        if x < 0:
+            x += self.width
+        if not 0 <= x < self.width:
+            raise IndexError('Grid column index out of range')
+        return x
+
+    def check_y(self, y: int) -> int:
+        """
+        校验并规范化行下标，负数下标与 list 行为一致。
+        """
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError('Grid row index out of range')
+        return y
+
+    def encode(self, cell: str) -> int:
+        """
+        返回：
+            int: 字符对应的图块编码。
+        """
+        code: Optional[int] = self.codes.get(cell)
+        if code is not None:
+            return code
+        code = ord(cell)
+        if code > 0xFF:
+            raise ValueError(f'Tile {cell!r} is not in the tile table')
+        return code
+
+    def get(self, y: int, x: int) -> str:
+        """
+        O(1) 读取 (y, x) 处的字符，不做负下标处理。
+        """
+        return self.tiles[self.data[y * self.width + x]]
+
+    def set(self, y: int, x: int, cell: str) -> None:
+        """
+        O(1) 写入 (y, x) 处的字符，不做负下标处理。
+        """
+        self.data[y * self.width + x] = self.encode(cell)
+
+    def find(self, cell: str) -> Optional[Tuple[int, int]]:
+        """
+        查找字符第一次出现的位置。
+
+        返回:
+            Optional[Tuple[int, int]]: 坐标 (行, 列)，未找到时返回 None。
+        """
+        index: int = self.data.find(self.encode(cell))
+        if index < 0:
+            return None
+        return divmod(index, self.width)
+
+    def row_codes(self, y: int) -> bytes:
+        """
+        返回：
+            bytes: 第 y 行的图块编码。
+        """
+        return bytes(self.view[y * self.width:(y + 1) * self.width])
+
+    def copy(self) -> 'Grid':
+        """
+        返回：
+            Grid: 拥有独立数据缓冲区的副本（编码表共享）。
+        """
+        return Grid(self.height, self.width, bytearray(self.data), self.tiles, self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        返回：
+            int: 网格数据占用的字节数。
+        """
+        return len(self.data)
+
+    def to_rows(self) -> List[List[str]]:
+        """
+        返回：
+            List[List[str]]: 旧格式的二维字符列表。
+        """
+        return [list(row) for row in self]
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, y: int) -> GridRow:
+        return GridRow(self, self.check_y(y))
+
+    def __iter__(self) -> Iterator[GridRow]:
+        return (GridRow(self, y) for y in range(self.height))
+
+
+def build_tile_index(map_: Grid) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    一次扫描地图，建立特殊图块到坐标列表的索引。
+
+    参数:
+        map_ (Grid): 游戏地图。
+
+    返回:
+        Dict[str, List[Tuple[int, int]]]: 键为 INDEXED_TILES 中的每个图块（起点 'S'、终点 'E'、
+        陷阱 '@'/'X'、传送带 '>' '<' '^' 'v'），值为按行优先顺序排列的 (行, 列) 坐标列表。
+        地图中没有出现的图块对应空列表。
+    """
+    index: Dict[str, List[Tuple[int, int]]] = {tile: [] for tile in INDEXED_TILES}
+    lookup: Dict[int, List[Tuple[int, int]]] = {map_.encode(tile): index[tile] for tile in INDEXED_TILES}
+    pattern: re.Pattern = re.compile(b'[' + re.escape(bytes(lookup)) + b']')
+
+    # 在底层字节缓冲区上由正则引擎完成唯一一次扫描，只有命中的单元格才回到 Python 层
+    width: int = map_.width
+    data: bytearray = map_.data
+    for match in pattern.finditer(data):
+        position: int = match.start()
+        lookup[data[position]].append(divmod(position, width))
+    return index
@@ -0,0 +1,344 @@
+import abc
+import codecs
+import os
+import select
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import *
+
+# 按键队列的容量：积压超过容量时丢弃最早的按键
+QUEUE_SIZE: Final[int] = 64
+
+# 单独的 Esc 与转义序列开头无法区分，收到 Esc 后再等待这么久（秒）看是否有后续字节
+ESC_TIMEOUT: Final[float] = 0.025
+
+# CSI 序列（ESC [ ... 终止符）与 SS3 序列（ESC O 字符）的终止符 -> 按键名称
+SEQUENCE_KEYS: Final[Dict[str, str]] = {
+    'A': 'up',
+    'B': 'down',
+    'C': 'right',
+    'D': 'left',
+    'H': 'home',
+    'F': 'end'
+}
+
+# ESC [ 数字 ~ 形式的序列 -> 按键名称
+TILDE_KEYS: Final[Dict[str, str]] = {
+    '1': 'home',
+    '2': 'insert',
+    '3': 'delete',
+    '4': 'end',
+    '5': 'page up',
+    '6': 'page down'
+}
+
+# 控制字符 -> 按键名称，名称与 keyboard 库保持一致
+CONTROL_KEYS: Final[Dict[str, str]] = {
+    '\r': 'enter',
+    '\n': 'enter',
+    ' ': 'space',
+    '\t': 'tab',
+    '\x7f': 'backspace',
+    '\x08': 'backspace'
+}
+
+# Windows 控制台中方向键等功能键以 '\xe0' 或 '\x00' 开头，第二个字符 -> 按键名称
+CONSOLE_KEYS: Final[Dict[str, str]] = {
+    'H': 'up',
+    'P': 'down',
+    'M': 'right',
+    'K': 'left',
+    'G': 'home',
+    'O': 'end',
+    'I': 'page up',
+    'Q': 'page down',
+    'S': 'delete'
+}
+
+
+def decode_keys(text: str) -> Tuple[List[str], str]:
+    """
+    把终端读到的字符解码为按键名称。
+
+    参数:
+        text (str): 已读到的字符。
+
+    返回:
+        Tuple[List[str], str]: 解码出的按键名称，以及末尾不完整、需要等待后续字符的部分。
+    """
+    keys: List[str] = []
+    i: int = 0
+    while i < len(text):
+        char: str = text[i]
+        if char != '\x1b':
+            keys.append(CONTROL_KEYS.get(char, char))
+            i += 1
+            continue
+
+        if i + 1 == len(text):
+            # 末尾的 Esc 可能是转义序列的开头
+            return keys, text[i:]
+        introducer: str = text[i + 1]
+        if introducer == 'O':
+            if i + 2 == len(text):
+                return keys, text[i:]
+            keys.append(SEQUENCE_KEYS.get(text[i + 2], ''))
+            i += 3
+        elif introducer == '[':
+            # 参数字节 0x30-0x3F、中间字节 0x20-0x2F，终止符 0x40-0x7E
+            end: int = i + 2
+            while end < len(text) and not '\x40' <= text[end] <= '\x7e':
+                end += 1
+            if end == len(text):
+                return keys, text[i:]
+            final: str = text[end]
+            if final == '~':
+                keys.append(TILDE_KEYS.get(text[i + 2:end].split(';')[0], ''))
+            else:
+                keys.append(SEQUENCE_KEYS.get(final, ''))
+            i = end + 1
+        else:
+            keys.append('esc')
+            i += 1
+    # 无法识别的序列被解码为空字符串，丢弃即可
+    return [key for key in keys if key], ''
+
+
+class KeyInput(abc.ABC):
+    """
+    按键输入的公共部分：有界按键队列，以及阻塞与超时读取。
+
+    子类实现 poll(timeout)：最多等待 timeout 秒，把读到的按键放入队列。
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue: Deque[str] = deque(maxlen=queue_size)
+        # 最近一批按键中第一个按键被读到的时刻（time.perf_counter()），用于统计输入延迟
+        self.batch_started: Optional[float] = None
+
+    @abc.abstractmethod
+    def poll(self, timeout: Optional[float]) -> None:
+        """
+        最多等待 timeout 秒（None 表示一直等待），把读到的按键放入队列。
+        """
+
+    @contextmanager
+    def capture(self) -> Iterator['KeyInput']:
+        """
+        在 with 块中独占按键输入，交互循环在整个循环期间持有它。
+        可以嵌套；块外的 read_key 只在等待按键期间独占输入。
+        """
+        yield self
+
+    def read_key(self, timeout: float = None) -> Optional[str]:
+        """
+        读取一个按键。
+
+        参数:
+            timeout (float): 最长等待时间（秒），None 表示一直等待。
+
+        返回:
+            Optional[str]: 按键名称（与 keyboard 库的名称一致），超时返回 None。
+        """
+        deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+        while not self.queue:
+            remaining: Optional[float] = None if deadline is None else max(deadline - time.monotonic(), 0)
+            self.poll(remaining)
+            if not self.queue and deadline is not None and time.monotonic() >= deadline:
+                return None
+        return self.queue.popleft()
+
+    def read_keys(self) -> List[str]:
+        """
+        不等待，取出所有已经到达的按键。
+        """
+        self.poll(0)
+        keys: List[str] = list(self.queue)
+        self.queue.clear()
+        return keys
+
+    def read_batch(self, until: float = 0) -> List[str]:
+        """
+        阻塞读取至少一个按键，然后继续收集到 until 时刻为止到达的所有按键。
+        按住按键时自动重复产生的大量按键会被合并到同一批中。
+
+        参数:
+            until (float): time.monotonic() 时刻，已经过去时只取出已到达的按键。
+
+        返回:
+            List[str]: 按到达顺序排列的按键名称。
+        """
+        keys: List[str] = [self.read_key()]
+        self.batch_started = time.perf_counter()
+        while True:
+            keys.extend(self.read_keys())
+            remaining: float = until - time.monotonic()
+            if remaining <= 0:
+                return keys
+            key: Optional[str] = self.read_key(remaining)
+            if key is None:
+                return keys
+            keys.append(key)
+
+    def flush(self) -> None:
+        """
+        丢弃所有尚未读取的按键，例如其他界面中残留的输入。
+        """
+        self.queue.clear()
+
+
+class TerminalInput(KeyInput):
+    """
+    POSIX 终端输入：读取按键期间把终端设为 cbreak 模式（关闭行缓冲与回显，保留 Ctrl+C），
+    用 select 等待标准输入可读，自行解码方向键与 Esc 的转义序列。
+    不需要 root 权限，每个按键只产生一次输入。
+
+    cbreak 模式只在 capture 块中生效，块外的 input() 等仍然使用终端原来的模式。
+    """
+
+    def __init__(self, fd: int = None, queue_size: int = QUEUE_SIZE):
+        super().__init__(queue_size)
+        import termios
+        import tty
+        self.termios = termios
+        self.tty = tty
+        self.fd: int = sys.stdin.fileno() if fd is None else fd
+        self.decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.pending: str = ''
+        self.saved: Optional[list] = None
+        # capture 的嵌套层数；实时模式在输入线程中读取按键，因此需要加锁
+        self.depth: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    @contextmanager
+    def capture(self) -> Iterator['TerminalInput']:
+        with self.lock:
+            if self.depth == 0:
+                self.saved = self.termios.tcgetattr(self.fd)
+                # TCSANOW：不丢弃已经输入、尚未读取的按键
+                self.tty.setcbreak(self.fd, self.termios.TCSANOW)
+            self.depth += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.close()
+
+    def close(self) -> None:
+        """
+        恢复终端原来的模式。
+        """
+        if self.saved is not None:
+            self.termios.tcsetattr(self.fd, self.termios.TCSADRAIN, self.saved)
+            self.saved = None
+
+    def readable(self, timeout: Optional[float]) -> bool:
+        return bool(select.select([self.fd], [], [], timeout)[0])
+
+    def poll(self, timeout: Optional[float]) -> None:
+        with self.capture():
+            self.read_input(timeout)
+
+    def read_input(self, timeout: Optional[float]) -> None:
+        if not self.readable(timeout):
+            return
+        self.pending += self.decoder.decode(os.read(self.fd, 1024))
+        while True:
+            keys, self.pending = decode_keys(self.pending)
+            self.queue.extend(keys)
+            if not self.pending:
+                return
+            # 转义序列不完整：短暂等待后续字节，等不到时按单独的 Esc 处理
+            if self.readable(ESC_TIMEOUT):
+                self.pending += self.decoder.decode(os.read(self.fd, 1024))
+                continue
+            self.queue.append('esc')
+            self.pending = self.pending[1:]
+
+    def flush(self) -> None:
+        super().flush()
+        self.pending = ''
+        self.termios.tcflush(self.fd, self.termios.TCIFLUSH)
+
+
+class ConsoleInput(KeyInput):
+    """
+    Windows 控制台输入：通过 msvcrt 逐个读取字符，功能键以两个字符表示。
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        super().__init__(queue_size)
+        import msvcrt
+        self.msvcrt = msvcrt
+
+    def poll(self, timeout: Optional[float]) -> None:
+        deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+        while not self.msvcrt.kbhit():
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.001)
+        while self.msvcrt.kbhit():
+            char: str = self.msvcrt.getwch()
+            if char in ('\x00', '\xe0'):
+                key: str = CONSOLE_KEYS.get(self.msvcrt.getwch(), '')
+            elif char == '\x1b':
+                key = 'esc'
+            else:
+                key = CONTROL_KEYS.get(char, char)
+            if key:
+                self.queue.append(key)
+
+    def flush(self) -> None:
+        super().flush()
+        while self.msvcrt.kbhit():
+            self.msvcrt.getwch()
+
+
+class HookInput(KeyInput):
+    """
+    标准输入不是终端时的后备方案：通过 keyboard 库的全局钩子接收按下事件。
+    只记录按下事件，因此不需要再读取松开事件。
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        super().__init__(queue_size)
+        import keyboard
+        self.ready: threading.Condition = threading.Condition()
+        keyboard.on_press(self.on_press)
+
+    def on_press(self, event: Any) -> None:
+        with self.ready:
+            self.queue.append(event.name)
+            self.ready.notify()
+
+    def poll(self, timeout: Optional[float]) -> None:
+        with self.ready:
+            if not self.queue:
+                self.ready.wait(timeout)
+
+
+KEY_INPUT: Optional[KeyInput] = None
+
+
+def get_input() -> KeyInput:
+    """
+    返回进程共用的按键输入，第一次调用时按平台选择实现。
+
+    返回:
+        KeyInput: 标准输入是 POSIX 终端时为 TerminalInput，Windows 控制台为 ConsoleInput，
+        否则为基于 keyboard 库的 HookInput。
+    """
+    global KEY_INPUT
+    if KEY_INPUT is None:
+        if os.name == 'nt':
+            KEY_INPUT = ConsoleInput()
+        elif sys.stdin.isatty():
+            KEY_INPUT = TerminalInput()
+        else:
+            KEY_INPUT = HookInput()
+    return KEY_INPUT
@@ -1,30 +1,45 @@
 import json
 import logging
+import os
 import sys
+import time
 from typing import *
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
-
-init(autoreset=True)
-
-
-def find_player(map_: list) -> Tuple[int, int]:
+from engine import *
+from gui.grid import *
+from gui.key_input import KeyInput, get_input
+from gui.map_binary import load_binary_map, parse_binary_map
+from gui.map_cache import MapCache
+from gui.render import FrameRenderer
+from gui.world import WorldGrid, load_world
+from load_log.metrics import METRICS
+from load_mod.labpack import open_pack, split_archive_path, stat_path
+
+
+def find_player(map_: Union[Grid, list]) -> Tuple[int, int]:
     """
     在给定的地图中查找玩家的位置。
 
     参数:
-        map_ (list): 一个二维列表，表示游戏地图。每个元素代表地图上的一个位置，
-                     其中 'I' 表示玩家的位置。
+        map_ (Union[Grid, list]): Grid 或二维列表，表示游戏地图。每个元素代表地图上的一个位置，
+                     其中 'S' 表示玩家的起点。
 
     返回:
         Tuple[int, int]: 玩家在地图中的坐标 (行索引, 列索引)。
 
     异常:
-        ValueError: 如果地图中没有找到玩家 ('I')，则抛出此异常。
+        ValueError: 如果地图中没有找到玩家 ('S')，则抛出此异常。
     """
+    if isinstance(map_, Grid):
+        # Grid 在底层字节缓冲区上查找，无需逐格比较字符串
+        location: Optional[Tuple[int, int]] = map_.find('S')
+        if location is None:
+            raise ValueError('Player not found')
+        return location
+
     # 遍历地图的每一行和每一列
     for i in range(len(map_)):
         for j in range(len(map_[i])):
@@ -35,19 +50,118 @@ def find_player(map_: list) -> Tuple[int, int]:
     raise ValueError('Player not found')
 
 
+def load_json_map(path: str) -> Tuple[Grid, Dict[str, List[Tuple[int, int]]]]:
+    """
+    读取 JSON 地图文件并建立图块索引。
+
+    参数:
+        path (str): 地图文件的路径，文件应为JSON格式。
+
+    返回:
+        Tuple[Grid, Dict[str, List[Tuple[int, int]]]]: 地图网格与图块索引。
+    """
+    # 打开并读取地图文件，解析为JSON格式
+    with open(path, 'r') as f:
+        rows: list = json.load(f)
+    # 转换为紧凑网格，释放逐格的字符串列表
+    map_: Grid = Grid.from_rows(rows)
+    del rows
+    return map_, build_tile_index(map_)
+
+
+def parse_json_map(data: memoryview) -> Tuple[Grid, Dict[str, List[Tuple[int, int]]]]:
+    """
+    解析 .labpack 中的 JSON 地图并建立图块索引。
+
+    参数:
+        data (memoryview): 归档映射上该地图文件的视图。
+
+    返回:
+        Tuple[Grid, Dict[str, List[Tuple[int, int]]]]: 地图网格与图块索引。
+    """
+    rows: list = json.loads(bytes(data))
+    map_: Grid = Grid.from_rows(rows)
+    del rows
+    return map_, build_tile_index(map_)
+
+
+# 地图文件扩展名到加载函数的映射，模组可以使用其中任意一种格式
+MAP_LOADERS: Final[Dict[str, Callable[[str], tuple]]] = {
+    '.json': load_json_map,
+    '.lmap': load_binary_map,
+    '.world': load_world
+}
+
+# .labpack 中的地图：扩展名到解析函数的映射，参数是归档映射上该文件的视图
+ARCHIVE_MAP_LOADERS: Final[Dict[str, Callable[[memoryview], tuple]]] = {
+    '.json': parse_json_map,
+    '.lmap': parse_binary_map
+}
+
+
+def parse_map(path: str) -> dict:
+    """
+    从磁盘读取并解析地图文件，不做任何缓存与错误处理。根据扩展名选择加载函数。
+    .labpack 中的地图（例如 ../mod/example.labpack/map/test.json）直接从归档的映射中解析。
+
+    参数:
+        path (str): 地图文件的路径，支持 JSON（.json）、二进制（.lmap）与开放世界（.world）格式。
+
+    返回:
+        dict: 与 read_map 相同结构的地图数据。
+
+    异常:
+        ValueError: 不支持的扩展名、地图格式错误，或起点数量不是恰好一个。
+        OSError / json.JSONDecodeError: 文件读取或解析失败。
+    """
+    extension: str = os.path.splitext(path)[1].lower()
+    archive: Optional[Tuple[str, str]] = split_archive_path(path)
+    loader: Optional[Callable[[Any], tuple]] = (MAP_LOADERS if archive is None else ARCHIVE_MAP_LOADERS).get(extension)
+    if loader is None:
+        raise ValueError(f'Unsupported map format: {extension}')
+    with METRICS.timer('read_map.parse'):
+        map_, index = loader(path if archive is None else open_pack(archive[0]).read(archive[1]))
+
+    # 校验起点唯一
+    if not index['S']:
+        raise ValueError('Player not found')
+    if len(index['S']) > 1:
+        raise ValueError(f'Map has {len(index["S"])} start points, expected exactly one')
+    player_y, player_x = index['S'][0]
+
+    # 构造包含地图数据和玩家位置的字典
+    map_data: dict = {
+        'map': map_,
+        'player_y': player_y,
+        'player_x': player_x,
+        'index': index,
+    }
+    # 转移表与原始地图一起编译一次，所有副本、引擎与求解器共享
+    map_data['transitions'] = transition_table(map_data)
+    return map_data
+
+
+# 已解析地图的进程内缓存，重新开始关卡时直接复制原始地图而不是重新解析
+MAP_CACHE: Final[MapCache] = MapCache(parse_map, stat=stat_path)
+
+
 def read_map(path) -> dict:
     """
     从指定路径读取地图文件并解析为字典格式。
 
+    地图经由 MAP_CACHE 读取：文件未变化时直接返回缓存中原始地图的一份新副本。
+
     参数:
-        path (str): 地图文件的路径，文件应为JSON格式。
+        path (str): 地图文件的路径，支持 JSON（.json）、二进制（.lmap）与开放世界（.world）格式。
 
     返回:
         dict: 包含地图数据和玩家位置的字典，结构如下：
             {
-                'map': list,          # 地图数据，二维列表形式
+                'map': Grid,          # 地图数据，紧凑网格（.lmap 为 ChunkedGrid，.world 为 WorldGrid），支持 map[y][x] 访问
                 'player_y': int,      # 玩家在地图中的行坐标
-                'player_x': int       # 玩家在地图中的列坐标
+                'player_x': int,      # 玩家在地图中的列坐标
+                'index': dict,        # 图块索引，见 build_tile_index（只读，多次游玩共享）
+                'transitions': TransitionTable  # 转移表，开放世界为 None（只读，多次游玩共享）
             }
 
     异常处理:
@@ -55,21 +169,8 @@ def read_map(path) -> dict:
         然后终止程序运行。
     """
     try:
-        # 打开并读取地图文件，解析为JSON格式
-        with open(path, 'r') as f:
-            map_: list = json.load(f)
-            # 查找玩家在地图中的初始位置
-            player_location: Tuple[int, int] = find_player(map_)
-            player_y: int = player_location[0]
-            player_x: int = player_location[1]
-
-        # 构造包含地图数据和玩家位置的字典
-        map_data: dict = {
-            'map': map_,
-            'player_y': player_y,
-            'player_x': player_x,
-        }
-        return map_data
+        with METRICS.timer('read_map'):
+            return MAP_CACHE.get(path)
 
     except Exception as e:
         # 清屏并记录错误日志
@@ -77,49 +178,25 @@ def read_map(path) -> dict:
         logging.error(f'Map load error: {e}')
         # 打印红色错误信息并退出程序
         print(f'{Fore.RED}地图解析时错误： {e}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         sys.exit()
 
 
-def print_map(map_: list, color_dict: dict, all_color: dict) -> None:
-    """
-    打印一个二维地图，每个单元格根据颜色字典进行着色。
-
-    参数:
-        map_ (list): 一个二维列表，表示地图的每一行和每一列。
-        color_dict (dict): 一部字典，键为地图中的单元格值，值为对应的颜色名称。
-        all_color (dict): 一部字典，键为颜色名称，值为对应的ANSI转义序列，用于在终端中显示颜色。
-
-    返回值:
-        None: 该函数不返回任何值，直接打印结果到标准输出。
-    """
-    # 初始化一个空列表，用于存储每一行的着色字符串
-    lines = []
-
-    # 遍历地图的每一行
-    for row in map_:
-        # 将当前行的每个单元格根据颜色字典进行着色，并拼接成一行字符串
-        line = ''.join(
-            f"{all_color[color_dict.get(cell, 'reset')]}{cell}"
-            for cell in row
-        )
-        # 将处理好的行字符串添加到lines列表中
-        lines.append(line)
-
-    # 将所有行用换行符连接，并打印到标准输出
-    print('\n'.join(lines))
-
-
-def map_loop(map_data: dict, color_dict: dict, all_color: dict) -> str:
+def map_loop(map_data: dict, color_dict: dict, all_color: dict, render_config: dict = None) -> str:
     """
     主循环函数，用于处理地图中的玩家移动和交互逻辑。
 
     参数:
         map_data (dict): 包含地图信息的字典，包括：
-            - 'map': 二维列表，表示游戏地图。
+            - 'map': Grid，紧凑网格（.lmap 为 ChunkedGrid，.world 为 WorldGrid），支持 map[y][x] 访问。
             - 'player_y': 玩家当前所在的行索引。
             - 'player_x': 玩家当前所在的列索引。
+            - 'index': 图块索引，见 build_tile_index（只读，多次游玩共享）。
+            - 'transitions': 转移表 TransitionTable，开放世界为 None（只读，多次游玩共享）。
+        color_dict (dict): 单元格字符到颜色名称的映射。
+        all_color (dict): 颜色名称到ANSI转义序列的映射。
+        render_config (dict): 渲染配置（镜头与死区），见 load_config_render。
 
     返回:
         str: 返回游戏状态，可能的值包括：
@@ -128,64 +205,48 @@ def map_loop(map_data: dict, color_dict: dict, all_color: dict) -> str:
             - 'back': 玩家选择退出游戏。
     """
     map_ = map_data['map']
-    player_y: int = map_data['player_y']
-    player_x: int = map_data['player_x']
-    start_y: int = player_y
-    start_x: int = player_x
-    flag = True
-
-    while flag:
-        # 备份当前位置的字符，以便后续恢复
-        original_char = map_[player_y][player_x]
-
-        # 将玩家当前位置标记为 'I'
-        map_[player_y][player_x] = 'I'
-
-        # 清屏并打印当前地图状态
-        clear()
-        print_map(map_, color_dict, all_color)
-
-        # 恢复地图中原有字符
-        map_[player_y][player_x] = original_char
-
-        # 获取玩家输入的按键
-        move = keyboard.read_key()
-        clear_button()
 
-        # 根据按键计算新的坐标
-        if move == 'w':
-            new_y, new_x = player_y - 1, player_x
-        elif move == 's':
-            new_y, new_x = player_y + 1, player_x
-        elif move == 'a':
-            new_y, new_x = player_y, player_x - 1
-        elif move == 'd':
-            new_y, new_x = player_y, player_x + 1
-        elif move == 'r':
-            flag = False
-            continue
-        elif move == 'esc':
-            break
-        else:
-            continue
-
-        # 判断新位置是否合法，并根据地图元素更新玩家位置
-        if map_[new_y][new_x] == '#':
-            continue
-        elif map_[new_y][new_x] in ['@', 'X']:
-            player_y, player_x = start_y, start_x
-        elif map_[new_y][new_x] == '>':
-            player_y, player_x = new_y, new_x + 2
-        elif map_[new_y][new_x] == '<':
-            player_y, player_x = new_y, new_x - 2
-        elif map_[new_y][new_x] == '^':
-            player_y, player_x = new_y - 2, new_x
-        elif map_[new_y][new_x] == 'v':
-            player_y, player_x = new_y + 2, new_x
-        elif map_[new_y][new_x] == 'E':
-            return 'win'
-        else:
-            player_y, player_x = new_y, new_x
-
-    # 根据循环结束条件返回对应的游戏状态
-    return 'reload' if not flag else 'back'
+    # 移动规则由无输入输出的引擎负责，这里只处理按键与渲染
+    engine = Engine(map_data)
+    state: GameState = engine.state
+
+    # 开放世界没有边界可言，总是只绘制玩家周围的视口，并在玩家移动后预取前方的区块
+    world: Optional[WorldGrid] = map_ if isinstance(map_, WorldGrid) else None
+    if world is not None:
+        render_config = {**(render_config or {}), 'camera': True}
+        world.visit(state.player_y, state.player_x)
+
+    # 增量渲染器：首帧整屏绘制，之后只重绘发生变化的单元格
+    renderer = FrameRenderer(color_dict, all_color, render_config)
+
+    # 终端按键输入：整个循环期间独占输入，并丢弃进入地图之前残留的按键
+    keys: KeyInput = get_input()
+    with keys.capture():
+        keys.flush()
+
+        # 两次渲染之间的最短间隔
+        frame_interval: float = 1 / renderer.config['fps']
+
+        while True:
+            # 渲染当前地图状态，玩家位置以 'I' 覆盖显示
+            frame_start: float = time.monotonic()
+            renderer.render(map_, state.player_y, state.player_x)
+            # 从这一批按键中第一个按键到达到画面绘制完成的延迟
+            if keys.batch_started is not None:
+                METRICS.record('input_to_paint', time.perf_counter() - keys.batch_started)
+
+            # 等待按键，并收集到下一帧之前到达的所有按键；按住按键时不会积压未处理的移动
+            moves: List[str] = keys.read_batch(frame_start + frame_interval)
+
+            # 整批交给引擎推进，并根据事件决定是否结束循环
+            for move in moves:
+                # p 把性能指标写入日志
+                if move == 'p':
+                    METRICS.flush()
+                    continue
+                state, event = engine.step(move)
+                if event in (WIN, RELOAD, BACK):
+                    renderer.close()
+                    return event
+            if world is not None:
+                world.visit(state.player_y, state.player_x)
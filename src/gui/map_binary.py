@@ -0,0 +1,400 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import *
+
+from gui.grid import *
+
+# 二进制地图文件（.lmap）格式，所有整数均为小端序：
+#
+#   文件头      HEADER
+#   宽字符表    wide_count 个 WIDE_ENTRY：(编码, Unicode 码位)，对应 Grid.codes
+#   区块目录    chunks_y * chunks_x 个 u64，每个区块数据在文件中的偏移，内容相同的区块共享同一偏移
+#   图块索引    index_count 个 INDEX_ENTRY：(图块编码, 行, 列)，对应 build_tile_index 的结果，
+#               按 INDEXED_TILES 的顺序逐个图块连续存放
+#   区块数据    每块 chunk_size * chunk_size 字节，行优先，地图边缘的区块以空格补齐
+MAGIC: Final[bytes] = b'LMAP'
+VERSION: Final[int] = 1
+DEFAULT_CHUNK_SIZE: Final[int] = 64
+HEADER: Final[struct.Struct] = struct.Struct('<4sHHIIIIIIQQ')
+WIDE_ENTRY: Final[struct.Struct] = struct.Struct('<BI')
+INDEX_ENTRY: Final[struct.Struct] = struct.Struct('<BII')
+PADDING: Final[int] = ord(' ')
+
+
+class ChunkedRow:
+    """
+    ChunkedGrid 中某一行的视图，提供与 GridRow 相同的接口。
+    """
+
+    __slots__ = ('grid', 'y')
+
+    def __init__(self, grid: 'ChunkedGrid', y: int):
+        self.grid: ChunkedGrid = grid
+        self.y: int = y
+
+    def __len__(self) -> int:
+        return self.grid.width
+
+    def __getitem__(self, x: int) -> str:
+        return self.grid.get(self.y, self.grid.check_x(x))
+
+    def __setitem__(self, x: int, cell: str) -> None:
+        self.grid.set(self.y, self.grid.check_x(x), cell)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.grid.get(self.y, x) for x in range(self.grid.width))
+
+
+class ChunkedGrid:
+    """
+    基于内存映射的分块地图网格，接口与 Grid 相同。
+
+    区块数据直接从 mmap 中读取，只有被访问到的区块才会由操作系统调入内存。
+    写入采用写时复制：被修改的区块复制到 overlay 中，文件本身不会被改动，
+    多个副本共享同一个映射。
+    """
+
+    __slots__ = ('height', 'width', 'chunk_size', 'chunks_x', 'mm', 'directory', 'overlay', 'tiles', 'codes')
+
+    def __init__(self, height: int, width: int, chunk_size: int, mm: mmap.mmap, directory: array,
+                 tiles: List[str], codes: Dict[str, int], overlay: Dict[int, bytearray] = None):
+        """
+        参数:
+            height (int): 行数。
+            width (int): 列数。
+            chunk_size (int): 区块边长。
+            mm (mmap.mmap): 整个地图文件的只读映射（也可以是 .labpack 映射中该文件的 memoryview）。
+            directory (array): 区块目录，区块编号到文件偏移。
+            tiles (List[str]): 编码到字符的映射表（长度为 256）。
+            codes (Dict[str, int]): 非 Latin-1 字符到编码的映射表。
+            overlay (Dict[int, bytearray]): 被修改过的区块。
+        """
+        self.height: int = height
+        self.width: int = width
+        self.chunk_size: int = chunk_size
+        self.chunks_x: int = -(-width // chunk_size)
+        self.mm: mmap.mmap = mm
+        self.directory: array = directory
+        self.overlay: Dict[int, bytearray] = overlay if overlay is not None else {}
+        self.tiles: List[str] = tiles
+        self.codes: Dict[str, int] = codes
+
+    check_x = Grid.check_x
+    check_y = Grid.check_y
+    encode = Grid.encode
+
+    def locate(self, y: int, x: int) -> Tuple[int, int]:
+        """
+        返回：
+            Tuple[int, int]: (区块编号, 区块内偏移)。
+        """
+        size: int = self.chunk_size
+        chunk_y, inner_y = divmod(y, size)
+        chunk_x, inner_x = divmod(x, size)
+        return chunk_y * self.chunks_x + chunk_x, inner_y * size + inner_x
+
+    def code_at(self, y: int, x: int) -> int:
+        """
+        O(1) 读取 (y, x) 处的图块编码。
+        """
+        chunk, inner = self.locate(y, x)
+        modified: Optional[bytearray] = self.overlay.get(chunk)
+        if modified is not None:
+            return modified[inner]
+        return self.mm[self.directory[chunk] + inner]
+
+    def get(self, y: int, x: int) -> str:
+        """
+        O(1) 读取 (y, x) 处的字符，不做负下标处理。
+        """
+        return self.tiles[self.code_at(y, x)]
+
+    def set(self, y: int, x: int, cell: str) -> None:
+        """
+        写入 (y, x) 处的字符；首次修改某个区块时把它复制到 overlay。
+        """
+        chunk, inner = self.locate(y, x)
+        modified: Optional[bytearray] = self.overlay.get(chunk)
+        if modified is None:
+            offset: int = self.directory[chunk]
+            modified = bytearray(self.mm[offset:offset + self.chunk_size * self.chunk_size])
+            self.overlay[chunk] = modified
+        modified[inner] = self.encode(cell)
+
+    def row_codes(self, y: int) -> bytes:
+        """
+        返回：
+            bytes: 第 y 行的图块编码，由该行经过的各个区块拼接而成。
+        """
+        size: int = self.chunk_size
+        chunk_y, inner_y = divmod(y, size)
+        parts: List[bytes] = []
+        for chunk_x in range(self.chunks_x):
+            chunk: int = chunk_y * self.chunks_x + chunk_x
+            modified: Optional[bytearray] = self.overlay.get(chunk)
+            if modified is not None:
+                parts.append(bytes(modified[inner_y * size:(inner_y + 1) * size]))
+            else:
+                offset: int = self.directory[chunk] + inner_y * size
+                parts.append(self.mm[offset:offset + size])
+        return b''.join(parts)[:self.width]
+
+    def copy(self) -> 'ChunkedGrid':
+        """
+        返回：
+            ChunkedGrid: 共享映射、拥有独立 overlay 的副本。
+        """
+        overlay: Dict[int, bytearray] = {chunk: bytearray(data) for chunk, data in self.overlay.items()}
+        return ChunkedGrid(self.height, self.width, self.chunk_size, self.mm, self.directory,
+                           self.tiles, self.codes, overlay)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        返回：
+            int: 驻留在 Python 堆上的字节数（区块目录与被修改的区块）。
+        """
+        return self.directory.itemsize * len(self.directory) + sum(len(data) for data in self.overlay.values())
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, y: int) -> ChunkedRow:
+        return ChunkedRow(self, self.check_y(y))
+
+    def __iter__(self) -> Iterator[ChunkedRow]:
+        return (ChunkedRow(self, y) for y in range(self.height))
+
+
+class BinaryTileIndex(Mapping[str, List[Tuple[int, int]]]):
+    """
+    二进制地图的图块索引，接口与 build_tile_index 的结果相同（只读）。
+
+    索引项留在映射中，解析时只记录每种图块的索引项范围，
+    取某种图块时才解码它的坐标，每次取用都得到新的列表。
+    """
+
+    __slots__ = ('entries', 'ranges')
+
+    def __init__(self, entries: memoryview, ranges: Dict[str, Tuple[int, int]]):
+        """
+        参数:
+            entries (memoryview): 映射中的全部索引项。
+            ranges (Dict[str, Tuple[int, int]]): 图块到其索引项编号范围 [起, 止) 的映射。
+        """
+        self.entries: memoryview = entries
+        self.ranges: Dict[str, Tuple[int, int]] = ranges
+
+    def __getitem__(self, tile: str) -> List[Tuple[int, int]]:
+        start, stop = self.ranges[tile]
+        return [(y, x) for _, y, x in INDEX_ENTRY.iter_unpack(self.entries[start * INDEX_ENTRY.size:
+                                                                           stop * INDEX_ENTRY.size])]
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ranges)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        返回：
+            int: 驻留在 Python 堆上的字节数（各图块的范围），索引项本身在映射中不计入。
+        """
+        return sys.getsizeof(self.ranges) + sum(sys.getsizeof(bounds) for bounds in self.ranges.values())
+
+
+def load_binary_map(path: str) -> Tuple[ChunkedGrid, BinaryTileIndex]:
+    """
+    以内存映射方式打开二进制地图文件，只读取文件头、区块目录和图块索引。
+
+    参数:
+        path (str): .lmap 文件路径。
+
+    返回:
+        Tuple[ChunkedGrid, BinaryTileIndex]: 地图网格与图块索引。
+
+    异常:
+        ValueError: 文件不是合法的二进制地图。
+    """
+    with open(path, 'rb') as f:
+        mm: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return parse_binary_map(mm)
+
+
+def parse_binary_map(mm: Union[mmap.mmap, memoryview]) -> Tuple[ChunkedGrid, BinaryTileIndex]:
+    """
+    从已映射的二进制地图数据中读取文件头、区块目录和图块索引，区块数据与索引项都不复制。
+
+    参数:
+        mm (Union[mmap.mmap, memoryview]): 整个地图文件的映射，或 .labpack 映射中该文件的视图。
+
+    返回:
+        Tuple[ChunkedGrid, BinaryTileIndex]: 地图网格与图块索引。
+
+    异常:
+        ValueError: 数据不是合法的二进制地图。
+    """
+    if len(mm) < HEADER.size:
+        raise ValueError('Binary map is truncated')
+    (magic, version, chunk_size, height, width, start_y, start_x,
+     index_count, wide_count, directory_offset, index_offset) = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ValueError('Not a binary map file')
+    if version != VERSION:
+        raise ValueError(f'Unsupported binary map version: {version}')
+    if not height or not width or not chunk_size:
+        raise ValueError('Map is empty')
+
+    # 宽字符表
+    tiles: List[str] = [chr(i) for i in range(256)]
+    codes: Dict[str, int] = {}
+    for code, codepoint in WIDE_ENTRY.iter_unpack(mm[HEADER.size:HEADER.size + WIDE_ENTRY.size * wide_count]):
+        tiles[code] = chr(codepoint)
+        codes[chr(codepoint)] = code
+
+    # 区块目录
+    chunk_count: int = -(-height // chunk_size) * -(-width // chunk_size)
+    directory: array = array('Q')
+    directory.frombytes(mm[directory_offset:directory_offset + 8 * chunk_count])
+    if sys.byteorder != 'little':
+        directory.byteswap()
+    chunk_bytes: int = chunk_size * chunk_size
+    if len(directory) != chunk_count or any(offset + chunk_bytes > len(mm) for offset in directory):
+        raise ValueError('Binary map chunk directory is corrupt')
+
+    # 图块索引：只取出每个索引项的编码字节，确定每种图块的连续范围
+    entries: memoryview = memoryview(mm)[index_offset:index_offset + INDEX_ENTRY.size * index_count]
+    if len(entries) != INDEX_ENTRY.size * index_count:
+        raise ValueError('Binary map tile index is truncated')
+    kinds: bytes = entries[::INDEX_ENTRY.size].tobytes()
+    ranges: Dict[str, Tuple[int, int]] = {}
+    start: int = 0
+    for tile in INDEXED_TILES:
+        code: int = codes.get(tile, ord(tile))
+        stop: int = start + kinds.count(code)
+        if kinds[start:stop] != bytes([code]) * (stop - start):
+            raise ValueError('Binary map tile index is not grouped by tile')
+        ranges[tile] = (start, stop)
+        start = stop
+    if start != index_count:
+        raise ValueError('Binary map tile index contains unknown tiles')
+    index: BinaryTileIndex = BinaryTileIndex(entries, ranges)
+    if index['S'] and index['S'][0] != (start_y, start_x):
+        raise ValueError('Binary map start point does not match its tile index')
+
+    return ChunkedGrid(height, width, chunk_size, mm, directory, tiles, codes), index
+
+
+def write_binary_map(map_: Grid, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """
+    将网格写成二进制地图文件，内容完全相同的区块只写一次。
+
+    参数:
+        map_ (Grid): 要写出的地图。
+        path (str): 输出文件路径。
+        chunk_size (int): 区块边长。
+    """
+    index: Dict[str, List[Tuple[int, int]]] = build_tile_index(map_)
+    starts: List[Tuple[int, int]] = index['S']
+    start_y, start_x = starts[0] if starts else (0, 0)
+    entries: List[Tuple[int, int, int]] = [
+        (map_.encode(tile), y, x) for tile in INDEXED_TILES for y, x in index[tile]
+    ]
+
+    chunks_y: int = -(-map_.height // chunk_size)
+    chunks_x: int = -(-map_.width // chunk_size)
+    directory_offset: int = HEADER.size + WIDE_ENTRY.size * len(map_.codes)
+    index_offset: int = directory_offset + 8 * chunks_y * chunks_x
+    data_offset: int = index_offset + INDEX_ENTRY.size * len(entries)
+
+    # 切分区块并去重
+    directory: array = array('Q')
+    unique: Dict[bytes, int] = {}
+    blobs: List[bytes] = []
+    for chunk_y in range(chunks_y):
+        for chunk_x in range(chunks_x):
+            chunk: bytearray = bytearray([PADDING]) * (chunk_size * chunk_size)
+            left: int = chunk_x * chunk_size
+            right: int = min(left + chunk_size, map_.width)
+            for inner_y in range(chunk_size):
+                y: int = chunk_y * chunk_size + inner_y
+                if y >= map_.height:
+                    break
+                row_offset: int = y * map_.width
+                chunk[inner_y * chunk_size:inner_y * chunk_size + right - left] = \
+                    map_.data[row_offset + left:row_offset + right]
+            blob: bytes = bytes(chunk)
+            offset: Optional[int] = unique.get(blob)
+            if offset is None:
+                offset = data_offset + len(blobs) * len(blob)
+                unique[blob] = offset
+                blobs.append(blob)
+            directory.append(offset)
+    if sys.byteorder != 'little':
+        directory.byteswap()
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, chunk_size, map_.height, map_.width, start_y, start_x,
+                            len(entries), len(map_.codes), directory_offset, index_offset))
+        for cell, code in map_.codes.items():
+            f.write(WIDE_ENTRY.pack(code, ord(cell)))
+        f.write(directory.tobytes())
+        for entry in entries:
+            f.write(INDEX_ENTRY.pack(*entry))
+        for blob in blobs:
+            f.write(blob)
+
+
+def convert(source: str, target: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """
+    将 JSON 地图转换为二进制地图。
+
+    参数:
+        source (str): JSON 地图路径。
+        target (str): 输出路径，默认把扩展名替换为 .lmap。
+        chunk_size (int): 区块边长。
+
+    返回:
+        str: 输出文件路径。
+    """
+    if target is None:
+        target = f'{os.path.splitext(source)[0]}.lmap'
+    with open(source, 'r', encoding='utf-8') as f:
+        map_: Grid = Grid.from_rows(json.load(f))
+    write_binary_map(map_, target, chunk_size)
+    return target
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：python -m gui.map_binary <地图.json> [输出.lmap] [--chunk N]
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    invalid: bool = False
+    if '--chunk' in args:
+        position: int = args.index('--chunk')
+        # --chunk 位于末尾（缺少取值）或取值不是整数时，提示用法
+        try:
+            chunk_size = int(args[position + 1])
+        except (IndexError, ValueError):
+            invalid = True
+        else:
+            del args[position:position + 2]
+    if invalid or not 1 <= len(args) <= 2 or not 1 <= chunk_size <= 0xFFFF:
+        print('用法: python -m gui.map_binary <地图.json> [输出.lmap] [--chunk N]')
+        return 2
+
+    target: str = convert(args[0], args[1] if len(args) == 2 else None, chunk_size)
+    print(f'已写出 {target}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import logging
+import os
+import sys
+from collections import OrderedDict
+from typing import *
+
+# 默认缓存预算：所有缓存地图网格占用的字节数上限
+DEFAULT_BUDGET: Final[int] = 64 * 1024 * 1024
+# 图块索引中每个坐标除列表指针外的开销：一个二元组与两个整数
+INDEX_ENTRY_BYTES: Final[int] = sys.getsizeof((0, 0)) + 2 * sys.getsizeof(1 << 20)
+
+
+class MapCache:
+    """
+    进程内的已解析地图缓存。
+
+    以文件路径为键，并记录文件的 mtime 与大小，文件在磁盘上被修改后自动失效。
+    缓存中保存的是未被游玩过的原始地图，每次取用都会得到一份独立的网格副本，
+    因此玩家按 'r' 重新开始时无需再次读取和解析地图文件。
+    超出内存预算时按最近最少使用（LRU）顺序淘汰，预算同时计入网格、图块索引与转移表。
+    """
+
+    def __init__(self, loader: Callable[[str], dict], budget: int = DEFAULT_BUDGET,
+                 stat: Callable[[str], os.stat_result] = os.stat):
+        """
+        参数:
+            loader (Callable[[str], dict]): 缓存未命中时用于解析地图文件的函数。
+            budget (int): 缓存地图网格占用的字节数上限。
+            stat (Callable[[str], os.stat_result]): 取得文件 mtime 与大小的函数，默认为 os.stat。
+        """
+        self.loader: Callable[[str], dict] = loader
+        self.stat: Callable[[str], os.stat_result] = stat
+        self.budget: int = budget
+        self.entries: 'OrderedDict[str, Tuple[int, int, dict]]' = OrderedDict()
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def footprint(map_data: dict) -> int:
+        """
+        返回：
+            int: 一份地图数据占用的内存字节数：网格（内存映射的部分不计入）加上图块索引与转移表。
+            密集的地图上图块索引可能比网格本身还大；二进制地图的索引留在映射中，由其 nbytes 给出。
+        """
+        index: Mapping = map_data['index']
+        index_bytes: Optional[int] = getattr(index, 'nbytes', None)
+        if index_bytes is None:
+            index_bytes = sum(sys.getsizeof(positions) + len(positions) * INDEX_ENTRY_BYTES
+                              for positions in index.values())
+        transitions: Any = map_data.get('transitions')
+        return map_data['map'].nbytes + index_bytes + (transitions.nbytes if transitions is not None else 0)
+
+    @staticmethod
+    def fresh_copy(map_data: dict) -> dict:
+        """
+        为一次游玩生成地图数据副本：网格复制一份，图块索引与转移表只读共享。
+
+        参数:
+            map_data (dict): 缓存中的原始地图数据。
+
+        返回:
+            dict: 可以被随意修改网格的新地图数据。
+        """
+        copied: dict = dict(map_data)
+        copied['map'] = map_data['map'].copy()
+        return copied
+
+    def get(self, path: str) -> dict:
+        """
+        取得指定地图文件的一份新副本，必要时从磁盘解析。
+
+        参数:
+            path (str): 地图文件路径。
+
+        返回:
+            dict: 与 read_map 相同结构的地图数据。
+
+        异常:
+            OSError 以及 loader 抛出的任何异常都会原样向上传递。
+        """
+        stat: os.stat_result = self.stat(path)
+        key: str = os.path.abspath(path)
+        entry: Optional[Tuple[int, int, dict]] = self.entries.get(key)
+
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            logging.info(f'Map cache hit: {path} (hits={self.hits}, misses={self.misses})')
+            return self.fresh_copy(entry[2])
+
+        self.misses += 1
+        logging.info(f'Map cache miss: {path} (hits={self.hits}, misses={self.misses})')
+        if entry is not None:
+            self.discard(key)
+
+        map_data: dict = self.loader(path)
+        self.store(key, stat, map_data)
+        return self.fresh_copy(map_data)
+
+    def store(self, key: str, stat: os.stat_result, map_data: dict) -> None:
+        """
+        将原始地图放入缓存，并按 LRU 淘汰超出预算的条目。
+        单张地图超过整个预算时不缓存。
+        """
+        footprint: int = self.footprint(map_data)
+        if footprint > self.budget:
+            logging.info(f'Map too large to cache: {key} ({footprint} bytes)')
+            return
+
+        self.entries[key] = (stat.st_mtime_ns, stat.st_size, map_data)
+        self.size += footprint
+        while self.size > self.budget:
+            evicted: str = next(iter(self.entries))
+            self.discard(evicted)
+            logging.info(f'Map cache evicted: {evicted}')
+
+    def discard(self, key: str) -> None:
+        """
+        从缓存中移除一个条目。
+        """
+        entry: Optional[Tuple[int, int, dict]] = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= self.footprint(entry[2])
+
+    def clear(self) -> None:
+        """
+        清空缓存（命中与未命中计数保留）。
+        """
+        self.entries.clear()
+        self.size = 0
@@ -1,18 +1,28 @@
 import json
 import logging
 import sys
+from typing import *
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
+from gui.key_input import KeyInput, get_input
+from gui.menu_view import INDEX_REFRESH, MenuView
+from load_config.config_store import CONFIG_STORE
 
-init(autoreset=True)
+
+def parse_menu(path: str) -> list:
+    """
+    以UTF-8编码读取并解析菜单文件，失败时抛出异常。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        menu: list = json.load(f)
+        return menu
 
 
 def read_menu(path: str) -> list:
     """
-    从指定路径加载菜单数据并返回。
+    从指定路径加载菜单数据并返回。文件只在第一次读取和内容变化时解析，其余时候返回缓存的菜单。
 
     参数:
         path (str): 菜单文件的路径，文件应为JSON格式。
@@ -25,10 +35,8 @@ def read_menu(path: str) -> list:
         并等待用户按键后退出程序。
     """
     try:
-        # 尝试以UTF-8编码打开文件并加载JSON数据
-        with open(path, 'r', encoding='utf-8') as f:
-            menu: list = json.load(f)
-            return menu
+        # 从配置缓存中读取菜单数据
+        return CONFIG_STORE.get(path, parse_menu)
 
     except Exception as e:
         # 清屏并记录错误日志
@@ -37,84 +45,91 @@ def read_menu(path: str) -> list:
         # 打印红色错误信息提示用户
         print(Fore.RED + f'菜单读取时发生错误： {e}')
         # 等待用户按键（抑制按键输出）后退出程序
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         sys.exit(0)
 
 
-def load_menu(menu: list, choose: int) -> str:
-    """
-    加载并显示菜单选项，高亮当前选中的选项，并等待用户按键输入。
-
-    参数:
-        menu (list): 菜单选项列表，每个元素为一个字符串。
-        choose (int): 当前选中的菜单项索引（从0开始）。
-
-    返回:
-        str: 用户按下的键值（通过keyboard.read_key获取）。
-    """
-    # 构建菜单内容为一个字符串列表
-    menu_lines = []
-    # 如果当前索引等于choose，则使用白色背景和黑色字体高亮显示
-    for i in range(len(menu)):
-        if i == choose:
-            menu_lines.append(f'{Back.WHITE}{Fore.BLACK}{i + 1}. {menu[i]}{Style.RESET_ALL}')
-        else:
-            menu_lines.append(f'{i + 1}. {menu[i]}{Style.RESET_ALL}')
-
-    # 一次性输出整个菜单
-    print('\n'.join(menu_lines))
-
-    # 等待用户按键输入，并返回按键值
-    move: str = keyboard.read_key()
-    clear_button()
-    return move
-
-
-def menu_loop(menu: list) -> int:
+def menu_loop(menu: Sequence[str]) -> int:
     """
     循环显示菜单并处理用户输入，直到用户选择一个选项为止。
 
+    菜单高于终端时在窗口中滚动显示；上下移动时只重绘新旧两个菜单项。
+    按键说明：
+        w / s / 上 / 下: 移动选择（首尾循环）
+        数字: 跳转到对应编号的菜单项，可连续输入多位数字
+        /: 输入过滤文字，回车结束输入，esc 清除过滤
+        空格 / 回车: 确认选择
+
     参数:
-        menu (list): 菜单项列表，每个元素代表一个菜单项。
+        menu (Sequence[str]): 菜单项序列，每个元素代表一个菜单项，可以是 LazyMenu。
 
     返回:
-        int: 用户选择的菜单项索引。
+        int: 用户选择的菜单项在原菜单中的索引。
     """
-
-    def trigger(choose_: int) -> int:
-        """
-        处理选择索引越界的情况，确保索引在有效范围内循环。
-
-        参数:
-            choose_ (int): 当前选择的索引。
-
-        返回:
-            int: 处理后的有效索引。
-        """
-        if choose_ < 0:
-            choose_: int = len(menu) - 1
-        elif choose_ >= len(menu):
-            choose_: int = 0
-        return choose_
-
-    choose: int = 0
-
-    while True:
-        # 清屏并加载菜单显示
-        clear()
-        move = load_menu(menu, choose)
-
-        # 处理用户输入：向上移动选择
-        if move == 'w':
-            choose -= 1
-            choose = trigger(choose)
-
-        # 处理用户输入：向下移动选择
-        elif move == 's':
-            choose += 1
-            choose = trigger(choose)
-
-        # 处理用户输入：确认选择
-        elif move == 'space':
-            return choose
+    view: MenuView = MenuView(menu)
+    view.draw()
+    digits: str = ''
+
+    # 终端按键输入：整个循环期间独占输入，并丢弃打开菜单之前残留的按键
+    keys: KeyInput = get_input()
+    with keys.capture():
+        keys.flush()
+
+        while True:
+            # 搜索索引在后台建立期间定时刷新过滤结果
+            move: Optional[str] = keys.read_key(INDEX_REFRESH if view.indexing() else None)
+            if move is None:
+                view.refresh()
+                continue
+
+            # 过滤输入模式：可打印字符追加到过滤文字
+            if view.typing:
+                if move == 'enter':
+                    view.typing = False
+                    view.draw()
+                elif move == 'esc':
+                    view.typing = False
+                    view.set_query('')
+                elif move == 'backspace':
+                    view.set_query(view.query[:-1])
+                elif move == 'space':
+                    view.set_query(view.query + ' ')
+                elif move == 'up':
+                    view.move_to(view.cursor - 1)
+                elif move == 'down':
+                    view.move_to(view.cursor + 1)
+                elif len(move) == 1:
+                    view.set_query(view.query + move)
+                continue
+
+            # 连续输入的数字组成编号；编号不存在时从当前数字重新开始
+            if len(move) == 1 and move.isdigit():
+                digits += move
+                if not view.jump(int(digits)):
+                    digits = move
+                    view.jump(int(digits))
+                continue
+            digits = ''
+
+            # 处理用户输入：向上移动选择
+            if move in ('w', 'up'):
+                view.move_to(view.cursor - 1)
+
+            # 处理用户输入：向下移动选择
+            elif move in ('s', 'down'):
+                view.move_to(view.cursor + 1)
+
+            # 处理用户输入：进入过滤模式
+            elif move == '/':
+                view.typing = True
+                view.set_query(view.query)
+
+            # 处理用户输入：清除过滤
+            elif move == 'esc' and view.query:
+                view.set_query('')
+
+            # 处理用户输入：确认选择
+            elif move in ('space', 'enter') and view.selected() is not None:
+                view.close()
+                return view.selected()
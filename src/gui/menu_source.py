@@ -0,0 +1,132 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import *
+
+# 每个 LazyMenu 缓存的条目数上限
+DEFAULT_CACHE_SIZE: Final[int] = 256
+
+# 所有 LazyMenu 共用的后台预取线程
+PREFETCH_EXECUTOR: Final[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=1, thread_name_prefix='menu-prefetch')
+
+
+class LazyMenu:
+    """
+    按需生成条目的虚拟菜单数据源。
+
+    与 list 一样支持 len() 和下标访问，但条目只有在被访问时才通过 load(i) 生成，
+    生成结果保存在一个容量有限的 LRU 缓存中。menu_loop 只会访问当前页的条目，
+    绘制前调用 preload 一次性生成整页条目，并在绘制后调用 prefetch 让后台线程提前准备下一页。
+    提供 load_batch 时，整页条目通过它批量生成（例如在线程池中并发读取文件）。
+    """
+
+    def __init__(self, count: int, load: Callable[[int], Any], entry_height: int = 1,
+                 cache_size: int = DEFAULT_CACHE_SIZE, load_batch: Callable[[List[int]], List[Any]] = None):
+        """
+        参数:
+            count (int): 条目总数。
+            load (Callable[[int], Any]): 生成第 i 个条目的函数，可能在后台线程中调用。
+            entry_height (int): 每个条目显示时占用的行数，用于计算每页条目数。
+            cache_size (int): LRU 缓存的容量。
+            load_batch (Callable[[List[int]], List[Any]]): 按顺序生成一批条目的函数，可选。
+        """
+        self.count: int = count
+        self.load: Callable[[int], Any] = load
+        self.load_batch: Optional[Callable[[List[int]], List[Any]]] = load_batch
+        self.entry_height: int = entry_height
+        self.cache_size: int = cache_size
+        self.cache: 'OrderedDict[int, Any]' = OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> Any:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('LazyMenu index out of range')
+
+        with self.lock:
+            if i in self.cache:
+                self.cache.move_to_end(i)
+                return self.cache[i]
+
+        # 生成条目时不持有锁，避免阻塞另一线程；重复生成的结果相同，后写入者覆盖即可
+        value: Any = self.load(i)
+        self.store([i], [value])
+        return value
+
+    def store(self, indexes: List[int], values: List[Any]) -> None:
+        """
+        把生成的条目写入缓存，超出容量时淘汰最久未访问的条目。
+        """
+        with self.lock:
+            for i, value in zip(indexes, values):
+                self.cache[i] = value
+                self.cache.move_to_end(i)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self[i] for i in range(self.count))
+
+    def prefetch(self, start: int, stop: int) -> None:
+        """
+        在后台线程中生成 [start, stop) 范围内尚未缓存的条目。
+
+        参数:
+            start (int): 起始下标（含）。
+            stop (int): 结束下标（不含）。
+        """
+        start, stop = max(start, 0), min(stop, self.count)
+        with self.lock:
+            missing: List[int] = [i for i in range(start, stop) if i not in self.cache]
+        if missing:
+            PREFETCH_EXECUTOR.submit(self.fill, missing)
+
+    def preload(self, indexes: Iterable[int]) -> None:
+        """
+        生成指定下标中尚未缓存的条目；有 load_batch 时一次批量生成。
+
+        参数:
+            indexes (Iterable[int]): 条目下标，越界的下标被忽略。
+        """
+        with self.lock:
+            missing: List[int] = [i for i in indexes if 0 <= i < self.count and i not in self.cache]
+        if not missing:
+            return
+        if self.load_batch is None:
+            for i in missing:
+                self[i]
+            return
+        self.store(missing, self.load_batch(missing))
+
+    def generate(self, indexes: List[int]) -> List[Any]:
+        """
+        生成指定下标的条目但不写入缓存（已缓存的直接使用），用于建立搜索索引这类一次性遍历，
+        不会挤掉当前页的缓存。可以在后台线程中调用。
+
+        参数:
+            indexes (List[int]): 条目下标。
+
+        返回:
+            List[Any]: 与 indexes 顺序相同的条目。
+        """
+        with self.lock:
+            values: Dict[int, Any] = {i: self.cache[i] for i in indexes if i in self.cache}
+        missing: List[int] = [i for i in indexes if i not in values]
+        if missing:
+            loaded: List[Any] = self.load_batch(missing) if self.load_batch is not None else [self.load(i) for i in missing]
+            values.update(zip(missing, loaded))
+        return [values[i] for i in indexes]
+
+    def fill(self, indexes: List[int]) -> None:
+        """
+        生成指定下标的条目，由预取线程调用。
+        """
+        try:
+            self.preload(indexes)
+        except Exception as e:
+            logging.error(f'Menu prefetch error: {e}')
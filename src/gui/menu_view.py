@@ -0,0 +1,345 @@
+import logging
+import re
+import shutil
+import sys
+import threading
+import time
+from typing import *
+
+from colorama import Back, Fore, Style
+
+from gui.menu_source import PREFETCH_EXECUTOR
+from gui.render import CLEAR_SCREEN, CURSOR_HOME, RESET_ALL, move_cursor
+from load_log.metrics import METRICS
+
+# 行尾清除序列：局部重绘时擦掉旧内容的残留
+CLEAR_LINE: Final[str] = '\x1b[K'
+
+# 用于从菜单项中去掉颜色等转义序列
+ANSI_PATTERN: Final[re.Pattern] = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+# 三元组索引的长度，短于它的查询退化为线性扫描
+GRAM: Final[int] = 3
+
+# 后台建立索引时每个任务处理的菜单项数；任务之间预取线程可以穿插生成当前页
+INDEX_CHUNK: Final[int] = 256
+# 索引建立期间，过滤输入模式下等待按键的最长时间（秒），超时后用已建立的部分刷新结果
+INDEX_REFRESH: Final[float] = 0.2
+
+
+def plain_text(text: str) -> str:
+    """
+    返回：
+        str: 去掉转义序列并转为小写后的文本，用于搜索。
+    """
+    return ANSI_PATTERN.sub('', str(text)).lower()
+
+
+class SearchIndex:
+    """
+    菜单项文本的预计算搜索索引。
+
+    为每个菜单项保存去掉颜色后的小写文本，并建立三元组到菜单项下标的倒排表。
+    查询长度不小于 3 时先用倒排表求交集得到候选，再逐个确认子串匹配；
+    查询在上一次查询的基础上追加字符时，只在上一次的结果中继续过滤。
+
+    索引可以按顺序分批建立（extend），建立完成之前只搜索已经建立索引的前缀。
+    """
+
+    def __init__(self, menu: Sequence[str], build: bool = True):
+        """
+        参数:
+            menu (Sequence[str]): 菜单项序列。
+            build (bool): 是否立即为所有菜单项建立索引；为 False 时由调用者分批调用 extend。
+        """
+        self.menu: Sequence[str] = menu
+        self.texts: List[str] = []
+        self.grams: Dict[str, List[int]] = {}
+        # 后台线程追加索引时与搜索互斥
+        self.lock: threading.Lock = threading.Lock()
+        self.stopped: bool = False
+        self.last_query: str = ''
+        self.last_result: List[int] = []
+        # 上一次查询时已经建立索引的菜单项数
+        self.last_loaded: int = 0
+        if build:
+            self.extend(len(menu))
+            self.last_result, self.last_loaded = list(range(len(self.texts))), len(self.texts)
+
+    @property
+    def complete(self) -> bool:
+        return len(self.texts) >= len(self.menu)
+
+    def extend(self, count: int) -> None:
+        """
+        为接下来的 count 个菜单项建立索引。菜单项文本在锁外生成，
+        LazyMenu 通过 generate 生成，不占用它的缓存。
+        """
+        start: int = len(self.texts)
+        indexes: List[int] = list(range(start, min(start + count, len(self.menu))))
+        if hasattr(self.menu, 'generate'):
+            items: List[str] = self.menu.generate(indexes)
+        else:
+            items = [self.menu[i] for i in indexes]
+        texts: List[str] = [plain_text(item) for item in items]
+        with self.lock:
+            for i, text in enumerate(texts, start):
+                for gram in {text[j:j + GRAM] for j in range(len(text) - GRAM + 1)}:
+                    self.grams.setdefault(gram, []).append(i)
+            self.texts.extend(texts)
+
+    def build_step(self) -> None:
+        """
+        在预取线程中为下一批菜单项建立索引，未完成时提交下一批任务。
+        """
+        if self.stopped:
+            return
+        try:
+            self.extend(INDEX_CHUNK)
+        except Exception as e:
+            logging.error(f'Menu index error: {e}')
+            self.stopped = True
+            return
+        if not self.complete:
+            PREFETCH_EXECUTOR.submit(self.build_step)
+
+    def build_in_background(self) -> None:
+        """
+        在预取线程中分批建立索引，stop 可以提前结束。
+        """
+        PREFETCH_EXECUTOR.submit(self.build_step)
+
+    def stop(self) -> None:
+        """
+        停止后台建立索引。
+        """
+        self.stopped = True
+
+    def search(self, query: str) -> List[int]:
+        """
+        查找文本中包含 query 的菜单项（不区分大小写）。
+
+        参数:
+            query (str): 查询字符串。
+
+        返回:
+            List[int]: 按原顺序排列的菜单项下标，只包含已经建立索引的菜单项。
+        """
+        query = query.lower()
+        with self.lock:
+            loaded: int = len(self.texts)
+            texts: List[str] = self.texts
+            if not query:
+                result: List[int] = list(range(loaded))
+            elif self.last_query and query.startswith(self.last_query):
+                # 追加字符只会缩小结果范围；上一次查询之后新建立索引的菜单项逐个检查
+                result = [i for i in self.last_result if query in texts[i]]
+                result.extend(i for i in range(self.last_loaded, loaded) if query in texts[i])
+            elif len(query) >= GRAM:
+                postings: List[List[int]] = sorted(
+                    (self.grams.get(query[j:j + GRAM], []) for j in range(len(query) - GRAM + 1)), key=len
+                )
+                candidates: Set[int] = set(postings[0])
+                for posting in postings[1:]:
+                    candidates.intersection_update(posting)
+                result = [i for i in sorted(candidates) if query in texts[i]]
+            else:
+                result = [i for i in range(loaded) if query in texts[i]]
+        self.last_query, self.last_result, self.last_loaded = query, result, loaded
+        return result
+
+
+class MenuView:
+    """
+    带滚动窗口与局部重绘的菜单视图。
+
+    只绘制终端高度能容纳的一段菜单项；在窗口内移动选中项时只重绘新旧两个菜单项，
+    选中项移出窗口时窗口滚动并重绘窗口内容。过滤时只显示匹配的菜单项，
+    selected 返回的始终是菜单项在原菜单中的下标。
+    """
+
+    def __init__(self, menu: Sequence[str], stream: TextIO = None):
+        """
+        参数:
+            menu (Sequence[str]): 菜单项序列，可以是 LazyMenu。
+            stream (TextIO): 输出流，默认为 sys.stdout。
+        """
+        self.menu: Sequence[str] = menu
+        self.stream: TextIO = stream if stream is not None else sys.stdout
+        self.visible: Sequence[int] = range(len(menu))
+        self.cursor: int = 0
+        self.top: int = 0
+        # 已绘制菜单项的位置：在 visible 中的位置 -> (屏幕行, 行数)
+        self.rows: Dict[int, Tuple[int, int]] = {}
+        self.status_row: int = 0
+        self.index: Optional[SearchIndex] = None
+        self.query: str = ''
+        self.typing: bool = False
+
+    def selected(self) -> Optional[int]:
+        """
+        返回：
+            Optional[int]: 当前选中项在原菜单中的下标，过滤后没有菜单项时为 None。
+        """
+        if not self.visible:
+            return None
+        return self.visible[self.cursor]
+
+    def entry_lines(self, position: int) -> List[str]:
+        """
+        生成某个菜单项的显示行，选中项使用白色背景和黑色字体高亮显示。
+        """
+        i: int = self.visible[position]
+        if position == self.cursor:
+            text: str = f'{Back.WHITE}{Fore.BLACK}{i + 1}. {self.menu[i]}{Style.RESET_ALL}'
+        else:
+            text = f'{i + 1}. {self.menu[i]}{Style.RESET_ALL}'
+        return text.split('\n')
+
+    def status(self) -> str:
+        """
+        返回：
+            str: 状态行，显示位置与过滤条件。
+        """
+        parts: List[str] = [f'{self.cursor + 1 if self.visible else 0}/{len(self.visible)}']
+        if self.typing or self.query:
+            parts.append(f'过滤: {self.query}{"_" if self.typing else ""}')
+        if self.indexing():
+            parts.append(f'索引中 {len(self.index.texts)}/{len(self.menu)}')
+        return f'{Fore.LIGHTBLACK_EX}{"  ".join(parts)}{Style.RESET_ALL}'
+
+    def draw(self) -> None:
+        """
+        清屏并绘制整个窗口：从 top 开始尽可能多地绘制菜单项，最后一行为状态行。
+        """
+        start: float = time.perf_counter()
+        height: int = max(shutil.get_terminal_size().lines - 1, 2)
+        # 一次性准备好窗口内可能显示的菜单项，让数据源可以批量生成
+        if hasattr(self.menu, 'preload'):
+            self.menu.preload(self.visible[self.top:self.top + max(height // self.menu.entry_height, 1)])
+        out: List[str] = [CURSOR_HOME, CLEAR_SCREEN]
+        self.rows = {}
+        row: int = 0
+        position: int = self.top
+        while position < len(self.visible):
+            lines: List[str] = self.entry_lines(position)
+            # 第一个菜单项即使超高也要显示，其余放不下时停止
+            if row + len(lines) > height - 1 and position > self.top:
+                break
+            for line in lines:
+                out.append(f'{move_cursor(row, 0)}{line}')
+                row += 1
+            self.rows[position] = (row - len(lines), len(lines))
+            position += 1
+        if not self.visible:
+            out.append(f'{Fore.RED}无匹配项{Style.RESET_ALL}')
+            row += 1
+        self.status_row = row
+        out.append(f'{move_cursor(row, 0)}{self.status()}{RESET_ALL}')
+        self.stream.write(''.join(out))
+        self.stream.flush()
+        METRICS.record('menu.draw', time.perf_counter() - start)
+
+        # 后台预取下一屏的菜单项
+        if hasattr(self.menu, 'prefetch') and self.visible:
+            shown: int = max(position - self.top, 1)
+            following: Sequence[int] = self.visible[position:position + shown]
+            if following:
+                self.menu.prefetch(following[0], following[-1] + 1)
+
+    def redraw_entries(self, positions: Iterable[int]) -> None:
+        """
+        只重绘指定的菜单项和状态行，使用光标定位覆盖原有内容。
+        """
+        start: float = time.perf_counter()
+        out: List[str] = []
+        for position in positions:
+            row, height = self.rows[position]
+            for offset, line in enumerate(self.entry_lines(position)[:height]):
+                out.append(f'{move_cursor(row + offset, 0)}{line}{CLEAR_LINE}')
+        out.append(f'{move_cursor(self.status_row, 0)}{self.status()}{CLEAR_LINE}{RESET_ALL}')
+        self.stream.write(''.join(out))
+        self.stream.flush()
+        METRICS.record('menu.redraw', time.perf_counter() - start)
+
+    def move_to(self, position: int) -> None:
+        """
+        选中 visible 中的第 position 项（越界时循环）。目标项已完整显示时只重绘两项，否则滚动窗口。
+        """
+        if not self.visible:
+            return
+        position %= len(self.visible)
+        previous: int = self.cursor
+        self.cursor = position
+        if position in self.rows and previous in self.rows:
+            self.redraw_entries((previous, position))
+            return
+
+        # 滚动窗口：向下越界时让目标项出现在窗口底部附近，向上越界时出现在顶部
+        if position < self.top or position == 0:
+            self.top = position
+        else:
+            shown: int = max(len(self.rows), 1)
+            self.top = max(position - shown + 1, 0)
+        self.draw()
+        # 菜单项高度不一致时，确保目标项确实被完整绘制
+        while position not in self.rows and self.top < position:
+            self.top += 1
+            self.draw()
+
+    def jump(self, number: int) -> bool:
+        """
+        跳转到显示编号为 number（从 1 开始）的菜单项。
+
+        返回:
+            bool: 该菜单项在当前过滤结果中时返回 True。
+        """
+        try:
+            position: int = self.visible.index(number - 1)
+        except ValueError:
+            return False
+        self.move_to(position)
+        return True
+
+    def indexing(self) -> bool:
+        """
+        返回：
+            bool: 搜索索引是否正在后台建立，或者最近一次过滤之后还有新建立索引的菜单项。
+        """
+        return self.index is not None and not self.index.stopped and self.index.last_loaded < len(self.menu)
+
+    def set_query(self, query: str) -> None:
+        """
+        更新过滤条件并重绘，搜索索引在第一次过滤时建立。
+        LazyMenu 的索引在预取线程中分批建立（生成每个条目可能需要读取文件），
+        建立完成之前只过滤已经建立索引的菜单项，由 refresh 补充后续结果。
+        """
+        if self.index is None:
+            lazy: bool = hasattr(self.menu, 'prefetch')
+            self.index = SearchIndex(self.menu, build=not lazy)
+            if lazy:
+                self.index.build_in_background()
+        self.query = query
+        self.visible = self.index.search(query) if query else range(len(self.menu))
+        self.cursor = 0
+        self.top = 0
+        self.draw()
+
+    def refresh(self) -> None:
+        """
+        后台索引有进展时重新过滤。新建立索引的菜单项总是排在原有结果之后，
+        因此选中项与窗口位置不变，结果没有变化时只重绘状态行。
+        """
+        visible: List[int] = self.index.search(self.query)
+        if not self.query or len(visible) == len(self.visible):
+            self.redraw_entries(())
+            return
+        self.visible = visible
+        self.draw()
+
+    def close(self) -> None:
+        """
+        菜单结束时停止后台建立索引。
+        """
+        if self.index is not None:
+            self.index.stop()
@@ -0,0 +1,296 @@
+import os
+import re
+from itertools import groupby
+from typing import *
+
+from colorama import Fore
+
+# 终端颜色能力
+COLORS_16: Final[int] = 16
+COLORS_256: Final[int] = 256
+TRUECOLOR: Final[int] = 1 << 24
+
+HEX_COLOR: Final[re.Pattern] = re.compile(r'#([0-9a-fA-F]{6})')
+
+# 16 色调色板的近似 RGB 值（xterm 默认），以及对应的 colorama 颜色名称，用于降级时找最接近的颜色
+BASIC_COLORS: Final[Tuple[Tuple[str, Tuple[int, int, int]], ...]] = (
+    ('black', (0, 0, 0)),
+    ('red', (205, 0, 0)),
+    ('green', (0, 205, 0)),
+    ('yellow', (205, 205, 0)),
+    ('blue', (0, 0, 238)),
+    ('purple', (205, 0, 205)),
+    ('aqua', (0, 205, 205)),
+    ('white', (229, 229, 229)),
+    ('gray', (127, 127, 127)),
+    ('light_red', (255, 0, 0)),
+    ('light_green', (0, 255, 0)),
+    ('light_yellow', (255, 255, 0)),
+    ('light_blue', (92, 92, 255)),
+    ('light_purple', (255, 0, 255)),
+    ('light_aqua', (0, 255, 255)),
+    ('light_white', (255, 255, 255))
+)
+
+# 颜色名称到 colorama 前景色转义序列的映射，即各处的 all_color
+ALL_COLORS: Final[dict] = {
+    'black': Fore.BLACK,
+    'red': Fore.RED,
+    'green': Fore.GREEN,
+    'yellow': Fore.YELLOW,
+    'blue': Fore.BLUE,
+    'purple': Fore.MAGENTA,
+    'aqua': Fore.CYAN,
+    'white': Fore.WHITE,
+    'reset': Fore.RESET,
+    'gray': Fore.LIGHTBLACK_EX,
+    'light_red': Fore.LIGHTRED_EX,
+    'light_green': Fore.LIGHTGREEN_EX,
+    'light_yellow': Fore.LIGHTYELLOW_EX,
+    'light_blue': Fore.LIGHTBLUE_EX,
+    'light_purple': Fore.LIGHTMAGENTA_EX,
+    'light_aqua': Fore.LIGHTCYAN_EX,
+    'light_white': Fore.LIGHTWHITE_EX
+}
+
+# 256 色中 6x6x6 色块每一级的亮度
+CUBE_LEVELS: Final[Tuple[int, ...]] = (0, 95, 135, 175, 215, 255)
+
+
+def detect_color_depth(environ: Mapping[str, str] = None) -> int:
+    """
+    根据环境变量判断终端支持的颜色数。
+
+    返回:
+        int: TRUECOLOR、COLORS_256 或 COLORS_16。
+    """
+    environ = os.environ if environ is None else environ
+    if environ.get('COLORTERM', '').lower() in ('truecolor', '24bit') or 'WT_SESSION' in environ:
+        return TRUECOLOR
+    if '256color' in environ.get('TERM', ''):
+        return COLORS_256
+    return COLORS_16
+
+
+def index_to_rgb(index: int) -> Tuple[int, int, int]:
+    """
+    返回：
+        Tuple[int, int, int]: 256 色编号对应的 RGB 值。
+    """
+    if index < 16:
+        return BASIC_COLORS[index][1]
+    if index < 232:
+        index -= 16
+        return CUBE_LEVELS[index // 36], CUBE_LEVELS[index // 6 % 6], CUBE_LEVELS[index % 6]
+    level: int = 8 + (index - 232) * 10
+    return level, level, level
+
+
+def rgb_to_index(rgb: Tuple[int, int, int]) -> int:
+    """
+    返回：
+        int: 与 RGB 值最接近的 256 色编号（只在 6x6x6 色块与灰阶中选择）。
+    """
+    cube: List[int] = [min(range(6), key=lambda i: abs(CUBE_LEVELS[i] - c)) for c in rgb]
+    candidates: List[int] = [16 + 36 * cube[0] + 6 * cube[1] + cube[2]]
+    gray: int = min(max((sum(rgb) // 3 - 8 + 5) // 10, 0), 23)
+    candidates.append(232 + gray)
+    return min(candidates, key=lambda i: distance(index_to_rgb(i), rgb))
+
+
+def distance(a: Tuple[int, int, int], b: Tuple[int, int, int]) -> int:
+    return sum((x - y) ** 2 for x, y in zip(a, b))
+
+
+def nearest_basic(rgb: Tuple[int, int, int]) -> str:
+    """
+    返回：
+        str: 与 RGB 值最接近的 16 色名称（ALL_COLORS 中的键）。
+    """
+    return min(BASIC_COLORS, key=lambda item: distance(item[1], rgb))[0]
+
+
+def color_escape(spec: Any, all_color: dict, depth: int) -> str:
+    """
+    把颜色配置中的一项翻译为 ANSI 转义序列，终端能力不足时降级。
+
+    参数:
+        spec (Any): 颜色名称（all_color 中的键）、256 色编号（0-255 的整数或数字字符串）
+            或 '#rrggbb' 形式的真彩色。
+        all_color (dict): 颜色名称到 16 色转义序列的映射。
+        depth (int): 终端支持的颜色数。
+
+    返回:
+        str: 转义序列，无法识别的颜色使用 all_color['reset']。
+    """
+    if isinstance(spec, str) and spec in all_color:
+        return all_color[spec]
+
+    rgb: Optional[Tuple[int, int, int]] = None
+    index: Optional[int] = None
+    if isinstance(spec, str) and HEX_COLOR.fullmatch(spec):
+        value: int = int(spec[1:], 16)
+        rgb = (value >> 16, value >> 8 & 0xFF, value & 0xFF)
+    elif isinstance(spec, int) and not isinstance(spec, bool) and 0 <= spec < 256:
+        index = spec
+    elif isinstance(spec, str) and spec.isdigit() and int(spec) < 256:
+        index = int(spec)
+    else:
+        return all_color['reset']
+
+    if rgb is not None and depth >= TRUECOLOR:
+        return f'\x1b[38;2;{rgb[0]};{rgb[1]};{rgb[2]}m'
+    if depth >= COLORS_256:
+        return f'\x1b[38;5;{rgb_to_index(rgb) if rgb is not None else index}m'
+    return all_color[nearest_basic(rgb if rgb is not None else index_to_rgb(index))]
+
+
+def join_runs(keys: Iterable[Optional[str]], cells: str) -> str:
+    """
+    按每个单元格的转义序列拼接一行：颜色相同的连续单元格共用一个转义序列。
+    转义序列为 None 的单元格（空白）不需要前景色，沿用当前颜色，不会打断前后的颜色段。
+
+    参数:
+        keys (Iterable[Optional[str]]): 每个单元格的转义序列。
+        cells (str): 显示的字符。
+
+    返回:
+        str: 着色后的一行。
+    """
+    out: List[str] = []
+    current: Optional[str] = None
+    position: int = 0
+    for escape, run in groupby(keys):
+        end: int = position + sum(1 for _ in run)
+        if escape is not None and escape != current:
+            out.append(escape)
+            current = escape
+        out.append(cells[position:end])
+        position = end
+    return ''.join(out)
+
+
+class Palette:
+    """
+    预编译的调色板：图块 -> 转义序列。
+
+    color.json 与颜色表只在编译时查询一次。paint_codes 直接按网格的图块编码查 256 项的列表，
+    不需要先把编码解码为字符再做字典查找；颜色相同的连续单元格合并，
+    空白单元格沿用当前颜色，只在可见单元格的颜色变化时输出转义序列。
+    """
+
+    def __init__(self, color_dict: dict, all_color: dict, depth: int = None):
+        """
+        参数:
+            color_dict (dict): 图块到颜色配置的映射（color.json）。
+            all_color (dict): 颜色名称到 16 色转义序列的映射。
+            depth (int): 终端支持的颜色数，默认自动检测。
+        """
+        self.depth: int = detect_color_depth() if depth is None else depth
+        self.default: str = all_color['reset']
+        self.escapes: Dict[str, str] = {
+            tile: color_escape(spec, all_color, self.depth) for tile, spec in color_dict.items()
+        }
+        # 最近使用的编码表（网格的 tiles）及其对应的按编码查询的表，见 code_table
+        self.tiles: Optional[List[str]] = None
+        self.colors: List[str] = []
+        self.keys: List[Optional[str]] = []
+        self.translation: Dict[int, str] = {}
+
+    def code_table(self, tiles: List[str]) -> Tuple[List[str], List[Optional[str]], Dict[int, str]]:
+        """
+        返回网格编码表对应的查询表。同一个网格的 tiles 对象不变，只在第一次使用时建立。
+
+        参数:
+            tiles (List[str]): 编码到字符的映射表（长度为 256）。
+
+        返回:
+            Tuple[List[str], List[Optional[str]], Dict[int, str]]:
+                - 编码 -> 转义序列；
+                - 同上，但空白图块为 None；
+                - 把 Latin-1 解码后的借用编码换回原字符的 str.translate 表。
+        """
+        if tiles is not self.tiles:
+            escapes: Dict[str, str] = self.escapes
+            self.colors = [escapes.get(tile, self.default) for tile in tiles]
+            self.keys = [None if tile.isspace() else escape for tile, escape in zip(tiles, self.colors)]
+            self.translation = {code: tile for code, tile in enumerate(tiles) if tile != chr(code)}
+            self.tiles = tiles
+        return self.colors, self.keys, self.translation
+
+    def escape(self, tile: str) -> str:
+        """
+        返回：
+            str: 图块的颜色转义序列。
+        """
+        return self.escapes.get(tile, self.default)
+
+    def paint(self, cell: str, tile: str = None) -> str:
+        """
+        返回：
+            str: 带颜色的单个单元格，颜色取自 tile（默认与 cell 相同）。
+        """
+        return f'{self.escapes.get(cell if tile is None else tile, self.default)}{cell}'
+
+    def paint_row(self, cells: Iterable[str], tiles: Iterable[str] = None) -> str:
+        """
+        为一行单元格着色，颜色相同的连续单元格共用一个转义序列。
+
+        参数:
+            cells (Iterable[str]): 显示的字符。
+            tiles (Iterable[str]): 决定颜色的图块，默认与 cells 相同。
+
+        返回:
+            str: 着色后的一行。
+        """
+        escapes: Dict[str, str] = self.escapes
+        default: str = self.default
+        cells = ''.join(cells)
+        if tiles is None:
+            tiles = cells
+        return join_runs((None if cell.isspace() else escapes.get(tile, default) for cell, tile in zip(cells, tiles)),
+                         cells)
+
+    def decode(self, codes: Sequence[int], tiles: List[str]) -> str:
+        """
+        返回：
+            str: 图块编码对应的字符。
+        """
+        translation: Dict[int, str] = self.code_table(tiles)[2]
+        cells: str = bytes(codes).decode('latin-1')
+        return cells.translate(translation) if translation else cells
+
+    def paint_codes(self, codes: Sequence[int], tiles: List[str], cells: str = None) -> str:
+        """
+        按图块编码为一行着色。
+
+        参数:
+            codes (Sequence[int]): 一行的图块编码（bytes、bytearray 或 memoryview）。
+            tiles (List[str]): 编码到字符的映射表。
+            cells (str): 显示的字符，默认为编码对应的图块；覆盖显示时颜色仍取自编码。
+
+        返回:
+            str: 着色后的一行。
+        """
+        colors, keys, _ = self.code_table(tiles)
+        if cells is None:
+            return join_runs(map(keys.__getitem__, codes), self.decode(codes, tiles))
+        return join_runs((None if cell.isspace() else colors[code] for code, cell in zip(codes, cells)), cells)
+
+
+# 最近编译的调色板：配置对象不变时直接复用
+_compiled: List[Any] = [None, None, None, None]
+
+
+def compile_palette(color_dict: dict, all_color: dict, depth: int = None) -> Palette:
+    """
+    返回颜色配置对应的调色板；color_dict 与 all_color 仍是上一次的对象时不重新编译。
+    ConfigStore 只在 color.json 变化时才替换 color_dict，因此正常情况下只编译一次。
+    """
+    depth = detect_color_depth() if depth is None else depth
+    cached_color, cached_all, cached_depth, palette = _compiled
+    if cached_color is color_dict and cached_all is all_color and cached_depth == depth:
+        return palette
+    palette = Palette(color_dict, all_color, depth)
+    _compiled[:] = [color_dict, all_color, depth, palette]
+    return palette
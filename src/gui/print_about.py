@@ -1,6 +1,6 @@
 from clear_screen import *
+from gui.key_input import get_input
 from typing import *
-import keyboard
 
 ABOUT: Final[str] = """
 作者：FeSo4a
@@ -12,6 +12,6 @@ Bilibili: https://space.bilibili.com/3546674548967510
 def print_about() -> None:
     clear()
     print(ABOUT)
-    keyboard.read_key()
+    get_input().read_key()
     clear_button()
     clear()
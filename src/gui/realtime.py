@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from typing import *
+
+from engine import *
+from gui.key_input import KeyInput, get_input
+from gui.map import map_loop
+from gui.render import FrameRenderer
+from gui.world import WorldGrid
+
+# 关卡的运行模式：回合模式只在按键时推进，实时模式按固定刻推进图块行为
+TURN: Final[str] = 'turn'
+REALTIME: Final[str] = 'realtime'
+
+# 输入线程每次等待按键的最长时间（秒），决定退出时的最大延迟
+INPUT_POLL: Final[float] = 0.05
+
+
+class RealtimeSession:
+    """
+    一局实时模式游戏：输入、模拟与渲染是三个独立的 asyncio 任务。
+
+    - 输入任务在线程中等待按键，按键到达后连同已积压的按键一起立即交给引擎移动玩家。
+    - 模拟任务以 TICK_RATE 的固定频率推进定时图块；落后时连续补足错过的刻。
+    - 渲染任务以不超过渲染配置中 fps 的频率绘制，只有状态变化时才输出，且只重绘变化的单元格。
+    三个任务运行在同一个事件循环线程中，共享状态无需加锁。
+    """
+
+    def __init__(self, map_data: dict, color_dict: dict, all_color: dict, render_config: dict = None):
+        self.map_ = map_data['map']
+        self.engine: RealtimeEngine = RealtimeEngine(map_data)
+        self.renderer: FrameRenderer = FrameRenderer(color_dict, all_color, render_config)
+        self.renderer.overlay = self.engine.overlay
+        self.keys: KeyInput = get_input()
+        self.state: GameState = self.engine.state
+        self.dirty: Set[Tuple[int, int]] = set()
+        self.changed: bool = True
+        self.result: Optional[str] = None
+        self.done: asyncio.Event = asyncio.Event()
+        # 输入线程中正在进行的 read_key；任务被取消时线程仍在运行，结束前要等它返回
+        self.reading: Optional[asyncio.Future] = None
+
+    def finish(self, event: str) -> None:
+        self.result = event
+        self.done.set()
+
+    async def read_input(self) -> None:
+        while not self.done.is_set():
+            self.reading = asyncio.ensure_future(asyncio.to_thread(self.keys.read_key, INPUT_POLL))
+            # shield：取消本任务时不取消对读取结果的等待，run 结束前会收取它
+            move: Optional[str] = await asyncio.shield(self.reading)
+            self.reading = None
+            if move is None:
+                continue
+            if self.done.is_set():
+                self.keys.queue.appendleft(move)
+                return
+            for move in [move, *self.keys.read_keys()]:
+                self.state, event = self.engine.step(move)
+                if event in (WIN, RELOAD, BACK):
+                    self.finish(event)
+                    return
+                if event in (MOVE, RESET):
+                    self.changed = True
+
+    async def simulate(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        interval: float = 1 / TICK_RATE
+        deadline: float = loop.time() + interval
+        while not self.done.is_set():
+            await asyncio.sleep(max(deadline - loop.time(), 0))
+            # 事件循环被阻塞时补足错过的刻，保持模拟速度稳定
+            while deadline <= loop.time() and not self.done.is_set():
+                self.state, event, cells = self.engine.tick()
+                self.dirty.update(cells)
+                if cells or event == RESET:
+                    self.changed = True
+                deadline += interval
+
+    async def render(self) -> None:
+        interval: float = 1 / self.renderer.config['fps']
+        while not self.done.is_set():
+            if self.changed:
+                self.changed = False
+                dirty, self.dirty = self.dirty, set()
+                self.renderer.render(self.map_, self.state.player_y, self.state.player_x, dirty)
+            await asyncio.sleep(interval)
+
+    async def run(self) -> str:
+        """
+        运行到玩家胜利、重新开始或退出为止，期间独占按键输入。
+
+        返回:
+            str: 'win'、'reload' 或 'back'，与 map_loop 相同。
+        """
+        with self.keys.capture():
+            self.keys.flush()
+            return await self.play()
+
+    async def play(self) -> str:
+        tasks: List[asyncio.Task] = [
+            asyncio.create_task(self.read_input()),
+            asyncio.create_task(self.simulate()),
+            asyncio.create_task(self.render())
+        ]
+        try:
+            await self.done.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # 等待输入线程中最后一次 read_key 返回，读到的按键放回队列，留给之后的界面
+            if self.reading is not None:
+                move: Optional[str] = (await asyncio.gather(self.reading, return_exceptions=True))[0]
+                if isinstance(move, str):
+                    self.keys.queue.appendleft(move)
+            self.renderer.close()
+        return self.result
+
+
+def realtime_loop(map_data: dict, color_dict: dict, all_color: dict, render_config: dict = None) -> str:
+    """
+    实时模式的地图主循环，参数与返回值与 map_loop 相同。
+
+    参数:
+        map_data (dict): read_map 返回的地图数据。
+        color_dict (dict): 单元格字符到颜色名称的映射。
+        all_color (dict): 颜色名称到ANSI转义序列的映射。
+        render_config (dict): 渲染配置（镜头与死区），见 load_config_render。
+
+    返回:
+        str: 'win'、'reload' 或 'back'。
+    """
+    async def main() -> str:
+        return await RealtimeSession(map_data, color_dict, all_color, render_config).run()
+
+    return asyncio.run(main())
+
+
+def play_map(map_data: dict, color_dict: dict, all_color: dict, render_config: dict = None, mode: str = TURN) -> str:
+    """
+    按关卡的运行模式选择 map_loop 或 realtime_loop。
+    开放世界无法在开始时扫描出所有定时图块，总是以回合模式游玩。
+    """
+    if mode == REALTIME and isinstance(map_data['map'], WorldGrid):
+        logging.warning('Realtime mode is not supported for open worlds, falling back to turn mode')
+        mode = TURN
+    if mode == REALTIME:
+        return realtime_loop(map_data, color_dict, all_color, render_config)
+    return map_loop(map_data, color_dict, all_color, render_config)
@@ -0,0 +1,387 @@
+import shutil
+import sys
+import time
+from typing import *
+
+from gui.palette import Palette, compile_palette
+from load_log.metrics import METRICS
+
+# ANSI 控制序列
+CURSOR_HOME: Final[str] = '\x1b[H'
+CLEAR_SCREEN: Final[str] = '\x1b[2J'
+HIDE_CURSOR: Final[str] = '\x1b[?25l'
+SHOW_CURSOR: Final[str] = '\x1b[?25h'
+RESET_ALL: Final[str] = '\x1b[0m'
+# 同步输出（DEC 私有模式 2026）：终端在结束序列到达前不刷新画面，避免显示半帧；不支持的终端会忽略它
+BEGIN_SYNC: Final[str] = '\x1b[?2026h'
+END_SYNC: Final[str] = '\x1b[?2026l'
+PLAYER: Final[str] = 'I'
+
+# 渲染配置的默认值，见 config/render_config.json
+DEFAULT_RENDER_CONFIG: Final[dict] = {
+    'camera': True,
+    'dead_zone_width': 0.5,
+    'dead_zone_height': 0.5,
+    'fps': 60
+}
+
+
+def move_cursor(y: int, x: int) -> str:
+    """
+    生成将光标移动到指定单元格的ANSI序列（终端坐标从1开始）。
+
+    参数:
+        y (int): 屏幕上的行索引（从0开始）。
+        x (int): 屏幕上的列索引（从0开始）。
+
+    返回:
+        str: 光标定位转义序列。
+    """
+    return f'\x1b[{y + 1};{x + 1}H'
+
+
+def row_codes(map_: Any, y: int, left: int, width: int) -> Optional[bytearray]:
+    """
+    返回：
+        Optional[bytearray]: 地图第 y 行 [left, left + width) 的图块编码。Grid 直接切片，
+        ChunkedGrid 与 WorldGrid 逐格读取编码，没有图块编码的 list 地图返回 None。
+    """
+    view: Optional[memoryview] = getattr(map_, 'view', None)
+    if view is not None:
+        start: int = y * map_.width + left
+        return bytearray(view[start:start + width])
+    if hasattr(map_, 'code_at'):
+        return bytearray(map_.code_at(y, x) for x in range(left, left + width))
+    return None
+
+
+def follow(camera: int, player: int, view: int, total: int, dead_zone: float) -> int:
+    """
+    在一个方向上按死区规则移动镜头。
+
+    玩家在视口中央宽度为 view * dead_zone 的死区内移动时镜头不动，越出死区时镜头跟随，
+    使玩家刚好停在死区边缘。结果被限制在地图范围内。
+
+    参数:
+        camera (int): 镜头当前的起始坐标。
+        player (int): 玩家坐标。
+        view (int): 视口大小。
+        total (int): 地图在该方向上的大小。
+        dead_zone (float): 死区占视口的比例，0 表示始终居中，1 表示只在到达边缘时滚动。
+
+    返回:
+        int: 新的镜头起始坐标。
+    """
+    zone: int = max(1, int(view * min(max(dead_zone, 0.0), 1.0)))
+    low: int = camera + (view - zone) // 2
+    high: int = low + zone - 1
+    if player < low:
+        camera -= low - player
+    elif player > high:
+        camera += player - high
+    return min(max(camera, 0), max(total - view, 0))
+
+
+class FrameRenderer:
+    """
+    基于帧缓冲的增量地图渲染器。
+
+    渲染器保存上一次绘制到终端的帧，每次渲染时只比较可能发生变化的单元格
+    （玩家的旧位置、新位置以及调用方标记为脏的单元格），并把差异用光标定位的
+    ANSI序列一次性写入输出流。首帧、终端尺寸变化或地图尺寸变化时退回到整屏重绘。
+    每一帧都包在同步输出序列中，并且只调用一次 write。
+    颜色来自预编译的调色板，整屏重绘时直接按网格的图块编码着色；相邻且颜色相同的单元格
+    只输出一次颜色转义序列，空白单元格沿用当前颜色，不输出转义序列。
+
+    开启镜头模式后只绘制以玩家为中心、与终端同样大小的视口，帧缓冲也只覆盖视口，
+    因此每帧的开销只取决于屏幕大小而与地图大小无关。
+
+    overlay（坐标 -> 显示字符）中的单元格显示为覆盖字符，颜色仍取自地图上的图块，
+    用于水面动画等不改变地图内容的显示效果；覆盖内容变化时调用方需要把单元格标记为脏。
+    """
+
+    def __init__(self, color_dict: dict, all_color: dict, render_config: dict = None, stream: TextIO = None):
+        """
+        参数:
+            color_dict (dict): 单元格字符到颜色的映射，颜色可以是名称、256 色编号或 '#rrggbb'。
+            all_color (dict): 颜色名称到ANSI转义序列的映射。
+            render_config (dict): 渲染配置，缺省项取 DEFAULT_RENDER_CONFIG。
+            stream (TextIO): 输出流，默认为 sys.stdout。
+        """
+        self.color_dict: dict = color_dict
+        self.all_color: dict = all_color
+        self.palette: Palette = compile_palette(color_dict, all_color)
+        self.config: dict = {**DEFAULT_RENDER_CONFIG, **(render_config or {})}
+        self.stream: TextIO = stream if stream is not None else sys.stdout
+        self.frame: Optional[List[List[str]]] = None
+        self.terminal_size: Optional[Tuple[int, int]] = None
+        self.player: Optional[Tuple[int, int]] = None
+        self.overlay: Dict[Tuple[int, int], str] = {}
+        # 视口在地图中的左上角坐标与大小
+        self.top: int = 0
+        self.left: int = 0
+        self.height: int = 0
+        self.width: int = 0
+
+    def reset(self) -> None:
+        """
+        丢弃帧缓冲，使下一次渲染执行整屏重绘。
+        """
+        self.frame = None
+        self.player = None
+
+    def close(self) -> None:
+        """
+        结束渲染，恢复光标显示并丢弃帧缓冲。
+        """
+        self.stream.write(SHOW_CURSOR)
+        self.stream.flush()
+        self.reset()
+
+    def paint(self, cell: str, tile: str = None) -> str:
+        """
+        为单个单元格字符添加颜色。
+
+        参数:
+            cell (str): 显示的字符。
+            tile (str): 决定颜色的图块，默认与 cell 相同。
+
+        返回:
+            str: 带颜色转义序列的字符。
+        """
+        return self.palette.paint(cell, tile)
+
+    def viewport(self, map_height: int, map_width: int, terminal_size: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        计算视口大小。关闭镜头模式时视口就是整张地图。
+
+        返回:
+            Tuple[int, int]: 视口的 (行数, 列数)。
+        """
+        if not self.config['camera']:
+            return map_height, map_width
+        columns, lines = terminal_size
+        # 保留最后一行给光标，避免终端因写满而滚动
+        return min(map_height, max(lines - 1, 1)), min(map_width, max(columns, 1))
+
+    def render(self, map_: list, player_y: int, player_x: int, dirty: Iterable[Tuple[int, int]] = ()) -> None:
+        """
+        渲染一帧地图，玩家位置以 'I' 覆盖显示。
+
+        参数:
+            map_ (list): 二维地图，支持 map_[y][x] 访问。
+            player_y (int): 玩家所在行。
+            player_x (int): 玩家所在列。
+            dirty (Iterable[Tuple[int, int]]): 除玩家外内容可能发生变化的单元格坐标（地图坐标）。
+        """
+        build_start: float = time.perf_counter()
+        terminal_size: Tuple[int, int] = tuple(shutil.get_terminal_size())
+        map_height: int = len(map_)
+        map_width: int = len(map_[0]) if map_height else 0
+        height, width = self.viewport(map_height, map_width, terminal_size)
+
+        redraw: bool = (self.frame is None
+                        or terminal_size != self.terminal_size
+                        or (height, width) != (self.height, self.width))
+
+        # 更新镜头位置；首帧或尺寸变化时把玩家放在视口中央
+        if redraw:
+            top: int = min(max(player_y - height // 2, 0), max(map_height - height, 0))
+            left: int = min(max(player_x - width // 2, 0), max(map_width - width, 0))
+        else:
+            top = follow(self.top, player_y, height, map_height, self.config['dead_zone_height'])
+            left = follow(self.left, player_x, width, map_width, self.config['dead_zone_width'])
+
+        if redraw:
+            self.terminal_size = terminal_size
+            self.top, self.left, self.height, self.width = top, left, height, width
+            self.full_redraw(map_, player_y, player_x)
+            return
+        if (top, left) != (self.top, self.left):
+            self.pan(map_, player_y, player_x, top, left)
+            return
+
+        # 只检查玩家的新旧位置以及被标记的单元格，视口外的单元格直接忽略
+        candidates: Set[Tuple[int, int]] = {(player_y, player_x), *dirty}
+        if self.player is not None:
+            candidates.add(self.player)
+
+        changes: List[Tuple[int, int, str, str]] = []
+        for y, x in sorted(candidates):
+            screen_y: int = y - top
+            screen_x: int = x - left
+            if not (0 <= screen_y < height and 0 <= screen_x < width):
+                continue
+            tile: str = PLAYER if (y, x) == (player_y, player_x) else map_[y][x]
+            cell: str = self.overlay.get((y, x), tile) if tile != PLAYER else tile
+            if self.frame[screen_y][screen_x] != cell:
+                changes.append((screen_y, screen_x, cell, tile))
+
+        self.player = (player_y, player_x)
+        if changes:
+            out: list = []
+            self.write_cells(out, changes)
+            self.flush_frame(out, build_start, 'render')
+
+    def write_cells(self, out: list, changes: Iterable[Tuple[int, int, str, str]]) -> None:
+        """
+        把变化的单元格写入 out 并更新帧缓冲。
+
+        紧接在上一个单元格之后的单元格不需要光标定位；与上一个可见单元格颜色相同、
+        或者本身是空白的单元格不输出颜色转义序列。
+
+        参数:
+            out (list): 输出片段。
+            changes (Iterable[Tuple[int, int, str, str]]): 按屏幕坐标排序的 (屏幕行, 屏幕列, 显示字符, 图块)。
+        """
+        escape_of: Callable[[str], str] = self.palette.escape
+        # 终端当前的前景色与光标位置
+        current: Optional[str] = None
+        cursor: Optional[Tuple[int, int]] = None
+        for screen_y, screen_x, cell, tile in changes:
+            self.frame[screen_y][screen_x] = cell
+            if (screen_y, screen_x) != cursor:
+                out.append(move_cursor(screen_y, screen_x))
+            if not cell.isspace():
+                escape: str = escape_of(tile)
+                if escape != current:
+                    out.append(escape)
+                    current = escape
+            out.append(cell)
+            # 宽字符占用的列数不确定，之后的单元格重新定位
+            cursor = (screen_y, screen_x + 1) if cell.isascii() else None
+
+    def flush_frame(self, out: list, build_start: float, metric: str) -> None:
+        """
+        把一帧的输出包在同步输出序列中一次性写出，绘制完成后把光标移到地图下方，避免遮挡。
+        """
+        out.append(RESET_ALL)
+        out.append(move_cursor(self.height, 0))
+        text: str = f"{BEGIN_SYNC}{''.join(out)}{END_SYNC}"
+        write_start: float = time.perf_counter()
+        METRICS.record(f'{metric}.build', write_start - build_start)
+        self.stream.write(text)
+        self.stream.flush()
+        METRICS.record(f'{metric}.write', time.perf_counter() - write_start)
+
+    def viewport_rows(self, map_: list, player_y: int,
+                      player_x: int) -> List[Tuple[Optional[bytearray], List[str], List[str]]]:
+        """
+        读取当前视口内的地图，玩家位置以 'I' 覆盖，覆盖内容替换显示字符。
+
+        返回:
+            List[Tuple[Optional[bytearray], List[str], List[str]]]: 每一行的
+                (图块编码（list 地图为 None）, 决定颜色的图块, 显示的字符)。没有覆盖内容的行，后两者是同一个列表。
+        """
+        columns: range = range(self.left, self.left + self.width)
+        # 视口内的覆盖内容按行分组：屏幕行 -> [(屏幕列, 显示字符)]
+        overlay: Dict[int, List[Tuple[int, str]]] = {}
+        for (y, x), cell in self.overlay.items():
+            if 0 <= y - self.top < self.height and 0 <= x - self.left < self.width:
+                overlay.setdefault(y - self.top, []).append((x - self.left, cell))
+        player_row: int = player_y - self.top
+        player_column: int = player_x - self.left if 0 <= player_x - self.left < self.width else -1
+
+        tiles: Optional[List[str]] = getattr(map_, 'tiles', None)
+        rows: List[Tuple[Optional[bytearray], List[str], List[str]]] = []
+        for i, y in enumerate(range(self.top, self.top + self.height)):
+            codes: Optional[bytearray] = row_codes(map_, y, self.left, self.width)
+            if codes is None:
+                row = map_[y]
+                tile_row: List[str] = [row[x] for x in columns]
+            else:
+                tile_row = list(self.palette.decode(codes, tiles))
+            if i == player_row and player_column >= 0:
+                tile_row[player_column] = PLAYER
+                if codes is not None:
+                    codes[player_column] = ord(PLAYER)
+            shown: List[str] = tile_row
+            if i in overlay:
+                shown = list(tile_row)
+                for x, cell in overlay[i]:
+                    if (i, x) != (player_row, player_column):
+                        shown[x] = cell
+            rows.append((codes, tile_row, shown))
+        return rows
+
+    def pan(self, map_: list, player_y: int, player_x: int, top: int, left: int) -> None:
+        """
+        镜头平移：先让终端移动屏幕上已有的内容，再只绘制与帧缓冲不同的单元格。
+
+        垂直方向在限定为视口的滚动区域内滚动（SU/SD），水平方向逐行删除或插入字符（DCH/ICH），
+        帧缓冲同步移动，移入视口的位置视为空白。之后需要绘制的只有移入视口的行列、
+        玩家以及覆盖内容，每帧输出的字节数与平移距离成正比，而不是与视口面积成正比。
+        平移距离不小于视口大小时退回到整屏重绘。
+
+        参数:
+            map_ (list): 二维地图，支持 map_[y][x] 访问。
+            player_y (int): 玩家所在行。
+            player_x (int): 玩家所在列。
+            top (int): 新的视口上边界。
+            left (int): 新的视口左边界。
+        """
+        build_start: float = time.perf_counter()
+        dy, dx = top - self.top, left - self.left
+        height, width = self.height, self.width
+        self.top, self.left = top, left
+        if abs(dy) >= height or abs(dx) >= width:
+            self.full_redraw(map_, player_y, player_x, erase=False)
+            return
+
+        out: list = [HIDE_CURSOR]
+        frame: List[List[str]] = self.frame
+        if dy:
+            # 滚动区域限定为视口，视口下方的行不受影响；设置与取消滚动区域都会把光标移到左上角
+            out.append(f'\x1b[1;{height}r\x1b[{abs(dy)}{"S" if dy > 0 else "T"}\x1b[r')
+            blank: List[List[str]] = [[' '] * width for _ in range(abs(dy))]
+            frame = frame[dy:] + blank if dy > 0 else blank + frame[:dy]
+        if dx:
+            shift: str = f'\x1b[{dx}P' if dx > 0 else f'\x1b[{-dx}@'
+            for i in range(height):
+                out.append(move_cursor(i, 0) + shift)
+                frame[i] = frame[i][dx:] + [' '] * dx if dx > 0 else [' '] * -dx + frame[i][:dx]
+        self.frame = frame
+
+        changes: List[Tuple[int, int, str, str]] = [
+            (i, x, cell, tile)
+            for i, (_, tile_row, shown) in enumerate(self.viewport_rows(map_, player_y, player_x))
+            for x, (cell, tile, old) in enumerate(zip(shown, tile_row, frame[i]))
+            if cell != old
+        ]
+        self.write_cells(out, changes)
+        self.player = (player_y, player_x)
+        self.flush_frame(out, build_start, 'render.pan')
+
+    def full_redraw(self, map_: list, player_y: int, player_x: int, erase: bool = True) -> None:
+        """
+        完整绘制当前视口，同时重建帧缓冲。
+
+        参数:
+            map_ (list): 二维地图，支持 map_[y][x] 访问。
+            player_y (int): 玩家所在行。
+            player_x (int): 玩家所在列。
+            erase (bool): 绘制前是否清屏。
+        """
+        build_start: float = time.perf_counter()
+        palette: Palette = self.palette
+        tiles: Optional[List[str]] = getattr(map_, 'tiles', None)
+        frame: List[List[str]] = []
+        lines: list = []
+        for i, (codes, tile_row, shown) in enumerate(self.viewport_rows(map_, player_y, player_x)):
+            frame.append(shown)
+            # 每行都用光标定位开头，视口与终端同宽时也不会因自动换行而错位
+            if codes is None:
+                lines.append(move_cursor(i, 0) + palette.paint_row(shown, tile_row))
+            else:
+                lines.append(move_cursor(i, 0) + palette.paint_codes(
+                    codes, tiles, None if shown is tile_row else ''.join(shown)))
+        prefix: str = f'{HIDE_CURSOR}{CURSOR_HOME}{CLEAR_SCREEN}' if erase else HIDE_CURSOR
+        text: str = BEGIN_SYNC + prefix + ''.join(lines) + f'{RESET_ALL}{move_cursor(self.height, 0)}{END_SYNC}'
+        write_start: float = time.perf_counter()
+        METRICS.record('render.full_build', write_start - build_start)
+        self.stream.write(text)
+        self.stream.flush()
+        METRICS.record('render.full_write', time.perf_counter() - write_start)
+
+        self.frame = frame
+        self.player = (player_y, player_x)
@@ -0,0 +1,488 @@
+import json
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import *
+
+from gui.grid import *
+from load_log.metrics import METRICS
+
+# 开放世界文件（.world）是一个 JSON 清单：
+#
+#   {"chunk_size": 区块边长, "chunks": [区块行数, 区块列数], "start": [行, 列],
+#    "seed": 随机种子或 null, "generator": 生成配置（可选）, "tiles": {编码: 字符}（可选）}
+#
+# 区块保存在清单旁边的 <名称>.chunks 目录中，每个区块一个文件 <区块行>_<区块列>.chunk，
+# 内容是 chunk_size * chunk_size 个图块编码（行优先）。目录中没有的区块在 seed 不为 null 时
+# 由 engine.generator.generate_chunk 按需生成，否则视为实心的墙。
+EXTENSION: Final[str] = '.world'
+CHUNK_EXTENSION: Final[str] = '.chunk'
+WALL_CODE: Final[int] = ord('#')
+DEFAULT_CHUNK_SIZE: Final[int] = 64
+# 新建的生成世界在每个方向上的区块数；出生点在世界中央
+WORLD_CHUNKS: Final[int] = 1 << 16
+
+# 运行配置的默认值，见 config/world_config.json
+#   memory_budget_mb: 驻留区块占用内存的上限；prefetch_radius: 玩家周围保持驻留的区块半径；
+#   lookahead: 沿移动方向在驻留范围之外再预取的区块层数
+DEFAULT_WORLD_CONFIG: Final[dict] = {
+    'memory_budget_mb': 16,
+    'prefetch_radius': 2,
+    'lookahead': 2
+}
+WORLD_CONFIG_PATH: Final[str] = '../config/world_config.json'
+
+# 所有开放世界共用的后台区块加载线程
+PREFETCH_EXECUTOR: Final[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=1, thread_name_prefix='world-prefetch')
+
+
+def chunk_directory(path: str) -> str:
+    """
+    返回：
+        str: 世界文件对应的区块目录。
+    """
+    return f'{os.path.splitext(path)[0]}.chunks'
+
+
+class ChunkSource:
+    """
+    区块的来源：先读取区块目录中保存的区块，没有时按种子生成。read 只读文件或计算，
+    不修改任何共享状态，可以在后台线程中调用。
+    """
+
+    def __init__(self, directory: str, chunk_size: int, seed: Optional[int], generator: dict = None):
+        """
+        参数:
+            directory (str): 区块目录。
+            chunk_size (int): 区块边长。
+            seed (Optional[int]): 生成缺失区块的随机种子，为 None 时缺失的区块是实心的墙。
+            generator (dict): 生成配置，见 engine.generator。
+        """
+        self.directory: str = directory
+        self.chunk_size: int = chunk_size
+        self.seed: Optional[int] = seed
+        self.generator: Optional[dict] = generator
+        self.solid: bytes = bytes([WALL_CODE]) * (chunk_size * chunk_size)
+
+    def read(self, chunk_y: int, chunk_x: int) -> bytes:
+        """
+        读取或生成一个区块。区块文件损坏时记录错误并以实心的墙代替，不中断游戏。
+
+        返回:
+            bytes: chunk_size * chunk_size 个图块编码。
+        """
+        path: str = os.path.join(self.directory, f'{chunk_y}_{chunk_x}{CHUNK_EXTENSION}')
+        try:
+            with open(path, 'rb') as f:
+                data: bytes = f.read()
+            if len(data) != len(self.solid):
+                raise ValueError(f'expected {len(self.solid)} bytes, got {len(data)}')
+            return data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.error(f'World chunk load error: {path}: {e}')
+            return self.solid
+
+        if self.seed is None:
+            return self.solid
+        # 只有生成世界才需要迷宫生成器
+        from engine.generator import generate_chunk
+        return generate_chunk(self.chunk_size, chunk_y, chunk_x, self.seed, self.generator)
+
+
+class WorldRow:
+    """
+    WorldGrid 中某一行的视图，提供与 GridRow 相同的接口。
+    """
+
+    __slots__ = ('grid', 'y')
+
+    def __init__(self, grid: 'WorldGrid', y: int):
+        self.grid: WorldGrid = grid
+        self.y: int = y
+
+    def __len__(self) -> int:
+        return self.grid.width
+
+    def __getitem__(self, x: int) -> str:
+        return self.grid.get(self.y, self.grid.check_x(x))
+
+    def __setitem__(self, x: int, cell: str) -> None:
+        self.grid.set(self.y, self.grid.check_x(x), cell)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.grid.get(self.y, x) for x in range(self.grid.width))
+
+
+class WorldGrid:
+    """
+    按区块流式加载的开放世界网格，接口与 Grid 相同，Engine 与 FrameRenderer 可以直接使用。
+
+    只有玩家附近的区块驻留在内存中。每次玩家移动后 map_loop 调用 visit：
+    玩家周围 prefetch_radius 范围内的区块保持驻留，沿移动方向再向前 lookahead 层的区块
+    交给后台线程提前读取或生成；驻留区块超出内存预算时按最近最少使用（LRU）顺序淘汰。
+    读取到尚未驻留的区块时在当前线程中同步加载（后台线程正在加载时等待其完成），
+    因此移动规则在区块边界上与普通地图完全相同。
+
+    所有对驻留区块表的修改都在调用 get/visit 的线程中完成，后台线程只执行 ChunkSource.read。
+    被修改过的区块不会被淘汰。世界没有整张地图的图块索引，只能以回合模式游玩。
+    """
+
+    __slots__ = ('height', 'width', 'chunk_size', 'source', 'config', 'budget', 'resident', 'pending',
+                 'modified', 'prefetched', 'heading', 'last', 'tiles', 'codes')
+
+    def __init__(self, height: int, width: int, source: ChunkSource, config: dict = None,
+                 tiles: List[str] = None, codes: Dict[str, int] = None):
+        """
+        参数:
+            height (int): 行数（区块行数 * 区块边长）。
+            width (int): 列数（区块列数 * 区块边长）。
+            source (ChunkSource): 区块来源。
+            config (dict): 运行配置，缺省项取 DEFAULT_WORLD_CONFIG。
+            tiles (List[str]): 编码到字符的映射表（长度为 256）。
+            codes (Dict[str, int]): 非 Latin-1 字符到编码的映射表。
+        """
+        self.height: int = height
+        self.width: int = width
+        self.chunk_size: int = source.chunk_size
+        self.source: ChunkSource = source
+        self.config: dict = {**DEFAULT_WORLD_CONFIG, **(config or {})}
+        # 驻留区块数的上限，至少要容纳玩家周围保持驻留与预取的区块
+        reach: int = self.config['prefetch_radius'] + self.config['lookahead']
+        self.budget: int = max(self.config['memory_budget_mb'] * 1024 * 1024 // (self.chunk_size * self.chunk_size),
+                               (2 * reach + 1) ** 2)
+        self.resident: 'OrderedDict[Tuple[int, int], Union[bytes, bytearray]]' = OrderedDict()
+        self.pending: Dict[Tuple[int, int], Future] = {}
+        self.modified: Set[Tuple[int, int]] = set()
+        # 上一次预取时玩家所在的区块与移动方向，以及上一次 visit 时玩家的位置
+        self.prefetched: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+        self.heading: Tuple[int, int] = (0, 0)
+        self.last: Optional[Tuple[int, int]] = None
+        self.tiles: List[str] = tiles if tiles is not None else [chr(i) for i in range(256)]
+        self.codes: Dict[str, int] = codes if codes is not None else {}
+
+    check_x = Grid.check_x
+    check_y = Grid.check_y
+    encode = Grid.encode
+
+    def chunk(self, key: Tuple[int, int]) -> Union[bytes, bytearray]:
+        """
+        返回一个区块的数据，未驻留时同步加载。
+
+        参数:
+            key (Tuple[int, int]): (区块行, 区块列)。
+        """
+        data: Optional[Union[bytes, bytearray]] = self.resident.get(key)
+        if data is not None:
+            return data
+
+        start: float = time.perf_counter()
+        future: Optional[Future] = self.pending.pop(key, None)
+        # 还在排队的预取任务直接取消，在当前线程中加载，不等待排在它前面的区块
+        if future is not None and future.cancel():
+            future = None
+        data = future.result() if future is not None else self.source.read(*key)
+        # 玩家等待区块加载的时间：预取及时的话不会出现
+        METRICS.record('world.stall', time.perf_counter() - start)
+        self.resident[key] = data
+        self.evict()
+        return data
+
+    def code_at(self, y: int, x: int) -> int:
+        """
+        O(1) 读取 (y, x) 处的图块编码。
+        """
+        size: int = self.chunk_size
+        chunk_y, inner_y = divmod(y, size)
+        chunk_x, inner_x = divmod(x, size)
+        data: Optional[Union[bytes, bytearray]] = self.resident.get((chunk_y, chunk_x))
+        if data is None:
+            data = self.chunk((chunk_y, chunk_x))
+        return data[inner_y * size + inner_x]
+
+    def get(self, y: int, x: int) -> str:
+        """
+        O(1) 读取 (y, x) 处的字符，不做负下标处理。
+        """
+        return self.tiles[self.code_at(y, x)]
+
+    def set(self, y: int, x: int, cell: str) -> None:
+        """
+        写入 (y, x) 处的字符；被修改的区块在本次游玩中一直驻留。
+        """
+        size: int = self.chunk_size
+        chunk_y, inner_y = divmod(y, size)
+        chunk_x, inner_x = divmod(x, size)
+        key: Tuple[int, int] = (chunk_y, chunk_x)
+        data: Union[bytes, bytearray] = self.chunk(key)
+        if key not in self.modified:
+            data = bytearray(data)
+            self.resident[key] = data
+            self.modified.add(key)
+        data[inner_y * size + inner_x] = self.encode(cell)
+
+    def visit(self, y: int, x: int) -> None:
+        """
+        玩家移动到 (y, x) 后调用：收取后台加载完成的区块，保持玩家周围的区块驻留，
+        并沿移动方向预取前方的区块。玩家所在区块与移动方向都没有变化时只收取已完成的区块。
+        """
+        self.collect()
+        if self.last is not None and (y, x) != self.last:
+            self.heading = ((y > self.last[0]) - (y < self.last[0]), (x > self.last[1]) - (x < self.last[1]))
+        self.last = (y, x)
+
+        size: int = self.chunk_size
+        center: Tuple[int, int] = (y // size, x // size)
+        if (center, self.heading) == self.prefetched:
+            return
+        self.prefetched = (center, self.heading)
+
+        radius: int = self.config['prefetch_radius']
+        chunks_y: int = -(-self.height // size)
+        chunks_x: int = -(-self.width // size)
+        # 由近到远：先是玩家周围的区块，再沿移动方向逐层向前
+        wanted: List[Tuple[int, int]] = sorted(
+            ((center[0] + i, center[1] + j) for i in range(-radius, radius + 1) for j in range(-radius, radius + 1)),
+            key=lambda key: max(abs(key[0] - center[0]), abs(key[1] - center[1])))
+        dy, dx = self.heading
+        for step in range(radius + 1, radius + self.config['lookahead'] + 1):
+            for offset in range(-radius, radius + 1):
+                if dy:
+                    wanted.append((center[0] + dy * step, center[1] + offset))
+                if dx:
+                    wanted.append((center[0] + offset, center[1] + dx * step))
+        wanted = [key for key in wanted if 0 <= key[0] < chunks_y and 0 <= key[1] < chunks_x]
+
+        # 近处的区块先提交给后台线程；LRU 顺序中近处的区块最新，最后才会被淘汰
+        for key in wanted:
+            if key not in self.resident and key not in self.pending:
+                self.pending[key] = PREFETCH_EXECUTOR.submit(self.source.read, *key)
+        for key in reversed(wanted):
+            if key in self.resident:
+                self.resident.move_to_end(key)
+
+    def collect(self) -> None:
+        """
+        把后台线程已经加载完成的区块放入驻留表。
+        """
+        for key in [key for key, future in self.pending.items() if future.done()]:
+            self.resident[key] = self.pending.pop(key).result()
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        按 LRU 顺序淘汰超出预算的区块，被修改过的区块跳过。
+        """
+        skipped: int = 0
+        while len(self.resident) - skipped > self.budget:
+            key, data = self.resident.popitem(last=False)
+            if key in self.modified:
+                self.resident[key] = data
+                skipped += 1
+
+    def copy(self) -> 'WorldGrid':
+        """
+        返回：
+            WorldGrid: 共享区块来源、没有驻留区块的副本，被修改过的区块会一并复制。
+        """
+        world: WorldGrid = WorldGrid(self.height, self.width, self.source, self.config, self.tiles, self.codes)
+        for key in self.modified:
+            world.resident[key] = bytearray(self.resident[key])
+            world.modified.add(key)
+        return world
+
+    @property
+    def nbytes(self) -> int:
+        """
+        返回：
+            int: 驻留区块占用的字节数。
+        """
+        return len(self.resident) * self.chunk_size * self.chunk_size
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, y: int) -> WorldRow:
+        return WorldRow(self, self.check_y(y))
+
+    def __iter__(self) -> Iterator[WorldRow]:
+        return (WorldRow(self, y) for y in range(self.height))
+
+
+def read_world_config(path: str = WORLD_CONFIG_PATH) -> dict:
+    """
+    读取开放世界的运行配置，文件中缺少的项取默认值；文件不存在时使用默认配置。
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config: dict = json.load(f)
+    except FileNotFoundError:
+        return dict(DEFAULT_WORLD_CONFIG)
+    return {**DEFAULT_WORLD_CONFIG, **config}
+
+
+def load_world(path: str) -> Tuple[WorldGrid, Dict[str, List[Tuple[int, int]]]]:
+    """
+    读取世界文件，只解析清单，不加载任何区块。
+
+    参数:
+        path (str): .world 文件路径。
+
+    返回:
+        Tuple[WorldGrid, Dict[str, List[Tuple[int, int]]]]: 世界网格与图块索引。
+        世界没有整张地图的索引，索引中只有出生点 'S'。
+
+    异常:
+        ValueError: 清单不合法。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest: dict = json.load(f)
+    chunk_size: int = int(manifest['chunk_size'])
+    chunks_y, chunks_x = (int(count) for count in manifest['chunks'])
+    start_y, start_x = (int(i) for i in manifest['start'])
+    if chunk_size < 1 or chunks_y < 1 or chunks_x < 1:
+        raise ValueError('World is empty')
+    height: int = chunks_y * chunk_size
+    width: int = chunks_x * chunk_size
+    if not (0 <= start_y < height and 0 <= start_x < width):
+        raise ValueError('World start point is outside the world')
+
+    tiles: List[str] = [chr(i) for i in range(256)]
+    codes: Dict[str, int] = {}
+    for code, cell in manifest.get('tiles', {}).items():
+        tiles[int(code)] = cell
+        codes[cell] = int(code)
+
+    seed: Optional[int] = manifest.get('seed')
+    if seed is not None:
+        # 提前校验生成配置，避免在游玩中途才因区块无法生成而出错
+        from engine.generator import DEFAULT_GENERATOR_CONFIG, WORLD_ALGORITHMS
+        algorithm: str = {**DEFAULT_GENERATOR_CONFIG, **manifest.get('generator', {})}['algorithm']
+        if chunk_size < 4 or chunk_size % 2 or algorithm not in WORLD_ALGORITHMS:
+            raise ValueError(f'Generated worlds need an even chunk size of at least 4 and one of '
+                             f'{", ".join(WORLD_ALGORITHMS)}')
+    source: ChunkSource = ChunkSource(chunk_directory(path), chunk_size, None if seed is None else int(seed),
+                                      manifest.get('generator'))
+    world: WorldGrid = WorldGrid(height, width, source, read_world_config(), tiles, codes)
+    index: Dict[str, List[Tuple[int, int]]] = {tile: [] for tile in INDEXED_TILES}
+    index['S'].append((start_y, start_x))
+    return world, index
+
+
+def write_manifest(path: str, manifest: dict) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def new_world(path: str, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, generator: dict = None) -> dict:
+    """
+    新建一个按需生成的世界：只写出清单，区块在游玩时生成。
+
+    参数:
+        path (str): 输出的 .world 文件路径。
+        seed (int): 随机种子。
+        chunk_size (int): 区块边长，必须是不小于 4 的偶数。
+        generator (dict): 生成配置，见 engine.generator；为 None 时使用默认配置。
+
+    返回:
+        dict: 写出的清单。
+    """
+    if chunk_size < 4 or chunk_size % 2:
+        raise ValueError(f'World chunk size must be an even number of at least 4: {chunk_size}')
+    # 出生点是中央区块左上角的房间，生成器保证它可以到达四周的区块
+    middle: int = WORLD_CHUNKS // 2 * chunk_size + 1
+    manifest: dict = {'chunk_size': chunk_size, 'chunks': [WORLD_CHUNKS, WORLD_CHUNKS], 'start': [middle, middle],
+                      'seed': seed}
+    if generator is not None:
+        manifest['generator'] = generator
+    write_manifest(path, manifest)
+    return manifest
+
+
+def import_map(map_, start: Tuple[int, int], path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    把一张普通地图切分为区块保存为世界，地图之外补齐为墙；全是墙的区块不写出。
+
+    参数:
+        map_: Grid 或 ChunkedGrid。
+        start (Tuple[int, int]): 出生点。
+        path (str): 输出的 .world 文件路径。
+        chunk_size (int): 区块边长。
+
+    返回:
+        int: 写出的区块数。
+    """
+    chunks_y: int = -(-map_.height // chunk_size)
+    chunks_x: int = -(-map_.width // chunk_size)
+    directory: str = chunk_directory(path)
+    os.makedirs(directory, exist_ok=True)
+    solid: bytes = bytes([WALL_CODE]) * (chunk_size * chunk_size)
+    written: int = 0
+    for chunk_y in range(chunks_y):
+        rows: List[bytes] = [map_.row_codes(y) for y in range(chunk_y * chunk_size,
+                                                              min((chunk_y + 1) * chunk_size, map_.height))]
+        for chunk_x in range(chunks_x):
+            left: int = chunk_x * chunk_size
+            data: bytes = b''.join(row[left:left + chunk_size].ljust(chunk_size, b'#') for row in rows)
+            data = data.ljust(len(solid), b'#')
+            if data == solid:
+                continue
+            with open(os.path.join(directory, f'{chunk_y}_{chunk_x}{CHUNK_EXTENSION}'), 'wb') as f:
+                f.write(data)
+            written += 1
+    write_manifest(path, {'chunk_size': chunk_size, 'chunks': [chunks_y, chunks_x], 'start': list(start),
+                          'seed': None, 'tiles': {str(code): cell for cell, code in map_.codes.items()}})
+    return written
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：
+        python -m gui.world new <输出.world> [--seed N] [--chunk N]
+        python -m gui.world import <地图.json|.lmap> <输出.world> [--chunk N]
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    options: Dict[str, str] = {'--seed': '0', '--chunk': str(DEFAULT_CHUNK_SIZE)}
+    # 选项后面必须跟着取值，位于末尾或后面紧跟另一个选项时提示用法
+    missing: bool = False
+    for option in options:
+        if option in args:
+            position: int = args.index(option)
+            if position + 1 == len(args) or args[position + 1] in options:
+                missing = True
+                break
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+
+    # 取值不是整数时同样提示用法
+    try:
+        chunk_size: int = int(options['--chunk'])
+        seed: int = int(options['--seed'])
+    except ValueError:
+        missing = True
+
+    if not missing:
+        # 生成的区块边长必须是不小于 4 的偶数（见 generate_chunk）
+        if len(args) == 2 and args[0] == 'new' and chunk_size >= 4 and chunk_size % 2 == 0:
+            new_world(args[1], seed, chunk_size)
+            print(f'已新建世界 {args[1]}')
+            return 0
+        if len(args) == 3 and args[0] == 'import' and chunk_size >= 1:
+            from gui.map import parse_map
+            map_data: dict = parse_map(args[1])
+            count: int = import_map(map_data['map'], (map_data['player_y'], map_data['player_x']), args[2],
+                                    chunk_size)
+            print(f'已写出 {count} 个区块到 {chunk_directory(args[2])}')
+            return 0
+
+    print('用法: python -m gui.world new <输出.world> [--seed N] [--chunk N]\n'
+          '      python -m gui.world import <地图.json|.lmap> <输出.world> [--chunk N]')
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
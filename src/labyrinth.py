@@ -2,17 +2,30 @@ import sys
 import time
 from typing import *
 
+# 进程开始的时刻，用于启动耗时报告
+STARTED: Final[float] = time.perf_counter()
+
+from load_log.startup import STARTUP_TIMER
+
+# load_log 会同时导入 colorama
+STARTUP_TIMER.record('import load_log', STARTED)
 from colorama import *
 
 from clear_screen import *
-from game import *
-from gui import *
-from load_asset import *
-from load_config import *
+
+with STARTUP_TIMER.stage('import load_config, load_asset'):
+    from load_asset import *
+    from load_config import *
 from load_log import *
-from load_mod import *
 
-# 初始化 colorama 库，用于在终端中显示彩色文本
+# 游戏与模组相关的模块在第一次使用时才导入
+import game
+import load_mod
+from gui import menu_loop, print_about, read_menu
+from gui.key_input import KeyInput, get_input
+from gui.palette import ALL_COLORS
+
+# 初始化 colorama 库，用于在终端中显示彩色文本；其余模块不再重复初始化
 init(autoreset=True)
 
 # 定义日志配置文件路径和资源配置文件路径
@@ -20,47 +33,42 @@ LOG_CONFIG_PATH: Final[str] = '../config/log_config.json'
 ASSET_CONFIG_PATH: Final[str] = '../config/asset_config.json'
 COLOR_CONFIG_PATH: Final[str] = '../config/color.json'
 MOD_CONFIG_PATH: Final[str] = '../config/mod_config.json'
+RENDER_CONFIG_PATH: Final[str] = '../config/render_config.json'
+START_CONFIG_PATH: Final[str] = '../config/start_config.json'
 
 # 加载日志配置并初始化日志系统
-log_config = load_config_log(LOG_CONFIG_PATH)
-load_log(log_config)
+with STARTUP_TIMER.stage('config log'):
+    log_config = load_config_log(LOG_CONFIG_PATH)
+    load_log(log_config)
 
 # 加载资源配置，获取 logo 和 title 文件路径
-asset_config = load_config_asset(ASSET_CONFIG_PATH)
+with STARTUP_TIMER.stage('config asset'):
+    asset_config = load_config_asset(ASSET_CONFIG_PATH)
 logo_path: str = asset_config[0]
 title_path: str = asset_config[1]
 map_path: str = asset_config[2]
 menu_path: str = asset_config[3]
 
 # 加载模组配置
-mod_path = load_config_mod(MOD_CONFIG_PATH)
+with STARTUP_TIMER.stage('config mod'):
+    mod_path, mod_cache_path = load_config_mod(MOD_CONFIG_PATH)
 
 # 加载颜色配置
-color_dict: dict = read_color(COLOR_CONFIG_PATH)
-
-ALL_COLORS: Final[dict] = {
-    'black': Fore.BLACK,
-    'red': Fore.RED,
-    'green': Fore.GREEN,
-    'yellow': Fore.YELLOW,
-    'blue': Fore.BLUE,
-    'purple': Fore.MAGENTA,
-    'aqua': Fore.CYAN,
-    'white': Fore.WHITE,
-    'reset': Fore.RESET,
-    'gray': Fore.LIGHTBLACK_EX,
-    'light_red': Fore.LIGHTRED_EX,
-    'light_green': Fore.LIGHTGREEN_EX,
-    'light_yellow': Fore.LIGHTYELLOW_EX,
-    'light_blue': Fore.LIGHTBLUE_EX,
-    'light_purple': Fore.LIGHTMAGENTA_EX,
-    'light_aqua': Fore.LIGHTCYAN_EX,
-    'light_white': Fore.LIGHTWHITE_EX
-}
+with STARTUP_TIMER.stage('config color'):
+    color_dict: dict = read_color(COLOR_CONFIG_PATH)
+
+# 加载渲染配置
+with STARTUP_TIMER.stage('config render'):
+    render_config: dict = load_config_render(RENDER_CONFIG_PATH)
+
+# 加载启动配置
+with STARTUP_TIMER.stage('config start'):
+    start_config: dict = load_config_start(START_CONFIG_PATH)
 
 # 从文件中加载 logo 和 title 文本内容
-LOGO: Final[str] = load_asset_text(logo_path)
-TITLE: Final[str] = load_asset_text(title_path)
+with STARTUP_TIMER.stage('asset text'):
+    LOGO: Final[str] = load_asset_text(logo_path)
+    TITLE: Final[str] = load_asset_text(title_path)
 
 START_GAME: Final[int] = 0
 MOD: Final[int] = 1
@@ -68,38 +76,92 @@ ABOUT: Final[int] = 2
 QUIT: Final[int] = 3
 
 
-def main() -> None:
-    # 清屏并显示标题动画
-    clear()
-    for i in TITLE.split('\n'):
-        print(i)
-        time.sleep(0.15)
-    time.sleep(1)
+def play_intro(text: str, line_delay: float, pause: float, keys: KeyInput) -> bool:
+    """
+    清屏并逐行显示一段开场动画，等待期间读到按键时立即结束。
 
-    # 清屏并显示Logo动画
+    参数:
+        text (str): 要显示的文本。
+        line_delay (float): 每行之间的间隔（秒）。
+        pause (float): 显示完后的停顿（秒）。
+        keys (KeyInput): 按键输入。
+
+    返回:
+        bool: 动画被按键跳过时为 True。
+    """
     clear()
-    for i in LOGO.split('\n'):
+    for i in text.split('\n'):
         print(i)
-        time.sleep(0.15)
-    time.sleep(1)
-
+        if keys.read_key(line_delay) is not None:
+            return True
+    return keys.read_key(pause) is not None
+
+
+def intro(config: dict) -> None:
+    """
+    依次显示标题动画与Logo动画，按任意键跳过。
+
+    参数:
+        config (dict): 启动配置，提供每行间隔与停顿时间。
+    """
+    keys: KeyInput = get_input()
+    # 跳过用的按键已被读走，不会残留给之后的菜单
+    with keys.capture():
+        keys.flush()
+        if not play_intro(TITLE, config['line_delay'], config['pause'], keys):
+            play_intro(LOGO, config['line_delay'], config['pause'], keys)
     clear()
 
+
+def main(argv: List[str] = None) -> None:
+    """
+    游戏入口：python labyrinth.py [--fast-start] [--profile]
+
+    --fast-start 或启动配置中的 fast_start 会跳过开场动画。
+    --profile 在 cProfile 与 tracemalloc 下运行，结果写到日志目录（见 run_profiled）。
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    if '--fast-start' in args or start_config['fast_start']:
+        clear()
+    else:
+        with STARTUP_TIMER.stage('intro'):
+            intro(start_config)
+
+    log_config_ = log_config
+    # 模组发现索引在第一次打开模组列表时才创建
+    mod_index = None
+
     # 进入主菜单循环
     while True:
+        # 配置与菜单从缓存中读取，文件在运行中被修改时会自动重新解析
+        config_ = load_config_log(LOG_CONFIG_PATH)
+        if config_ is not log_config_:
+            reload_log(config_)
+            log_config_ = config_
+        _, _, map_path_, menu_path_ = load_config_asset(ASSET_CONFIG_PATH)
+        mod_path_, _ = load_config_mod(MOD_CONFIG_PATH)
+        color_dict_ = read_color(COLOR_CONFIG_PATH)
+        render_config_ = load_config_render(RENDER_CONFIG_PATH)
+
         # 读取主菜单配置文件
-        menu_ = read_menu(f'{menu_path}main_menu.json')
+        menu_ = read_menu(f'{menu_path_}main_menu.json')
+        # 第一次显示主菜单前把启动耗时写入日志
+        if not STARTUP_TIMER.reported:
+            STARTUP_TIMER.report(STARTED)
         # 显示菜单并获取用户选择
         choose = menu_loop(menu_)
 
         # 根据用户选择执行相应操作
         if choose == START_GAME:
-            start_game(menu_path, map_path, color_dict, ALL_COLORS)
+            game.start_game(menu_path_, map_path_, color_dict_, ALL_COLORS, render_config_)
         elif choose == MOD:
-            mods = mod_pack_path(mod_path)
-            quit_, menu, mod_id = mod_menu(mods, ALL_COLORS)
-            path = mod_menu_loop(quit_, menu, mod_id)
-            level_menu(mod_path, path, path, color_dict, ALL_COLORS)
+            # 模组发现索引：只在模组目录有变化时才重新列目录和解析 pack.json
+            if mod_index is None:
+                mod_index = load_mod.ModIndex(mod_cache_path)
+            mods = load_mod.mod_pack_path(mod_path_, mod_index)
+            quit_, menu, mod_id = load_mod.mod_menu(mods, ALL_COLORS, mod_index, mod_path_)
+            path = load_mod.mod_menu_loop(quit_, menu, mod_id)
+            load_mod.level_menu(mod_path_, path, path, color_dict_, ALL_COLORS, render_config_)
         elif choose == ABOUT:
             print_about()
         elif choose == QUIT:
@@ -109,4 +171,7 @@ def main() -> None:
 
 
 if __name__ == '__main__':
-    main()
+    if '--profile' in sys.argv[1:]:
+        run_profiled(main, log_config[1])
+    else:
+        main()
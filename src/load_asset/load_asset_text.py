@@ -1,12 +1,10 @@
 import logging
 import sys
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
-
-init(autoreset=True)
+from gui.key_input import get_input
 
 
 def load_asset_text(asset_config: str) -> str:
@@ -34,7 +32,7 @@ def load_asset_text(asset_config: str) -> str:
         clear()
         logging.error(f'Asset file load failed: {str(e)}')
         print(f'{Fore.RED}资源文件加载失败： {str(e)}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         clear()
         sys.exit()
@@ -1,11 +1,18 @@
+from load_config.config_store import *
 from load_config.load_config_asset import *
 from load_config.load_config_color import *
 from load_config.load_config_log import *
 from load_config.load_config_mod import *
+from load_config.load_config_render import *
+from load_config.load_config_start import *
 
 __all__ = [
     'load_config_asset',
     'read_color',
     'load_config_log',
-    'load_config_mod'
+    'load_config_mod',
+    'load_config_render',
+    'load_config_start',
+    'ConfigStore',
+    'CONFIG_STORE'
 ]
@@ -0,0 +1,220 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from typing import *
+
+# 两次检查文件变化之间的最短间隔（秒），避免每次读取配置都访问磁盘
+POLL_INTERVAL: Final[float] = 1.0
+
+# inotify 常量（见 <sys/inotify.h>）
+IN_MODIFY: Final[int] = 0x00000002
+IN_CLOSE_WRITE: Final[int] = 0x00000008
+IN_MOVED_TO: Final[int] = 0x00000080
+IN_CREATE: Final[int] = 0x00000100
+IN_NONBLOCK: Final[int] = 0o4000
+IN_CLOEXEC: Final[int] = 0o2000000
+WATCH_MASK: Final[int] = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# inotify_event 结构体的固定部分：wd, mask, cookie, len
+EVENT_HEADER: Final[struct.Struct] = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """
+    基于 Linux inotify 的目录监视器，通过 ctypes 调用 libc，不依赖第三方库。
+
+    监视配置文件所在的目录而不是文件本身，这样编辑器先写临时文件再改名替换时也能收到事件。
+    文件描述符是非阻塞的，changes 只读取已经到达的事件。
+    """
+
+    def __init__(self):
+        """
+        异常:
+            OSError: 系统不支持 inotify 或创建失败。
+        """
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd: int = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.dirs: Dict[int, str] = {}
+
+    def watch(self, directory: str) -> None:
+        """
+        开始监视一个目录，重复监视同一目录没有副作用。
+        """
+        if directory in self.dirs.values():
+            return
+        wd: int = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed: {directory}')
+        self.dirs[wd] = directory
+
+    def changes(self) -> Set[str]:
+        """
+        返回：
+            Set[str]: 自上次调用以来发生变化的文件的绝对路径。
+        """
+        changed: Set[str] = set()
+        while True:
+            try:
+                data: bytes = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset: int = 0
+            while offset < len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name: str = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if wd in self.dirs and name:
+                    changed.add(os.path.join(self.dirs[wd], name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def create_watcher() -> Optional[InotifyWatcher]:
+    """
+    返回：
+        Optional[InotifyWatcher]: 支持 inotify 时返回监视器，否则返回 None（退化为轮询 mtime）。
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError, TypeError) as e:
+        logging.info(f'inotify unavailable, polling config files: {e}')
+        return None
+
+
+class ConfigEntry:
+    """
+    一个被缓存的配置文件：解析函数、当前值以及解析时文件的 mtime 与大小。
+    """
+    __slots__ = ('path', 'parse', 'value', 'mtime_ns', 'size')
+
+    def __init__(self, path: str, parse: Callable[[str], Any]):
+        self.path: str = path
+        self.parse: Callable[[str], Any] = parse
+        self.value: Any = None
+        self.mtime_ns: int = 0
+        self.size: int = -1
+
+
+class ConfigStore:
+    """
+    配置与资源文件的统一缓存。
+
+    每个文件只在第一次读取和内容变化时解析一次，其余读取直接返回缓存的对象。
+    文件变化通过 inotify（可用时）或按间隔比较 mtime 与大小来发现；
+    重新解析成功后一次性替换缓存的对象，已经拿到旧对象的调用方不受影响。
+    重新解析失败（例如文件只写了一半）时记录日志并保留旧值。
+    缓存的对象由所有调用方共享，不应被修改。
+    """
+
+    def __init__(self, interval: float = POLL_INTERVAL, watch: bool = True):
+        """
+        参数:
+            interval (float): 两次检查文件变化之间的最短间隔（秒）。
+            watch (bool): 是否尝试使用 inotify。
+        """
+        self.interval: float = interval
+        self.entries: Dict[Tuple[str, Callable[[str], Any]], ConfigEntry] = {}
+        self.watcher: Optional[InotifyWatcher] = create_watcher() if watch else None
+        self.checked: float = time.monotonic()
+        self.lock: threading.RLock = threading.RLock()
+
+    def get(self, path: str, parse: Callable[[str], Any]) -> Any:
+        """
+        返回配置文件解析后的对象。
+
+        参数:
+            path (str): 文件路径。
+            parse (Callable[[str], Any]): 解析函数，接收路径，失败时抛出异常。
+
+        返回:
+            Any: 缓存的解析结果。
+
+        异常:
+            Exception: 文件第一次解析失败时抛出 parse 的异常。
+        """
+        key: Tuple[str, Callable[[str], Any]] = (os.path.abspath(path), parse)
+        with self.lock:
+            entry: Optional[ConfigEntry] = self.entries.get(key)
+            if entry is None:
+                entry = ConfigEntry(key[0], parse)
+                self.load(entry)
+                self.entries[key] = entry
+                self.start_watch(entry)
+                return entry.value
+            self.refresh()
+            return entry.value
+
+    def start_watch(self, entry: ConfigEntry) -> None:
+        """
+        把文件所在目录加入 inotify 监视；失败时停用 inotify，改为轮询。
+        """
+        if self.watcher is None:
+            return
+        try:
+            self.watcher.watch(os.path.dirname(entry.path))
+        except OSError as e:
+            logging.warning(f'Config watch failed, polling instead: {e}')
+            self.watcher.close()
+            self.watcher = None
+
+    def load(self, entry: ConfigEntry) -> None:
+        """
+        解析文件并记录其 mtime 与大小，解析失败时抛出异常且不修改缓存。
+        """
+        stat: os.stat_result = os.stat(entry.path)
+        value: Any = entry.parse(entry.path)
+        entry.value, entry.mtime_ns, entry.size = value, stat.st_mtime_ns, stat.st_size
+
+    def reload(self, entry: ConfigEntry) -> None:
+        """
+        文件的 mtime 或大小变化时重新解析；失败时保留旧值，直到文件再次变化。
+        """
+        try:
+            stat: os.stat_result = os.stat(entry.path)
+        except OSError:
+            # 文件暂时不存在（例如正在被替换），保留旧值
+            return
+        if stat.st_mtime_ns == entry.mtime_ns and stat.st_size == entry.size:
+            return
+        try:
+            self.load(entry)
+            logging.info(f'Config reloaded: {entry.path}')
+        except Exception as e:
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            logging.warning(f'Config reload failed, keeping previous value: {entry.path}: {e}')
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        检查缓存的文件是否有变化并重新解析变化的文件。距上次检查不足 interval 时直接返回。
+
+        参数:
+            force (bool): 忽略检查间隔。
+        """
+        with self.lock:
+            now: float = time.monotonic()
+            if not force and now - self.checked < self.interval:
+                return
+            self.checked = now
+            if self.watcher is not None:
+                changed: Set[str] = self.watcher.changes()
+                entries: List[ConfigEntry] = [e for e in self.entries.values() if e.path in changed]
+            else:
+                entries = list(self.entries.values())
+            for entry in entries:
+                self.reload(entry)
+
+
+# 所有配置文件与菜单文件共用的缓存
+CONFIG_STORE: Final[ConfigStore] = ConfigStore()
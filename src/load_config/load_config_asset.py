@@ -3,17 +3,34 @@ import logging
 import sys
 from typing import *
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
+from gui.key_input import get_input
+from load_config.config_store import CONFIG_STORE
 
-init(autoreset=True)
+
+def parse_config_asset(asset_config: str) -> Tuple[str, str, str, str]:
+    """
+    读取并解析资源配置文件，失败时抛出异常。
+    """
+    with open(asset_config, 'r', encoding='utf-8') as f:
+        asset_config: dict = json.load(f)
+
+        # 提取配置文件中的各项参数
+        logo_path: str = asset_config['logo']
+        title_path: str = asset_config['title']
+        map_path: str = asset_config['map']
+        menu_path: str = asset_config['menu']
+
+        logging.info(f'Assets loaded successfully.')
+
+    return logo_path, title_path, map_path, menu_path
 
 
 def load_config_asset(asset_config: str) -> Tuple[str, str, str, str]:
     """
-    加载资源配置文件并提取关键参数。
+    加载资源配置文件并提取关键参数。文件只在变化时重新解析。
 
     参数:
         asset_config (str): 资源配置文件的路径。
@@ -26,27 +43,15 @@ def load_config_asset(asset_config: str) -> Tuple[str, str, str, str]:
         等待用户按键后退出。
     """
     try:
-        # 打开并读取资源配置文件
-        with open(asset_config, 'r', encoding='utf-8') as f:
-            asset_config: dict = json.load(f)
-
-            # 提取配置文件中的各项参数
-            logo_path: str = asset_config['logo']
-            title_path: str = asset_config['title']
-            map_path: str = asset_config['map']
-            menu_path: str = asset_config['menu']
-
-            logging.info(f'Assets loaded successfully.')
-
-        # 返回解析后的配置参数
-        return logo_path, title_path, map_path, menu_path
+        # 从配置缓存中读取解析后的配置参数
+        return CONFIG_STORE.get(asset_config, parse_config_asset)
 
     except Exception as e:
         # 捕获异常，清屏并提示错误信息后退出程序
         clear()
         logging.error(f'Assets config load failed: {str(e)}')
         print(f'{Fore.RED}config加载失败： {str(e)}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         clear()
         sys.exit()
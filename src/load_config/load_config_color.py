@@ -2,21 +2,26 @@ import json
 import logging
 import sys
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
+from gui.key_input import get_input
+from load_config.config_store import CONFIG_STORE
+
+
+def parse_color(path) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        color: dict = json.load(f)
+        return color
 
 
 def read_color(path) -> dict:
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            color: dict = json.load(f)
-            return color
+        return CONFIG_STORE.get(path, parse_color)
     except Exception as e:
         clear()
         logging.error(f'Color load error: {e}')
         print(f'{Fore.RED}颜色解析时错误： {e}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         sys.exit(0)
@@ -3,12 +3,12 @@ import logging
 import sys
 from typing import *
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
+from gui.key_input import get_input
+from load_config.config_store import CONFIG_STORE
 
-init(autoreset=True)
 
 # 日志级别映射字典，将字符串形式的日志级别映射为logging模块对应的常量
 LOG_LEVEL: Final[Dict[str, int]] = {
@@ -20,9 +20,29 @@ LOG_LEVEL: Final[Dict[str, int]] = {
 }
 
 
+def parse_config_log(log_config: str) -> Tuple[int, str, str, str, str]:
+    """
+    读取并解析日志配置文件，失败时抛出异常。
+    """
+    with open(log_config, 'r', encoding='utf-8') as f:
+        log_config: dict = json.load(f)
+
+        # 提取配置文件中的各项参数
+        log_level: str = log_config['level']
+        log_path: str = log_config['path']
+        log_mode: str = log_config['mode']
+        log_format: str = log_config['format']
+        log_datefmt: str = log_config['datefmt']
+
+        # 将字符串形式的日志级别转换为logging模块对应的整数常量
+        log_level: int = LOG_LEVEL[log_level]
+
+    return log_level, log_path, log_mode, log_format, log_datefmt
+
+
 def load_config_log(log_config: str) -> Tuple[int, str, str, str, str]:
     """
-    加载日志配置文件并解析其中的配置项。
+    加载日志配置文件并解析其中的配置项。文件只在变化时重新解析。
 
     参数:
         log_config (str): 日志配置文件的路径。
@@ -39,28 +59,14 @@ def load_config_log(log_config: str) -> Tuple[int, str, str, str, str]:
         如果在读取或解析配置文件时发生异常，程序会清屏并打印错误信息，然后退出。
     """
     try:
-        # 打开并读取日志配置文件
-        with open(log_config, 'r', encoding='utf-8') as f:
-            log_config: dict = json.load(f)
-
-            # 提取配置文件中的各项参数
-            log_level: str = log_config['level']
-            log_path: str = log_config['path']
-            log_mode: str = log_config['mode']
-            log_format: str = log_config['format']
-            log_datefmt: str = log_config['datefmt']
-
-            # 将字符串形式的日志级别转换为logging模块对应的整数常量
-            log_level: int = LOG_LEVEL[log_level]
-
-        # 返回解析后的配置参数
-        return log_level, log_path, log_mode, log_format, log_datefmt
+        # 从配置缓存中读取解析后的配置参数
+        return CONFIG_STORE.get(log_config, parse_config_log)
 
     except Exception as e:
         # 捕获异常，清屏并提示错误信息后退出程序
         clear()
         print(f'{Fore.RED}config加载失败： {str(e)}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         clear()
         sys.exit()
@@ -0,0 +1,65 @@
+import json
+import logging
+import sys
+
+from colorama import *
+
+from clear_screen import *
+from gui.key_input import get_input
+from load_config.config_store import CONFIG_STORE
+
+
+def parse_config_render(render_config: str) -> dict:
+    """
+    读取并解析渲染配置文件，失败时抛出异常。
+    """
+    with open(render_config, 'r', encoding='utf-8') as f:
+        render_config: dict = json.load(f)
+
+        # 校验各项参数的类型
+        camera: bool = bool(render_config['camera'])
+        dead_zone_width: float = float(render_config['dead_zone_width'])
+        dead_zone_height: float = float(render_config['dead_zone_height'])
+        fps: int = max(int(render_config.get('fps', 60)), 1)
+
+        logging.info(f'Render config loaded successfully.')
+
+    return {
+        'camera': camera,
+        'dead_zone_width': dead_zone_width,
+        'dead_zone_height': dead_zone_height,
+        'fps': fps
+    }
+
+
+def load_config_render(render_config: str) -> dict:
+    """
+    加载渲染配置文件。文件只在变化时重新解析。
+
+    参数:
+        render_config (str): 渲染配置文件的路径。
+
+    返回:
+        dict: 渲染配置，包含以下键：
+            - camera (bool): 是否只绘制以玩家为中心、与终端同样大小的视口。
+            - dead_zone_width (float): 水平死区占视口宽度的比例，玩家在死区内移动时镜头不滚动。
+            - dead_zone_height (float): 垂直死区占视口高度的比例。
+            - fps (int): 目标帧率，每帧之间到达的按键合并处理后只渲染一次。
+
+    异常处理:
+        如果在读取或解析配置文件时发生异常，程序会清屏、输出错误信息，
+        等待用户按键后退出。
+    """
+    try:
+        # 从配置缓存中读取解析后的配置参数
+        return CONFIG_STORE.get(render_config, parse_config_render)
+
+    except Exception as e:
+        # 捕获异常，清屏并提示错误信息后退出程序
+        clear()
+        logging.error(f'Render config load failed: {str(e)}')
+        print(f'{Fore.RED}config加载失败： {str(e)}')
+        get_input().read_key()
+        clear_button()
+        clear()
+        sys.exit()
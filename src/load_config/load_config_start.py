@@ -0,0 +1,62 @@
+import json
+import logging
+import sys
+
+from colorama import *
+
+from clear_screen import *
+from gui.key_input import get_input
+from load_config.config_store import CONFIG_STORE
+
+
+def parse_config_start(start_config: str) -> dict:
+    """
+    读取并解析启动配置文件，失败时抛出异常。
+    """
+    with open(start_config, 'r', encoding='utf-8') as f:
+        start_config: dict = json.load(f)
+
+        # 校验各项参数的类型
+        fast_start: bool = bool(start_config['fast_start'])
+        line_delay: float = float(start_config['line_delay'])
+        pause: float = float(start_config['pause'])
+
+        logging.info(f'Start config loaded successfully.')
+
+    return {
+        'fast_start': fast_start,
+        'line_delay': line_delay,
+        'pause': pause
+    }
+
+
+def load_config_start(start_config: str) -> dict:
+    """
+    加载启动配置文件。文件只在变化时重新解析。
+
+    参数:
+        start_config (str): 启动配置文件的路径。
+
+    返回:
+        dict: 启动配置，包含以下键：
+            - fast_start (bool): 是否跳过开场的标题与Logo动画。
+            - line_delay (float): 开场动画每行之间的间隔（秒）。
+            - pause (float): 标题与Logo显示完后的停顿（秒）。
+
+    异常处理:
+        如果在读取或解析配置文件时发生异常，程序会清屏、输出错误信息，
+        等待用户按键后退出。
+    """
+    try:
+        # 从配置缓存中读取解析后的配置参数
+        return CONFIG_STORE.get(start_config, parse_config_start)
+
+    except Exception as e:
+        # 捕获异常，清屏并提示错误信息后退出程序
+        clear()
+        logging.error(f'Start config load failed: {str(e)}')
+        print(f'{Fore.RED}config加载失败： {str(e)}')
+        get_input().read_key()
+        clear_button()
+        clear()
+        sys.exit()
@@ -1,5 +1,10 @@
+from load_log.metrics import *
+from load_log.profiling import *
 from load_log.read_log import *
 
 __all__ = [
-    'load_log'
+    'load_log',
+    'reload_log',
+    'METRICS',
+    'run_profiled'
 ]
@@ -0,0 +1,95 @@
+import atexit
+import logging
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from typing import *
+
+# 每个指标保留的最近样本数
+WINDOW: Final[int] = 1024
+
+# 写入日志的分位数
+PERCENTILES: Final[Tuple[int, ...]] = (50, 95, 99)
+
+
+class RollingHistogram:
+    """
+    保存最近 window 个样本（秒）的滚动直方图，用于计算分位数。
+
+    样本存放在定长的环形 array 中，记录一个样本是 O(1) 且不分配内存；
+    只有在 summary 时才排序计算分位数。
+    """
+
+    def __init__(self, window: int = WINDOW):
+        self.samples: array = array('d', bytes(8 * window))
+        self.window: int = window
+        self.count: int = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples[self.count % self.window] = seconds
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        """
+        返回：
+            Dict[str, float]: 总样本数 count，以及窗口内样本的 p50/p95/p99 与最大值（毫秒）。
+        """
+        recent: List[float] = sorted(self.samples[:min(self.count, self.window)])
+        result: Dict[str, float] = {'count': self.count}
+        if not recent:
+            return result
+        for p in PERCENTILES:
+            result[f'p{p}'] = recent[min(len(recent) * p // 100, len(recent) - 1)] * 1000
+        result['max'] = recent[-1] * 1000
+        return result
+
+
+class Metrics:
+    """
+    按名称记录耗时的指标集合，进程退出时自动写入日志。
+    """
+
+    def __init__(self):
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self.lock: threading.Lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        记录一个耗时样本（秒）。
+        """
+        histogram: Optional[RollingHistogram] = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, RollingHistogram())
+        histogram.add(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        记录 with 语句块的耗时。
+        """
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def flush(self) -> None:
+        """
+        把每个指标的分位数写入日志。
+        """
+        with self.lock:
+            names: List[str] = sorted(self.histograms)
+        if not names:
+            return
+        logging.info('Performance metrics (ms):')
+        for name in names:
+            summary: Dict[str, float] = self.histograms[name].summary()
+            values: str = '  '.join(f'{key}={value:.3f}' for key, value in summary.items() if key != 'count')
+            logging.info(f'  {name:<24} n={summary["count"]:<8} {values}')
+
+
+# 整个进程共用的指标集合
+METRICS: Final[Metrics] = Metrics()
@@ -0,0 +1,50 @@
+import cProfile
+import logging
+import os
+import time
+import tracemalloc
+from typing import *
+
+# 内存快照中写入日志的分配位置数
+TOP_ALLOCATIONS: Final[int] = 15
+
+
+def run_profiled(func: Callable[[], Any], log_path: str) -> Any:
+    """
+    在 cProfile 与 tracemalloc 下运行 func，结束时（包括 sys.exit）把结果写到日志目录。
+
+    生成的文件与 log.log 位于同一目录：
+        - profile-时间.prof：可用 pstats 或 snakeviz 查看的 CPU 分析数据。
+        - memory-时间.snapshot：tracemalloc 快照，可用 tracemalloc.Snapshot.load 读取。
+    内存占用最多的分配位置同时写入日志。
+
+    参数:
+        func (Callable[[], Any]): 要分析的函数。
+        log_path (str): 日志目录。
+
+    返回:
+        Any: func 的返回值。
+    """
+    stamp: str = time.strftime('%Y%m%d-%H%M%S')
+    profile_path: str = os.path.join(log_path, f'profile-{stamp}.prof')
+    snapshot_path: str = os.path.join(log_path, f'memory-{stamp}.snapshot')
+
+    tracemalloc.start()
+    profiler: cProfile.Profile = cProfile.Profile()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        os.makedirs(log_path, exist_ok=True)
+        profiler.dump_stats(profile_path)
+        snapshot.dump(snapshot_path)
+        logging.info(f'Profile written to {profile_path}')
+        logging.info(f'Memory snapshot written to {snapshot_path}')
+        logging.info(f'Traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB')
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            logging.info(f'  {stat}')
@@ -3,12 +3,10 @@ import os
 import sys
 from typing import *
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
-
-init(autoreset=True)
+from gui.key_input import get_input
 
 
 def load_log(config_log: Tuple[int, str, str, str, str]) -> None:
@@ -54,7 +52,7 @@ def load_log(config_log: Tuple[int, str, str, str, str]) -> None:
         # 处理日志初始化失败的情况
         clear()
         print(f'{Fore.RED}Log初始化失败： {str(e)}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         sys.exit()
 
@@ -67,3 +65,18 @@ def load_log(config_log: Tuple[int, str, str, str, str]) -> None:
     logging.info(f'Log datefmt: {log_datefmt}')
     logging.info('-----------------------------------')
     logging.info('Log initialized successfully.')
+
+
+def reload_log(config_log: Tuple[int, str, str, str, str]) -> None:
+    """
+    在运行中应用修改后的日志配置：更新日志级别以及已有处理器的格式。
+    日志文件路径与写入模式只在启动时生效。
+
+    参数:
+        config_log (Tuple[int, str, str, str, str]): 与 load_log 相同的日志配置元组。
+    """
+    root: logging.Logger = logging.getLogger()
+    root.setLevel(config_log[0])
+    for handler in root.handlers:
+        handler.setFormatter(logging.Formatter(config_log[3], config_log[4]))
+    logging.info('Log config reloaded.')
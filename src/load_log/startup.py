@@ -0,0 +1,92 @@
+import importlib
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import *
+
+
+class StartupTimer:
+    """
+    记录启动过程中各阶段（模块导入、配置加载等）的耗时。
+
+    日志系统初始化之前的记录先保存在内存中，report 时一并写入日志；
+    report 之后的记录（例如进入游戏时才导入的模块）直接写入日志。
+    """
+
+    def __init__(self):
+        self.started: float = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+        self.reported: bool = False
+
+    def record(self, name: str, start: float) -> None:
+        """
+        记录一个从 start 开始、到现在结束的阶段。
+
+        参数:
+            name (str): 阶段名称。
+            start (float): 阶段开始时的 time.perf_counter()。
+        """
+        elapsed: float = time.perf_counter() - start
+        if self.reported:
+            logging.info(f'Startup: {name} took {elapsed * 1000:.1f} ms')
+        else:
+            self.stages.append((name, elapsed))
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        记录 with 语句块的耗时。
+        """
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def report(self, started: float = None) -> None:
+        """
+        把已记录的各阶段耗时与启动总耗时写入日志。
+
+        参数:
+            started (float): 进程开始的 time.perf_counter()，默认为本对象创建的时刻。
+        """
+        total: float = time.perf_counter() - (self.started if started is None else started)
+        logging.info('Startup timing:')
+        for name, elapsed in self.stages:
+            logging.info(f'  {name:<32} {elapsed * 1000:8.1f} ms')
+        logging.info(f'  {"time to first menu":<32} {total * 1000:8.1f} ms')
+        self.stages = []
+        self.reported = True
+
+
+# 整个进程共用的启动计时器
+STARTUP_TIMER: Final[StartupTimer] = StartupTimer()
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    为包生成模块级 __getattr__：包中导出的名称在第一次被访问时才导入定义它的子模块，
+    导入耗时记录到 STARTUP_TIMER。
+
+    参数:
+        package (str): 包名，即包中的 __name__。
+        exports (Dict[str, str]): 导出名称 -> 定义它的子模块。
+
+    返回:
+        Callable[[str], Any]: 赋值给包的 __getattr__。
+    """
+    def __getattr__(name: str) -> Any:
+        module: Optional[str] = exports.get(name)
+        if module is None:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        if module in sys.modules:
+            value: Any = getattr(sys.modules[module], name)
+        else:
+            with STARTUP_TIMER.stage(f'import {module}'):
+                value = getattr(importlib.import_module(module), name)
+        # 写回包的命名空间，之后的访问不再经过 __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
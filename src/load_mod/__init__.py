@@ -1,4 +1,13 @@
-from load_mod.mod import *
-from load_mod.mod_main_loop import *
+from load_log.startup import lazy_exports
 
-__all__ = ['mod_pack_path', 'mod_menu', 'mod_menu_loop', 'load_mod_level', 'level_menu']
+__all__ = ['mod_pack_path', 'mod_menu', 'mod_menu_loop', 'load_mod_level', 'level_menu', 'ModIndex']
+
+# 子模块在第一次访问其导出名称时才导入，打开模组列表之前不加载模组相关代码
+__getattr__ = lazy_exports(__name__, {
+    'mod_pack_path': 'load_mod.mod',
+    'mod_menu': 'load_mod.mod',
+    'mod_menu_loop': 'load_mod.mod',
+    'load_mod_level': 'load_mod.mod',
+    'level_menu': 'load_mod.mod_main_loop',
+    'ModIndex': 'load_mod.mod_index'
+})
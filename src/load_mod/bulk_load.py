@@ -0,0 +1,82 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import *
+
+from colorama import *
+
+from clear_screen import *
+from gui.key_input import get_input
+from load_mod.labpack import read_json
+
+
+# 文件读取线程池的大小：I/O 受限，线程数可以多于 CPU 数，但要有上限
+LOADER_WORKERS: Final[int] = 8
+
+LOADER_EXECUTOR: Final[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=LOADER_WORKERS,
+                                                                 thread_name_prefix='mod-loader')
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def run_batch(func: Callable[[T], R], items: Sequence[T]) -> Tuple[List[Optional[R]], List[Tuple[T, str]]]:
+    """
+    在有界线程池中并发地对一批输入调用 func，结果保持输入顺序。
+
+    参数:
+        func (Callable[[T], R]): 处理单个输入的函数，失败时抛出异常。
+        items (Sequence[T]): 输入序列。
+
+    返回:
+        Tuple[List[Optional[R]], List[Tuple[T, str]]]:
+            - 与输入一一对应的结果，失败的位置为 None。
+            - 失败的输入及其错误信息。
+    """
+    if len(items) <= 1:
+        futures = None
+    else:
+        futures = [LOADER_EXECUTOR.submit(func, item) for item in items]
+
+    results: List[Optional[R]] = []
+    errors: List[Tuple[T, str]] = []
+    for i, item in enumerate(items):
+        try:
+            # 单个输入时直接在当前线程执行，省去线程切换
+            results.append(futures[i].result() if futures is not None else func(item))
+        except Exception as e:
+            logging.error(f'Mod load error: {item}: {e}')
+            results.append(None)
+            errors.append((item, str(e)))
+    return results, errors
+
+
+def read_json_batch(paths: Sequence[str]) -> Tuple[List[Any], List[Tuple[str, str]]]:
+    """
+    并发读取并解析一批 JSON 文件（pack.json、level.json、file.json 等），路径可以是 .labpack 中的文件。
+
+    参数:
+        paths (Sequence[str]): 文件路径序列。
+
+    返回:
+        Tuple[List[Any], List[Tuple[str, str]]]: 与路径一一对应的解析结果（失败为 None），
+        以及失败的文件与错误信息。
+    """
+    return run_batch(read_json, paths)
+
+
+def report_errors(errors: List[Tuple[Any, str]]) -> None:
+    """
+    在一个页面中列出一批加载错误，只等待一次按键。
+
+    参数:
+        errors (List[Tuple[Any, str]]): run_batch 返回的错误列表。
+    """
+    if not errors:
+        return
+    clear()
+    print(f'{Fore.RED}{len(errors)} 个文件加载失败：')
+    for item, message in errors:
+        print(f'{Fore.RED}  {item}: {message}')
+    get_input().read_key()
+    clear_button()
+    clear()
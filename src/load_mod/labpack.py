@@ -0,0 +1,268 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import *
+
+# 单文件模组包（.labpack）格式，所有整数均为小端序：
+#
+#   文件头      HEADER：魔数、版本、保留字段、中央索引的偏移与长度
+#   文件数据    模组目录中每个文件的原始字节，依次存放
+#   中央索引    UTF-8 JSON：{"pack": pack.json 的内容, "files": {相对路径: [偏移, 长度]}}
+#
+# 中央索引位于文件末尾，打包时可以边写文件数据边记录偏移。
+# 归档中的文件用虚拟路径访问：<归档路径>/<相对路径>，例如 ../mod/example.labpack/map/test.json，
+# 与模组目录中的路径拼接方式相同，因此关卡与地图的加载代码不需要区分两种模组。
+MAGIC: Final[bytes] = b'LPAK'
+VERSION: Final[int] = 1
+HEADER: Final[struct.Struct] = struct.Struct('<4sHHQQ')
+EXTENSION: Final[str] = '.labpack'
+
+
+class LabPack:
+    """
+    以内存映射方式打开的 .labpack 模组包。
+
+    打开时只读取文件头与中央索引；read 返回映射上的 memoryview，不复制数据，
+    关卡地图在被选中时才解析。
+    """
+
+    def __init__(self, path: str):
+        """
+        参数:
+            path (str): .labpack 文件路径。
+
+        异常:
+            ValueError: 文件不是合法的模组包。
+        """
+        with open(path, 'rb') as f:
+            self.mm: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path: str = path
+        self.view: memoryview = memoryview(self.mm)
+
+        if len(self.mm) < HEADER.size:
+            raise ValueError('Mod archive is truncated')
+        magic, version, _, index_offset, index_size = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a mod archive')
+        if version != VERSION:
+            raise ValueError(f'Unsupported mod archive version: {version}')
+        if index_offset + index_size > len(self.mm):
+            raise ValueError('Mod archive index is truncated')
+
+        index: dict = json.loads(self.mm[index_offset:index_offset + index_size].decode('utf-8'))
+        self.pack: dict = index['pack']
+        self.files: Dict[str, Tuple[int, int]] = {name: tuple(entry) for name, entry in index['files'].items()}
+        if any(offset + size > index_offset for offset, size in self.files.values()):
+            raise ValueError('Mod archive index is corrupt')
+
+    def read(self, name: str) -> memoryview:
+        """
+        返回：
+            memoryview: 归档中一个文件的内容（映射上的视图，不复制）。
+
+        异常:
+            FileNotFoundError: 归档中没有该文件。
+        """
+        entry: Optional[Tuple[int, int]] = self.files.get(name)
+        if entry is None:
+            raise FileNotFoundError(f'{name} not found in {self.path}')
+        offset, size = entry
+        return self.view[offset:offset + size]
+
+    def read_json(self, name: str) -> Any:
+        """
+        以UTF-8编码解析归档中的一个 JSON 文件。
+        """
+        if name == 'pack.json':
+            return self.pack
+        return json.loads(bytes(self.read(name)).decode('utf-8'))
+
+
+# 已打开的模组包：绝对路径 -> (mtime, 大小, LabPack)，文件被替换后重新打开
+_archives: Dict[str, Tuple[int, int, LabPack]] = {}
+_archives_lock: threading.Lock = threading.Lock()
+
+
+def open_pack(path: str) -> LabPack:
+    """
+    返回打开的模组包；文件的 mtime 与大小未变化时复用已有的映射。可以在后台线程中调用。
+    """
+    stat: os.stat_result = os.stat(path)
+    key: str = os.path.abspath(path)
+    with _archives_lock:
+        entry: Optional[Tuple[int, int, LabPack]] = _archives.get(key)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        # 旧的映射可能仍被缓存的地图引用，只丢弃引用，不主动关闭
+        archive: LabPack = LabPack(path)
+        _archives[key] = (stat.st_mtime_ns, stat.st_size, archive)
+        return archive
+
+
+def split_archive_path(path: str) -> Optional[Tuple[str, str]]:
+    """
+    拆分虚拟路径。
+
+    返回：
+        Optional[Tuple[str, str]]: (归档路径, 归档内的相对路径)；路径不在 .labpack 中时为 None。
+    """
+    parts: List[str] = path.replace('\\', '/').split('/')
+    for i, part in enumerate(parts[:-1]):
+        if part.endswith(EXTENSION):
+            return '/'.join(parts[:i + 1]), '/'.join(part for part in parts[i + 1:] if part)
+    return None
+
+
+def stat_path(path: str) -> os.stat_result:
+    """
+    与 os.stat 相同；归档中的文件返回归档本身的状态，归档被替换时其中所有文件一起失效。
+    """
+    archive: Optional[Tuple[str, str]] = split_archive_path(path)
+    return os.stat(path if archive is None else archive[0])
+
+
+def is_file(path: str) -> bool:
+    """
+    与 os.path.isfile 相同，同时支持归档中的文件。
+    """
+    archive: Optional[Tuple[str, str]] = split_archive_path(path)
+    if archive is None:
+        return os.path.isfile(path)
+    try:
+        return archive[1] in open_pack(archive[0]).files
+    except (OSError, ValueError):
+        return False
+
+
+def read_json(path: str) -> Any:
+    """
+    以UTF-8编码读取并解析一个 JSON 文件，路径可以是归档中的文件。
+    """
+    archive: Optional[Tuple[str, str]] = split_archive_path(path)
+    if archive is not None:
+        return open_pack(archive[0]).read_json(archive[1])
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def pack_folder(pack_path: str, pack: dict, mod_path: str = None) -> str:
+    """
+    返回模组包在模组根目录下的名称，用于拼接 level.json、file.json 与地图的路径。
+
+    参数:
+        pack_path (str): pack.json 的路径。
+        pack (dict): pack.json 的内容。
+        mod_path (str): 模组根目录。省略时视为归档所在的目录。
+
+    返回:
+        str: 目录中的模组包为 pack.json 中的 file；归档中的模组包为归档相对于模组根目录的路径，
+        因此子目录中的归档和改名后的归档都可以加载。
+    """
+    archive: Optional[Tuple[str, str]] = split_archive_path(pack_path)
+    if archive is not None:
+        root: str = mod_path if mod_path is not None else os.path.dirname(archive[0])
+        # 与 pack.json 中的 file 一样使用 '/' 分隔，拼接 level.json 等路径时 split_archive_path 才能识别
+        return os.path.relpath(archive[0], root).replace(os.sep, '/')
+    return pack['file']
+
+
+def write_pack(source: str, target: str) -> int:
+    """
+    把模组目录打包为 .labpack 文件。
+
+    参数:
+        source (str): 模组目录，其中必须有 pack.json。
+        target (str): 输出文件路径。
+
+    返回:
+        int: 打包的文件数。
+    """
+    with open(os.path.join(source, 'pack.json'), 'r', encoding='utf-8') as f:
+        pack: dict = json.load(f)
+
+    names: List[str] = []
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for file in sorted(files):
+            names.append(os.path.relpath(os.path.join(root, file), source).replace(os.sep, '/'))
+
+    entries: Dict[str, List[int]] = {}
+    temp: str = f'{target}.tmp'
+    with open(temp, 'wb') as f:
+        f.write(bytes(HEADER.size))
+        for name in names:
+            with open(os.path.join(source, name), 'rb') as member:
+                data: bytes = member.read()
+            entries[name] = [f.tell(), len(data)]
+            f.write(data)
+        index: bytes = json.dumps({'pack': pack, 'files': entries}, ensure_ascii=False).encode('utf-8')
+        index_offset: int = f.tell()
+        f.write(index)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(index)))
+    os.replace(temp, target)
+    return len(names)
+
+
+def extract_pack(source: str, target: str) -> int:
+    """
+    把 .labpack 文件解包为模组目录。
+
+    参数:
+        source (str): .labpack 文件路径。
+        target (str): 输出目录。
+
+    返回:
+        int: 解包的文件数。
+
+    异常:
+        ValueError: 归档中有指向输出目录之外的路径。
+    """
+    archive: LabPack = LabPack(source)
+    root: str = os.path.abspath(target)
+    for name in archive.files:
+        path: str = os.path.abspath(os.path.join(root, name))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f'Unsafe path in mod archive: {name}')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(archive.read(name))
+    return len(archive.files)
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：
+        python -m load_mod.labpack pack <模组目录> [输出.labpack]
+        python -m load_mod.labpack unpack <模组包.labpack> [输出目录]
+        python -m load_mod.labpack list <模组包.labpack>
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    if len(args) in (2, 3) and args[0] == 'pack':
+        source: str = args[1].rstrip('/\\')
+        target: str = args[2] if len(args) == 3 else source + EXTENSION
+        count: int = write_pack(source, target)
+        print(f'已打包 {count} 个文件到 {target}')
+        return 0
+    if len(args) in (2, 3) and args[0] == 'unpack':
+        target = args[2] if len(args) == 3 else os.path.splitext(args[1])[0]
+        count = extract_pack(args[1], target)
+        print(f'已解包 {count} 个文件到 {target}')
+        return 0
+    if len(args) == 2 and args[0] == 'list':
+        archive: LabPack = LabPack(args[1])
+        for name, (offset, size) in archive.files.items():
+            print(f'{offset:>12} {size:>12}  {name}')
+        return 0
+
+    print('用法: python -m load_mod.labpack pack <模组目录> [输出.labpack]\n'
+          '      python -m load_mod.labpack unpack <模组包.labpack> [输出目录]\n'
+          '      python -m load_mod.labpack list <模组包.labpack>')
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import *
+
+from engine.solver import CONVEYOR_KEYS, CONVEYOR_PUSH, solve
+from gui.map import parse_map
+from gui.world import WorldGrid
+from load_mod.labpack import is_file, pack_folder, read_json, split_archive_path
+from load_mod.mod import mod_pack_path
+
+DEFAULT_MOD_PATH: Final[str] = '../mod/'
+
+
+def check_type(value: Any, expected: type, name: str, errors: List[str]) -> bool:
+    """
+    校验字段类型，不符合时把错误追加到 errors。
+
+    返回:
+        bool: 类型是否正确。
+    """
+    if not isinstance(value, expected):
+        errors.append(f'{name}: expected {expected.__name__}, got {type(value).__name__}')
+        return False
+    return True
+
+
+def load_json(path: str, errors: List[str]) -> Any:
+    """
+    读取 JSON 文件（可以是 .labpack 中的文件），失败时记录错误并返回 None。
+    """
+    try:
+        return read_json(path)
+    except Exception as e:
+        errors.append(f'{path}: {e}')
+        return None
+
+
+def lint_map(path: str) -> dict:
+    """
+    检查单张地图：能否解析、起点唯一、传送带不会把玩家推出地图、至少有一个可到达的终点。
+    开放世界（.world）没有整张地图的图块索引，也无法整体搜索，只检查出生点不在墙或陷阱上。
+
+    参数:
+        path (str): 地图文件路径。
+
+    返回:
+        dict: 该地图的检查结果，包含 errors 列表与最短通关步数 steps（无法通关时为 None）。
+    """
+    result: dict = {'map': path, 'errors': [], 'steps': None}
+    try:
+        # parse_map 已经拒绝了没有起点或有多个起点的地图
+        map_data: dict = parse_map(path)
+    except Exception as e:
+        result['errors'].append(f'parse: {e}')
+        return result
+
+    map_ = map_data['map']
+    if isinstance(map_, WorldGrid):
+        tile: str = map_.get(map_data['player_y'], map_data['player_x'])
+        if tile in '#@X!':
+            result['errors'].append(f'world start point is on {tile!r}')
+        return result
+
+    index: dict = map_data['index']
+    for tile, (dy, dx) in zip(CONVEYOR_KEYS, CONVEYOR_PUSH):
+        for y, x in index[tile]:
+            if not (0 <= y + dy < map_.height and 0 <= x + dx < map_.width):
+                result['errors'].append(f'conveyor {tile!r} at ({y}, {x}) pushes out of bounds')
+
+    if not index['E']:
+        result['errors'].append('no exit')
+        return result
+    keys: Optional[str] = solve(map_data)
+    if keys is None:
+        result['errors'].append('no reachable exit')
+    else:
+        result['steps'] = len(keys)
+    return result
+
+
+def lint_pack(mod_path: str, pack_path: str) -> dict:
+    """
+    检查一个模组包：pack.json、level.json、file.json 的结构，以及 file.json 中列出的每张地图。
+    在工作进程中运行。
+
+    参数:
+        mod_path (str): 模组根目录，与游戏中的 mod_path 相同。
+        pack_path (str): pack.json 的路径。
+
+    返回:
+        dict: 该模组包的检查结果。
+    """
+    errors: List[str] = []
+    result: dict = {'pack': pack_path, 'errors': errors, 'levels': []}
+
+    pack: Any = load_json(pack_path, errors)
+    if pack is None or not check_type(pack, dict, 'pack.json', errors):
+        return result
+
+    title: Any = pack.get('title')
+    if check_type(title, dict, 'pack.json title', errors):
+        check_type(title.get('text'), str, 'pack.json title.text', errors)
+        if 'color' in title:
+            check_type(title['color'], str, 'pack.json title.color', errors)
+    if 'describe' in pack:
+        check_type(pack['describe'], str, 'pack.json describe', errors)
+    # 归档中的模组包按归档相对于模组根目录的路径定位，不使用 file 字段
+    file: Any = pack_folder(pack_path, pack, mod_path) if split_archive_path(pack_path) else pack.get('file')
+    if not check_type(file, str, 'pack.json file', errors):
+        return result
+
+    # 与 load_mod_level 使用相同的路径拼接方式
+    level: Any = load_json(f'{mod_path}{file}/level.json', errors)
+    files: Any = load_json(f'{mod_path}{file}/file.json', errors)
+    if level is None or files is None:
+        return result
+    if check_type(level, list, 'level.json', errors):
+        for i, entry in enumerate(level):
+            if check_type(entry, dict, f'level.json[{i}]', errors):
+                check_type(entry.get('text'), str, f'level.json[{i}].text', errors)
+                if entry.get('mode', 'turn') not in ('turn', 'realtime'):
+                    errors.append(f'level.json[{i}].mode: expected "turn" or "realtime", got {entry["mode"]!r}')
+    if not check_type(files, list, 'file.json', errors):
+        return result
+    if isinstance(level, list) and len(level) != len(files):
+        errors.append(f'level.json has {len(level)} entries but file.json has {len(files)}')
+
+    for i, name in enumerate(files):
+        if not check_type(name, str, f'file.json[{i}]', errors):
+            continue
+        map_path: str = f'{mod_path}{file}/map/{name}'
+        if not is_file(map_path):
+            result['levels'].append({'map': map_path, 'errors': ['missing'], 'steps': None})
+            continue
+        result['levels'].append(lint_map(map_path))
+    return result
+
+
+def lint(mod_path: str, jobs: int = None) -> dict:
+    """
+    检查整个模组目录，每个模组包在进程池中独立检查。
+
+    参数:
+        mod_path (str): 模组根目录。
+        jobs (int): 工作进程数，默认为 CPU 数。
+
+    返回:
+        dict: 机器可读的检查报告。
+    """
+    packs: List[str] = mod_pack_path(mod_path)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results: List[dict] = list(executor.map(lint_pack, [mod_path] * len(packs), packs))
+
+    failed: int = sum(1 for r in results if r['errors'] or any(level['errors'] for level in r['levels']))
+    return {
+        'mod_path': mod_path,
+        'packs': results,
+        'summary': {
+            'packs': len(results),
+            'levels': sum(len(r['levels']) for r in results),
+            'failed_packs': failed
+        }
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    命令行入口：python -m load_mod.lint [模组目录] [--jobs N] [--output 报告.json]
+
+    报告写到 --output 指定的文件或标准输出；有任何错误时返回 1。
+    """
+    args: List[str] = list(sys.argv[1:] if argv is None else argv)
+    options: Dict[str, Optional[str]] = {'--jobs': None, '--output': None}
+    # 选项后面必须跟着取值，位于末尾或后面紧跟另一个选项时提示用法
+    missing: bool = False
+    for option in options:
+        if option in args:
+            position: int = args.index(option)
+            if position + 1 == len(args) or args[position + 1] in options:
+                missing = True
+                break
+            options[option] = args[position + 1]
+            del args[position:position + 2]
+    if missing or len(args) > 1:
+        print('用法: python -m load_mod.lint [模组目录] [--jobs N] [--output 报告.json]')
+        return 2
+
+    jobs: Optional[int] = int(options['--jobs']) if options['--jobs'] else None
+    report: dict = lint(args[0] if args else DEFAULT_MOD_PATH, jobs)
+    text: str = json.dumps(report, ensure_ascii=False, indent=2)
+    if options['--output']:
+        with open(options['--output'], 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if report['summary']['failed_packs'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,16 @@
-import json
 import logging
 import os
 from typing import *
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
+from gui.key_input import get_input
 from gui import *
-
-init(autoreset=True)
+from gui.menu_source import LazyMenu
+from load_mod.bulk_load import read_json_batch, report_errors, run_batch
+from load_mod.labpack import EXTENSION, pack_folder, read_json
+from load_mod.mod_index import ModIndex
 
 
 def join_path(files, root, pack_list) -> Optional[list]:
@@ -33,20 +34,26 @@ def join_path(files, root, pack_list) -> Optional[list]:
     return None  # 遍历完所有文件仍未找到时返回 None
 
 
-def mod_pack_path(mod_folder_path: str) -> List[str]:
+def mod_pack_path(mod_folder_path: str, mod_index: ModIndex = None) -> List[str]:
     """
     遍历指定的 mod 文件夹，查找所有名为 'pack.json' 的文件，并返回它们的完整路径列表。
+    .labpack 模组包与目录中的模组包同等对待，返回其中 pack.json 的虚拟路径（<归档>/pack.json）。
 
     参数:
         mod_folder_path (str): mod 文件夹的根路径。
+        mod_index (ModIndex): 模组发现索引。提供时只对目录做增量检查，否则完整遍历整个目录树。
 
     返回:
         List[str]: 包含所有找到的 'pack.json' 文件完整路径的列表。
     """
+    if mod_index is not None:
+        return mod_index.scan(mod_folder_path)
+
     pack_list: list = []
 
     # 遍历 mod 文件夹及其子目录
     for root, dirs, files in os.walk(mod_folder_path):
+        pack_list.extend(os.path.join(root, file, 'pack.json') for file in files if file.endswith(EXTENSION))
         pack = join_path(files, root, pack_list)
         if pack is None:
             continue
@@ -55,13 +62,46 @@ def mod_pack_path(mod_folder_path: str) -> List[str]:
     return pack_list
 
 
-def load_pack(pack_path: str, all_color: dict) -> Optional[Tuple[str, str, str]]:
+def parse_pack(pack_path: str, all_color: dict, mod_index: ModIndex = None,
+               mod_path: str = None) -> Tuple[str, str, str]:
+    """
+    解析指定路径的mod配置文件，不做错误处理。可以在后台线程中调用。
+
+    参数:
+        pack_path (str): mod配置文件的路径。
+        all_color (dict): 颜色映射字典，用于根据配置中的颜色值获取对应的颜色代码。
+        mod_index (ModIndex): 模组发现索引。提供时文件未变化则直接使用缓存的解析结果。
+        mod_path (str): 模组根目录，用于确定子目录中 .labpack 归档的相对路径。
+
+    返回:
+        Tuple[str, str, str]: 格式化后的标题（带颜色）、mod的描述信息、mod对应的文件名。
+
+    异常:
+        文件读取、解析失败或缺少必要字段时抛出异常。
+    """
+    if mod_index is not None:
+        pack: dict = mod_index.read_pack(pack_path)
+    else:
+        pack: dict = read_json(pack_path)
+    title: dict = pack['title']
+    title_text: str = title['text']
+    title_color: str = all_color.get(title.get('color'), Style.RESET_ALL)
+    title: str = f'{title_color}{title_text}{Style.RESET_ALL}'
+    describe_: str = pack.get('describe', '无描述')
+    file: str = pack_folder(pack_path, pack, mod_path)
+    return title, describe_, file
+
+
+def load_pack(pack_path: str, all_color: dict, mod_index: ModIndex = None,
+              mod_path: str = None) -> Optional[Tuple[str, str, str]]:
     """
     加载指定路径的mod配置文件，并解析其中的标题、描述和文件信息。
 
     参数:
         pack_path (str): mod配置文件的路径。
         all_color (dict): 颜色映射字典，用于根据配置中的颜色值获取对应的颜色代码。
+        mod_index (ModIndex): 模组发现索引。提供时文件未变化则直接使用缓存的解析结果。
+        mod_path (str): 模组根目录，见 parse_pack。
 
     返回:
         Tuple[str, str, str]: 包含三个元素的元组：
@@ -70,57 +110,81 @@ def load_pack(pack_path: str, all_color: dict) -> Optional[Tuple[str, str, str]]
             - mod对应的文件名。
 
     异常处理:
-        如果在读取或解析过程中发生异常，会记录错误日志并提示用户，然后退出程序。
+        如果在读取或解析过程中发生异常，会记录错误日志并提示用户，然后返回 None。
     """
     try:
-        with open(pack_path, 'r', encoding='utf-8') as f:
-            pack: dict = json.load(f)
-            title: dict = pack['title']
-            title_text: str = title['text']
-            title_color: str = all_color.get(title.get('color'), Style.RESET_ALL)
-            title: str = f'{title_color}{title_text}{Style.RESET_ALL}'
-            describe_: str = pack.get('describe', '无描述')
-            file: str = pack['file']
-            return title, describe_, file
+        return parse_pack(pack_path, all_color, mod_index, mod_path)
 
     except Exception as e:
         clear()
         logging.error(f'Mod load error: {e}')
         print(f'{Fore.RED}一个mod加载失败： {e}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         clear()
         return None
 
 
-def mod_menu(pack_list: list, all_color: dict) -> Tuple[int, list, list]:
+def mod_menu(pack_list: list, all_color: dict, mod_index: ModIndex = None,
+             mod_path: str = None) -> Tuple[int, LazyMenu, LazyMenu]:
     """
     构建mod选择菜单，展示所有可用的mod及其描述信息。
 
+    菜单是按需生成的虚拟列表：只有滚动到可见范围内的mod才会被解析，
+    因此打开菜单的耗时与mod数量无关。同一页的 pack.json 在线程池中并发读取，
+    解析失败的mod显示为一条红色错误信息。
+
     参数:
         pack_list (list): 包含所有mod配置文件路径的列表。
         all_color (dict): 颜色映射字典，用于格式化标题颜色。
+        mod_index (ModIndex): 模组发现索引，用于复用已解析的 pack.json。
+        mod_path (str): 模组根目录，见 parse_pack。
 
     返回:
-        Tuple[int, list, list]: 包含三个元素的元组：
+        Tuple[int, LazyMenu, LazyMenu]: 包含三个元素的元组：
             - 菜单项总数（包括“退出”选项）。
             - 格式化后的菜单项列表。
-            - 每个mod对应的文件名列表。
+            - 每个mod对应的文件名列表（解析失败的mod为 None）。
     """
-    menu: list = []
-    mod_id: list = []
-    for i in pack_list:
-        title, describe_, file = load_pack(i, all_color)
-        menu.append(f'{title}\n描述：{describe_}\n{Fore.LIGHTBLACK_EX}文件名地址： mod/{file}')
-        mod_id.append(file)
-    menu.append(f'{Fore.RED}退出')
+    def pack(i: int) -> Optional[Tuple[str, str, str]]:
+        try:
+            return parse_pack(pack_list[i], all_color, mod_index, mod_path)
+        except Exception as e:
+            logging.error(f'Mod load error: {e}')
+            return None
+
+    def pack_batch(indexes: List[int]) -> List[Optional[Tuple[str, str, str]]]:
+        # 错误已由 run_batch 逐个写入日志，失败的mod在菜单中显示为错误信息
+        return run_batch(lambda i: parse_pack(pack_list[i], all_color, mod_index, mod_path), indexes)[0]
+
+    def entry(i: int) -> str:
+        if i == len(pack_list):
+            return f'{Fore.RED}退出'
+        info: Optional[Tuple[str, str, str]] = packs[i]
+        if info is None:
+            return f'{Fore.RED}一个mod加载失败\n{Fore.RED}文件：{pack_list[i]}\n'
+        title, describe_, file = info
+        return f'{title}\n描述：{describe_}\n{Fore.LIGHTBLACK_EX}文件名地址： mod/{file}'
+
+    def entry_batch(indexes: List[int]) -> List[str]:
+        packs.preload(i for i in indexes if i < len(pack_list))
+        return [entry(i) for i in indexes]
+
+    def file_name(i: int) -> Optional[str]:
+        info: Optional[Tuple[str, str, str]] = packs[i]
+        return info[2] if info is not None else None
+
+    packs: LazyMenu = LazyMenu(len(pack_list), pack, load_batch=pack_batch)
+    menu: LazyMenu = LazyMenu(len(pack_list) + 1, entry, entry_height=3, load_batch=entry_batch)
+    mod_id: LazyMenu = LazyMenu(len(pack_list), file_name)
     quit_: int = len(menu)
     return quit_, menu, mod_id
 
 
-def load_mod_level(mod_path: str, path: str, all_color: dict) -> Optional[Tuple[list, list]]:
+def load_mod_level(mod_path: str, path: str, all_color: dict) -> Optional[Tuple[list, list, list]]:
     """
     加载并处理指定路径下的关卡和文件数据，返回格式化后的关卡菜单和文件列表。
+    level.json 与 file.json 并发读取，读取失败的文件在同一个页面中列出。
 
     参数:
         mod_path (str): Mod的根目录路径。
@@ -128,48 +192,51 @@ def load_mod_level(mod_path: str, path: str, all_color: dict) -> Optional[Tuple[
         all_color (dict): 颜色映射字典，用于为关卡文本添加颜色。
 
     返回:
-        Optional[Tuple[list, list]]:
+        Optional[Tuple[list, list, list]]:
             - 第一个元素是格式化后的关卡菜单列表（带颜色）。
             - 第二个元素是加载的文件列表。
+            - 第三个元素是每个关卡的运行模式（level.json 中的 mode，缺省为 'turn'）。
             - 如果发生异常则返回None。
     """
     level_menu: list = []
-    try:
-        # 尝试读取关卡配置文件和文件配置文件
-        with open(f'{mod_path}{path}/level.json', 'r', encoding='utf-8') as f:
-            level: list = json.load(f)
-        with open(f'{mod_path}{path}/file.json', 'r', encoding='utf-8') as f:
-            file: list = json.load(f)
+    level_mode: list = []
+    # 并发读取关卡配置文件和文件配置文件，所有读取错误只提示一次
+    (level, file), errors = read_json_batch([f'{mod_path}{path}/level.json', f'{mod_path}{path}/file.json'])
+    if errors:
+        report_errors(errors)
+        return None
 
+    try:
         # 遍历关卡数据，根据颜色映射为每个关卡文本添加颜色，并构建关卡菜单
         for i in level:
             color: int = all_color.get(i.get('color'), Style.RESET_ALL)
             text: str = f'{color}{i.get("text")}{Style.RESET_ALL}'
             level_menu.append(text)
+            level_mode.append(i.get('mode', 'turn'))
 
         level_menu.append(f'{Fore.RED}退出')
 
-        # 返回格式化后的关卡菜单和文件列表
-        return level_menu, file
+        # 返回格式化后的关卡菜单、文件列表和运行模式
+        return level_menu, file, level_mode
     except Exception as e:
         # 发生异常时清屏并记录错误日志，提示用户后等待按键继续
         clear()
         logging.error(f'Mod load error: {e}')
         print(f'{Fore.RED}一个mod加载失败： {e}')
-        keyboard.read_key()
+        get_input().read_key()
         clear_button()
         clear()
         return None
 
 
-def mod_menu_loop(quit_: int, menu: list, mod_id: list) -> Optional[str]:
+def mod_menu_loop(quit_: int, menu: Sequence[str], mod_id: Sequence[Optional[str]]) -> Optional[str]:
     """
     进入mod选择循环，允许用户通过菜单选择并加载特定的mod。
 
     参数:
         quit_ (int): 表示“退出”选项在菜单中的索引位置。
-        menu (list): 格式化后的菜单项列表。
-        mod_id (list): 每个mod对应的文件名列表。
+        menu (Sequence[str]): 格式化后的菜单项列表（可以是 LazyMenu）。
+        mod_id (Sequence[Optional[str]]): 每个mod对应的文件名列表。
 
     功能说明:
         循环显示菜单供用户选择。如果用户选择某个mod，则尝试加载该mod；
@@ -183,13 +250,15 @@ def mod_menu_loop(quit_: int, menu: list, mod_id: list) -> Optional[str]:
             break
 
         try:
+            if mod_id[choose] is None:
+                raise ValueError(f'pack {choose + 1} failed to load')
             print(mod_id[choose])
             return mod_id[choose]
         except Exception as e:
             clear()
             logging.error(f'Mod load error: {e}')
             print(f'{Fore.RED}一个mod加载失败： {e}')
-            keyboard.read_key()
+            get_input().read_key()
             clear_button()
             clear()
             return None
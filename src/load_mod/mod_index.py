@@ -0,0 +1,185 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from typing import *
+
+from load_mod.labpack import EXTENSION, read_json, stat_path
+
+# 清单文件格式版本，格式变化时旧清单会被整体丢弃
+MANIFEST_VERSION: Final[int] = 2
+MANIFEST_NAME: Final[str] = 'mod_index.json'
+
+# 从模组根目录向下最多搜索的层数（模组包通常位于第 1 层）
+MAX_DEPTH: Final[int] = 3
+
+# 模组包内不再向下搜索的子目录：地图目录中只有地图文件
+SKIP_IN_PACK: Final[Tuple[str, ...]] = ('map',)
+
+
+class ModIndex:
+    """
+    持久化的模组发现索引。
+
+    清单保存在缓存目录中，记录每个目录的 mtime、子目录列表、.labpack 模组包列表以及是否含有 pack.json，
+    以及每个 pack.json 解析后的内容和它的 mtime/大小（归档中的 pack.json 使用归档的 mtime/大小）。
+    目录的 mtime 在其中增删改名条目时才会变化，因此模组没有变化时，
+    一次扫描只需要对每个目录调用一次 stat，不必重新列目录或解析 pack.json。
+    """
+
+    def __init__(self, cache_path: str, max_depth: int = MAX_DEPTH):
+        """
+        参数:
+            cache_path (str): 缓存目录，清单文件保存在其中。
+            max_depth (int): 从模组根目录向下搜索的最大层数。
+        """
+        self.path: str = os.path.join(cache_path, MANIFEST_NAME)
+        self.max_depth: int = max_depth
+        self.dirs: Dict[str, dict] = {}
+        self.packs: Dict[str, dict] = {}
+        self.dirty: bool = False
+        # 菜单的后台预取线程也会调用 read_pack，修改清单时需要加锁
+        self.lock: threading.RLock = threading.RLock()
+        self.load()
+        # 菜单中按需解析的 pack.json 在退出时写回清单
+        atexit.register(self.save)
+
+    def load(self) -> None:
+        """
+        从磁盘读取清单；文件不存在、损坏或版本不符时从空清单开始。
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest: dict = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                raise ValueError(f'manifest version {manifest.get("version")}')
+            self.dirs = manifest['dirs']
+            self.packs = manifest['packs']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f'Mod index discarded: {e}')
+            self.dirs, self.packs = {}, {}
+
+    def save(self) -> None:
+        """
+        清单有变化时原子地写回磁盘（先写临时文件再替换）。
+        """
+        with self.lock:
+            if not self.dirty:
+                return
+            manifest: dict = {'version': MANIFEST_VERSION, 'dirs': dict(self.dirs), 'packs': dict(self.packs)}
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp: str = f'{self.path}.tmp'
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(temp, self.path)
+        except OSError as e:
+            # 缓存写入失败不影响游戏，下次重新扫描即可
+            logging.warning(f'Mod index save failed: {e}')
+
+    def list_dir(self, path: str, mtime_ns: int) -> dict:
+        """
+        返回目录的缓存条目，mtime 变化时用 os.scandir 重新列目录。
+
+        参数:
+            path (str): 目录路径。
+            mtime_ns (int): 目录当前的 mtime。
+
+        返回:
+            dict: {'mtime_ns': int, 'subdirs': List[str], 'archives': List[str], 'pack': bool}
+        """
+        entry: Optional[dict] = self.dirs.get(path)
+        if entry is not None and entry['mtime_ns'] == mtime_ns:
+            return entry
+
+        subdirs: List[str] = []
+        archives: List[str] = []
+        pack: bool = False
+        with os.scandir(path) as it:
+            for item in it:
+                if item.is_dir():
+                    subdirs.append(item.name)
+                elif item.name == 'pack.json' and item.is_file():
+                    pack = True
+                elif item.name.endswith(EXTENSION) and item.is_file():
+                    archives.append(item.name)
+        entry = {'mtime_ns': mtime_ns, 'subdirs': sorted(subdirs), 'archives': sorted(archives), 'pack': pack}
+        with self.lock:
+            self.dirs[path] = entry
+            self.dirty = True
+        return entry
+
+    def scan(self, mod_path: str) -> List[str]:
+        """
+        增量扫描模组目录，返回所有 pack.json 的路径（按目录顺序排序），.labpack 模组包返回 <归档>/pack.json。
+
+        参数:
+            mod_path (str): 模组根目录。
+
+        返回:
+            List[str]: pack.json 路径列表，路径形式与 mod_pack_path 相同。
+        """
+        pack_list: List[str] = []
+        seen: Set[str] = set()
+        stack: List[Tuple[str, int]] = [(mod_path, 0)]
+
+        while stack:
+            path, depth = stack.pop()
+            try:
+                mtime_ns: int = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(path)
+            entry: dict = self.list_dir(path, mtime_ns)
+            if entry['pack']:
+                pack_list.append(os.path.join(path, 'pack.json'))
+            pack_list.extend(os.path.join(path, name, 'pack.json') for name in entry['archives'])
+            if depth >= self.max_depth:
+                continue
+            # 逆序入栈，使出栈顺序与子目录的字典序一致
+            for name in reversed(entry['subdirs']):
+                if entry['pack'] and name in SKIP_IN_PACK:
+                    continue
+                stack.append((os.path.join(path, name), depth + 1))
+
+        # 丢弃已经不存在的目录和模组包
+        packs: Set[str] = set(pack_list)
+        with self.lock:
+            for path in [path for path in self.dirs if path not in seen]:
+                del self.dirs[path]
+                self.dirty = True
+            for path in [path for path in self.packs if path not in packs]:
+                del self.packs[path]
+                self.dirty = True
+
+        self.save()
+        return pack_list
+
+    def read_pack(self, pack_path: str) -> dict:
+        """
+        读取 pack.json；文件的 mtime 与大小未变化时直接返回缓存的解析结果。
+
+        参数:
+            pack_path (str): pack.json 路径，可以是 .labpack 中的 pack.json。
+
+        返回:
+            dict: pack.json 的内容。
+
+        异常:
+            OSError / json.JSONDecodeError: 文件读取或解析失败。
+        """
+        stat: os.stat_result = stat_path(pack_path)
+        with self.lock:
+            entry: Optional[dict] = self.packs.get(pack_path)
+        if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry['pack']
+
+        pack: dict = read_json(pack_path)
+        with self.lock:
+            self.packs[pack_path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'pack': pack}
+            self.dirty = True
+        return pack
@@ -1,18 +1,17 @@
 import logging
 from typing import *
 
-import keyboard
 from colorama import *
 
 from clear_screen import *
+from gui.key_input import get_input
 from game import *
 from gui import *
 from load_mod import load_mod_level
 
-init(autoreset=True)
 
-
-def game_loop(mod_path: str, mod_name: str, file: str, color_dict: dict, all_color: dict) -> str:
+def game_loop(mod_path: str, mod_name: str, file: str, color_dict: dict, all_color: dict,
+              render_config: dict = None, mode: str = 'turn') -> str:
     """
     主游戏循环函数，根据选择的地图路径和关卡索引执行游戏逻辑。
 
@@ -30,15 +29,15 @@ def game_loop(mod_path: str, mod_name: str, file: str, color_dict: dict, all_col
         # noinspection PyTypeHints
         map_data: dict = read_map(f'{mod_path}{mod_name}/map/{file}')
 
-        # 执行当前地图的游戏循环逻辑
-        result: str = map_loop(map_data, color_dict, all_color)
+        # 按关卡的运行模式执行当前地图的游戏循环逻辑
+        result: str = play_map(map_data, color_dict, all_color, render_config, mode)
 
         # 根据游戏循环的结果决定下一步操作
         if result == 'win':
             # 胜利时结束当前关卡并返回完成状态
             clear()
             print('恭喜过关！')
-            keyboard.read_key()
+            get_input().read_key()
             clear_button()
             clear()
             return 'finish'
@@ -50,7 +49,8 @@ def game_loop(mod_path: str, mod_name: str, file: str, color_dict: dict, all_col
             return 'finish'
 
 
-def trigger_game_choose(mod_path: str, mod_name: str, file: str, color_dict: dict, all_color: dict) -> Optional[bool]:
+def trigger_game_choose(mod_path: str, mod_name: str, file: str, color_dict: dict, all_color: dict,
+                        render_config: dict = None, mode: str = 'turn') -> Optional[bool]:
     """
     触发游戏选择逻辑，根据用户选择执行游戏循环直到满足退出条件。
 
@@ -65,7 +65,7 @@ def trigger_game_choose(mod_path: str, mod_name: str, file: str, color_dict: dic
     while True:
 
         # 调用游戏循环函数，传入用户选择和地图路径，并获取返回状态
-        cond: str = game_loop(mod_path, mod_name, file, color_dict, all_color)
+        cond: str = game_loop(mod_path, mod_name, file, color_dict, all_color, render_config, mode)
 
         # 根据游戏循环的返回状态决定下一步操作
         if cond == 'finish':
@@ -76,7 +76,8 @@ def trigger_game_choose(mod_path: str, mod_name: str, file: str, color_dict: dic
             continue
 
 
-def start_game(mod_path: str, mod_name: str, file: str, color_dict: dict, all_color: dict) -> None:
+def start_game(mod_path: str, mod_name: str, file: str, color_dict: dict, all_color: dict,
+               render_config: dict = None, mode: str = 'turn') -> None:
     """
     启动游戏主循环，显示菜单并根据用户选择触发相应操作。
 
@@ -89,12 +90,13 @@ def start_game(mod_path: str, mod_name: str, file: str, color_dict: dict, all_co
     """
     while True:
 
-        if_break: bool = trigger_game_choose(mod_path, mod_name, file, color_dict, all_color)
+        if_break: bool = trigger_game_choose(mod_path, mod_name, file, color_dict, all_color, render_config, mode)
         if if_break:
             break
 
 
-def level_menu(mod_path: str, mod_name: str, path: str, color_dict: dict, all_color: dict) -> None:
+def level_menu(mod_path: str, mod_name: str, path: str, color_dict: dict, all_color: dict,
+               render_config: dict = None) -> None:
     """
     显示并处理关卡选择菜单，允许用户选择并启动特定关卡。
 
@@ -103,6 +105,7 @@ def level_menu(mod_path: str, mod_name: str, path: str, color_dict: dict, all_co
         path (str): 关卡数据文件的路径。
         color_dict (dict): 当前使用的颜色配置字典。
         all_color (dict): 所有可用的颜色配置字典。
+        render_config (dict): 渲染配置（镜头与死区），见 load_config_render。
 
     返回值:
         None: 该函数无返回值。
@@ -112,7 +115,7 @@ def level_menu(mod_path: str, mod_name: str, path: str, color_dict: dict, all_co
     if result is None:
         logging.error("Failed to load mod level data.")
         return
-    level_menu_, level_id = result
+    level_menu_, level_id, level_mode = result
 
     # 验证加载的数据类型是否正确
     if not isinstance(level_menu_, list) or not isinstance(level_id, list):
@@ -134,13 +137,13 @@ def level_menu(mod_path: str, mod_name: str, path: str, color_dict: dict, all_co
                 logging.error("Invalid file type in level_id.")
                 continue
             # 启动游戏并加载选定的关卡
-            start_game(mod_path, mod_name, file, color_dict, all_color)
+            start_game(mod_path, mod_name, file, color_dict, all_color, render_config, level_mode[choose])
         except Exception as e:
             # 处理异常情况：清屏、记录错误日志并提示用户
             clear()
             logging.error(f"Mod load error: {e}")
             print(f"{Fore.RED}地图加载失败： {e}")
-            keyboard.read_key()
+            get_input().read_key()
             clear_button()
             clear()
             return
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 游戏以 src 为工作目录运行，模块之间按顶层包名互相导入
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
@@ -0,0 +1,42 @@
+import copy
+import json
+import os
+
+import pytest
+
+from benchmark.corpus import synthetic_rows
+from benchmark.suite import compare, run_suite
+from gui.grid import Grid
+
+SRC: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+
+
+@pytest.fixture
+def in_src(monkeypatch):
+    # 配置路径相对于 src 目录
+    monkeypatch.chdir(SRC)
+
+
+def test_synthetic_rows_build_a_grid():
+    grid = Grid.from_rows(synthetic_rows(7, 3))
+    assert (grid.height, grid.width) == (7, 7)
+    assert grid.get(1, 1) == 'S' and grid.get(5, 5) == 'E'
+
+
+def test_run_suite_and_compare(in_src, tmp_path):
+    result = run_suite(str(tmp_path), (7,), (10,), repeat=1)
+    assert {'read_map.json/7', 'read_map.lmap/7', 'map_loop/7', 'mod_menu/10'} <= set(result['results'])
+    for case in result['results'].values():
+        assert case['runs'] == 1
+        assert 0 <= case['min'] <= case['median']
+        assert case['peak_kib'] >= 0
+
+    # 结果可以保存为 JSON 再读回比较
+    saved = json.loads(json.dumps(result))
+    assert compare(saved, result, 0.1) == []
+
+    slower = copy.deepcopy(saved)
+    case = slower['results']['map_loop/7']
+    case['median'] = saved['results']['map_loop/7']['median'] * 2 + 1
+    regressions = compare(saved, slower, 0.1)
+    assert len(regressions) == 1 and regressions[0].startswith('map_loop/7 median')
@@ -0,0 +1,81 @@
+import pytest
+
+from engine import BACK, BLOCKED, IGNORED, MOVE, RELOAD, RESET, WIN, Engine, GameState
+from gui.grid import Grid, build_tile_index
+
+
+def level(*lines: str) -> dict:
+    grid = Grid.from_rows([list(line) for line in lines])
+    (player_y, player_x), = build_tile_index(grid)['S']
+    return {'map': grid, 'player_y': player_y, 'player_x': player_x}
+
+
+@pytest.fixture(params=['table', 'tiles'])
+def make_engine(request):
+    """
+    同一组用例分别在转移表与逐图块判断两条路径上运行。
+    """
+    def make(*lines: str) -> Engine:
+        engine = Engine(level(*lines))
+        if request.param == 'tiles':
+            engine.table = None
+        return engine
+    return make
+
+
+def test_move_and_wall(make_engine):
+    engine = make_engine('S #',
+                         '   ')
+    assert engine.step('d') == (GameState(0, 1), MOVE)
+    assert engine.step('d') == (GameState(0, 1), BLOCKED)
+    assert engine.step('s') == (GameState(1, 1), MOVE)
+
+
+@pytest.mark.parametrize('action', ['w', 'a'])
+def test_leaving_the_map_is_blocked(make_engine, action):
+    engine = make_engine('S ')
+    assert engine.step(action) == (GameState(0, 0), BLOCKED)
+
+
+@pytest.mark.parametrize('hazard', ['@', 'X', '!'])
+def test_hazards_send_the_player_back_to_the_start(make_engine, hazard):
+    engine = make_engine(f'S {hazard}')
+    engine.step('d')
+    assert engine.step('d') == (GameState(0, 0), RESET)
+
+
+def test_reaching_the_exit_wins(make_engine):
+    engine = make_engine('SE')
+    assert engine.step('d') == (GameState(0, 1), WIN)
+
+
+def test_conveyor_pushes_two_more_cells(make_engine):
+    engine = make_engine('S>   ')
+    assert engine.step('d') == (GameState(0, 3), MOVE)
+
+
+def test_conveyor_ignores_the_direction_of_entry(make_engine):
+    engine = make_engine('Sv',
+                         '  ',
+                         '  ',
+                         '  ')
+    assert engine.step('d') == (GameState(2, 1), MOVE)
+
+
+def test_conveyor_pushing_off_the_map_is_blocked(make_engine):
+    engine = make_engine('S >')
+    engine.step('d')
+    assert engine.step('d') == (GameState(0, 1), BLOCKED)
+
+
+@pytest.mark.parametrize('action, event', [('r', RELOAD), ('esc', BACK), ('q', IGNORED)])
+def test_non_move_actions(make_engine, action, event):
+    engine = make_engine('S ')
+    assert engine.step(action) == (GameState(0, 0), event)
+
+
+def test_reset_returns_to_the_start(make_engine):
+    engine = make_engine('S  ')
+    engine.step('d')
+    assert engine.reset() == GameState(0, 0)
+    assert engine.state == GameState(0, 0)
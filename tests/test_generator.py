@@ -0,0 +1,43 @@
+import pytest
+
+from engine import solve
+from engine.generator import ALGORITHMS, generate, main
+from gui.grid import Grid, build_tile_index
+
+
+def codes(grid: Grid) -> bytes:
+    return b''.join(grid.row_codes(y) for y in range(grid.height))
+
+
+@pytest.mark.parametrize('algorithm', list(ALGORITHMS))
+def test_same_seed_same_level(algorithm):
+    assert codes(generate(31, 41, algorithm, seed=7)) == codes(generate(31, 41, algorithm, seed=7))
+    assert codes(generate(31, 41, algorithm, seed=7)) != codes(generate(31, 41, algorithm, seed=8))
+
+
+@pytest.mark.parametrize('algorithm', list(ALGORITHMS))
+@pytest.mark.parametrize('size', [(21, 21), (30, 44)])
+def test_generated_level_is_solvable(algorithm, size):
+    grid = generate(*size, algorithm, seed=3)
+    (player_y, player_x), = build_tile_index(grid)['S']
+    assert solve({'map': grid, 'player_y': player_y, 'player_x': player_x}) is not None
+
+
+def test_large_maps_fall_back_to_binary_tree(monkeypatch):
+    monkeypatch.setattr('engine.generator.SLOW_ALGORITHM_MAX_ROOMS', 100)
+    assert codes(generate(41, 41, 'backtracker')) == codes(generate(41, 41, 'binary_tree'))
+    assert codes(generate(21, 21, 'backtracker')) != codes(generate(21, 21, 'binary_tree'))
+
+
+@pytest.mark.parametrize('argv', [
+    ['out.json', '--size', 'abc'],
+    ['out.json', '--size', '9xq'],
+    ['out.json', '--size', '3x3'],
+    ['out.json', '--seed', 'x'],
+    ['out.json', '--seed'],
+])
+def test_main_rejects_bad_options(tmp_path, monkeypatch, capsys, argv):
+    monkeypatch.chdir(tmp_path)
+    assert main(argv) == 2
+    assert capsys.readouterr().out.startswith('用法')
+    assert not (tmp_path / 'out.json').exists()
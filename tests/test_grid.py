@@ -0,0 +1,95 @@
+import pytest
+
+from gui.grid import CONTROL_CODES, Grid, build_tile_index
+
+
+def rows(*lines: str) -> list:
+    return [list(line) for line in lines]
+
+
+def test_latin1_cells_are_stored_as_their_code_points():
+    grid = Grid.from_rows(rows('S #', 'é E'))
+    assert (grid.height, grid.width) == (2, 3)
+    assert bytes(grid.data) == 'S #é E'.encode('latin-1')
+    assert grid.codes == {}
+    assert grid.to_rows() == rows('S #', 'é E')
+
+
+def test_wide_cells_borrow_unused_control_codes():
+    grid = Grid.from_rows(rows('S墙', '墙E'))
+    code = grid.codes['墙']
+    assert code in CONTROL_CODES
+    assert grid.tiles[code] == '墙'
+    assert grid.get(0, 1) == grid[1][0] == '墙'
+    assert grid.encode('墙') == code
+    assert grid.data.count(code) == 2
+
+
+def test_unknown_wide_cell_cannot_be_encoded():
+    grid = Grid.from_rows(rows('SE'))
+    with pytest.raises(ValueError):
+        grid.encode('墙')
+
+
+def test_string_rows_are_accepted():
+    grid = Grid.from_rows(['S E', '#E#'])
+    assert (grid.height, grid.width) == (2, 3)
+    assert grid.to_rows() == rows('S E', '#E#')
+
+
+def test_short_rows_are_padded_with_spaces():
+    grid = Grid.from_rows([['S', 'E', '#'], ['#']])
+    assert grid.width == 3
+    assert ''.join(grid[1]) == '#  '
+
+
+@pytest.mark.parametrize('bad', [
+    [['S', 'ab']],
+    [['', 'ab']],
+    [['S', '', 'E', 'xy']],
+    [['S', '']]
+])
+def test_cells_must_be_single_characters(bad):
+    with pytest.raises(ValueError):
+        Grid.from_rows(bad)
+
+
+def test_empty_map_is_rejected():
+    with pytest.raises(ValueError):
+        Grid.from_rows([])
+
+
+def test_row_views_support_negative_indexes_and_bounds():
+    grid = Grid.from_rows(rows('S #', '  E'))
+    assert grid[-1][-1] == 'E'
+    with pytest.raises(IndexError):
+        grid[0][3]
+    with pytest.raises(IndexError):
+        grid[2]
+
+
+def test_copy_does_not_share_cells():
+    grid = Grid.from_rows(rows('S E'))
+    copied = grid.copy()
+    copied[0][1] = '#'
+    assert grid.get(0, 1) == ' '
+    assert copied.get(0, 1) == '#'
+    assert copied.tiles is grid.tiles
+
+
+def test_tile_index_lists_positions_in_row_major_order():
+    grid = Grid.from_rows(rows('S>@', 'E#E', 'vX<', '^  '))
+    index = build_tile_index(grid)
+    assert index['S'] == [(0, 0)]
+    assert index['E'] == [(1, 0), (1, 2)]
+    assert index['@'] == [(0, 2)]
+    assert index['X'] == [(2, 1)]
+    assert index['>'] == [(0, 1)]
+    assert index['<'] == [(2, 2)]
+    assert index['v'] == [(2, 0)]
+    assert index['^'] == [(3, 0)]
+
+
+def test_tile_index_has_empty_lists_for_missing_tiles():
+    index = build_tile_index(Grid.from_rows(rows('S E')))
+    assert index['@'] == [] and index['>'] == []
@@ -0,0 +1,111 @@
+import os
+from typing import *
+
+import pytest
+
+from gui.key_input import KeyInput, decode_keys
+
+
+@pytest.mark.parametrize('text, keys', [
+    ('wasd', ['w', 'a', 's', 'd']),
+    ('\r\n \t\x7f\x08', ['enter', 'enter', 'space', 'tab', 'backspace', 'backspace']),
+    ('\x1b[A\x1b[B\x1b[C\x1b[D', ['up', 'down', 'right', 'left']),
+    ('\x1bOA\x1bOH\x1bOF', ['up', 'home', 'end']),
+    ('\x1b[5~\x1b[6~\x1b[3~', ['page up', 'page down', 'delete']),
+    # 带修饰键参数的序列按终止符解码
+    ('\x1b[1;5C\x1b[3;2~', ['right', 'delete']),
+    ('\x1bx', ['esc', 'x']),
+    ('中', ['中'])
+])
+def test_decode_complete_input(text, keys):
+    assert decode_keys(text) == (keys, '')
+
+
+@pytest.mark.parametrize('text, keys, rest', [
+    ('w\x1b', ['w'], '\x1b'),
+    ('\x1b[', [], '\x1b['),
+    ('a\x1b[1;5', ['a'], '\x1b[1;5'),
+    ('\x1bO', [], '\x1bO')
+])
+def test_incomplete_sequences_are_kept_for_later(text, keys, rest):
+    assert decode_keys(text) == (keys, rest)
+
+
+def test_unknown_sequences_are_dropped():
+    assert decode_keys('\x1b[Zw\x1b[9~') == (['w'], '')
+
+
+class FakeInput(KeyInput):
+    """
+    每次 poll 交出预先排好的下一组按键。
+    """
+
+    def __init__(self, batches: List[List[str]]):
+        super().__init__(queue_size=4)
+        self.batches: List[List[str]] = batches
+        self.polls: List[Optional[float]] = []
+
+    def poll(self, timeout: Optional[float]) -> None:
+        self.polls.append(timeout)
+        if self.batches:
+            self.queue.extend(self.batches.pop(0))
+
+
+def test_poll_must_be_implemented():
+    with pytest.raises(TypeError):
+        KeyInput()
+
+
+def test_read_key_times_out():
+    keys = FakeInput([])
+    assert keys.read_key(0) is None
+
+
+def test_read_keys_does_not_wait():
+    keys = FakeInput([['w', 'a']])
+    assert keys.read_keys() == ['w', 'a']
+    assert keys.polls == [0]
+
+
+def test_queue_drops_the_oldest_keys():
+    keys = FakeInput([['1', '2', '3', '4', '5', '6']])
+    assert keys.read_keys() == ['3', '4', '5', '6']
+
+
+def test_read_batch_collects_keys_that_already_arrived():
+    keys = FakeInput([['w'], ['a', 's']])
+    assert keys.read_batch() == ['w', 'a', 's']
+    assert keys.batch_started is not None
+
+
+def test_flush_discards_pending_keys():
+    keys = FakeInput([['w']])
+    keys.poll(0)
+    keys.flush()
+    assert keys.read_key(0) is None
+
+
+def test_terminal_input_scopes_cbreak_to_capture():
+    termios = pytest.importorskip('termios')
+    pty = pytest.importorskip('pty')
+    from gui.key_input import TerminalInput
+
+    master, slave = pty.openpty()
+    try:
+        keys = TerminalInput(fd=slave)
+        original = termios.tcgetattr(slave)
+        with keys.capture():
+            assert not termios.tcgetattr(slave)[3] & termios.ECHO
+            with keys.capture():
+                pass
+            # 嵌套的 capture 结束时不恢复
+            assert not termios.tcgetattr(slave)[3] & termios.ECHO
+            os.write(master, b'w\x1b[A\x1b')
+            assert keys.read_key(1) == 'w'
+            assert keys.read_key(1) == 'up'
+            # 等不到后续字节的 Esc 按单独的按键处理
+            assert keys.read_key(1) == 'esc'
+        assert termios.tcgetattr(slave) == original
+    finally:
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from gui.grid import Grid
+from gui.map import parse_map
+from gui.map_binary import write_binary_map
+from load_mod.labpack import (HEADER, MAGIC, VERSION, LabPack, extract_pack, open_pack, pack_folder, read_json,
+                              split_archive_path, write_pack)
+
+PACK: dict = {'title': {'text': '测试', 'color': 'red'}, 'describe': '描述', 'file': 'example'}
+LEVEL: list = [['S', ' ', 'E']]
+
+
+@pytest.fixture
+def mod_dir(tmp_path) -> str:
+    """
+    返回：
+        str: 一个含有 pack.json、level.json、JSON 地图与二进制地图的模组目录。
+    """
+    root = tmp_path / 'example'
+    (root / 'map').mkdir(parents=True)
+    (root / 'pack.json').write_text(json.dumps(PACK, ensure_ascii=False), encoding='utf-8')
+    (root / 'level.json').write_text(json.dumps(['a.json', 'b.lmap']), encoding='utf-8')
+    (root / 'map' / 'a.json').write_text(json.dumps(LEVEL), encoding='utf-8')
+    write_binary_map(Grid.from_rows(LEVEL), str(root / 'map' / 'b.lmap'))
+    return str(root)
+
+
+def test_round_trip(mod_dir, tmp_path):
+    archive = str(tmp_path / 'example.labpack')
+    assert write_pack(mod_dir, archive) == 4
+
+    pack = LabPack(archive)
+    assert sorted(pack.files) == ['level.json', 'map/a.json', 'map/b.lmap', 'pack.json']
+    assert pack.pack == PACK
+    for name in pack.files:
+        with open(os.path.join(mod_dir, name), 'rb') as f:
+            assert bytes(pack.read(name)) == f.read()
+
+    target = str(tmp_path / 'extracted')
+    assert extract_pack(archive, target) == 4
+    for name in pack.files:
+        with open(os.path.join(mod_dir, name), 'rb') as a, open(os.path.join(target, name), 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_virtual_paths(mod_dir, tmp_path):
+    archive = str(tmp_path / 'example.labpack')
+    write_pack(mod_dir, archive)
+    assert split_archive_path(f'{archive}/map/a.json') == (archive.replace('\\', '/'), 'map/a.json')
+    assert split_archive_path(f'{mod_dir}/map/a.json') is None
+    assert read_json(f'{archive}/level.json') == ['a.json', 'b.lmap']
+    assert read_json(f'{archive}/pack.json') == PACK
+
+
+@pytest.mark.parametrize('name', ['a.json', 'b.lmap'])
+def test_maps_load_from_the_archive(mod_dir, tmp_path, name):
+    archive = str(tmp_path / 'example.labpack')
+    write_pack(mod_dir, archive)
+    map_data = parse_map(f'{archive}/map/{name}')
+    assert [''.join(row) for row in map_data['map']] == ['S E']
+    assert (map_data['player_y'], map_data['player_x']) == (0, 0)
+
+
+def test_missing_member(mod_dir, tmp_path):
+    archive = str(tmp_path / 'example.labpack')
+    write_pack(mod_dir, archive)
+    with pytest.raises(FileNotFoundError):
+        LabPack(archive).read('map/missing.json')
+
+
+def test_open_pack_reopens_replaced_archives(mod_dir, tmp_path):
+    archive = str(tmp_path / 'example.labpack')
+    write_pack(mod_dir, archive)
+    first = open_pack(archive)
+    assert open_pack(archive) is first
+
+    with open(os.path.join(mod_dir, 'extra.txt'), 'w', encoding='utf-8') as f:
+        f.write('x')
+    write_pack(mod_dir, archive)
+    assert 'extra.txt' in open_pack(archive).files
+
+
+def test_archives_are_named_relative_to_the_mod_root(tmp_path):
+    mod_path = f'{tmp_path}/mod/'
+    assert pack_folder(f'{mod_path}sub/x.labpack/pack.json', PACK, mod_path) == 'sub/x.labpack'
+    assert pack_folder(f'{mod_path}x.labpack/pack.json', PACK, mod_path) == 'x.labpack'
+    assert pack_folder(f'{mod_path}sub/x.labpack/pack.json', PACK) == 'x.labpack'
+    assert pack_folder(f'{mod_path}example/pack.json', PACK, mod_path) == 'example'
+
+
+def write_raw(path: str, files: dict, data: bytes = b'') -> None:
+    index: bytes = json.dumps({'pack': PACK, 'files': files}).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, HEADER.size + len(data), len(index)))
+        f.write(data)
+        f.write(index)
+
+
+def test_rejects_corrupt_archives(tmp_path):
+    path = str(tmp_path / 'bad.labpack')
+    with open(path, 'wb') as f:
+        f.write(b'NOPE' + bytes(HEADER.size))
+    with pytest.raises(ValueError):
+        LabPack(path)
+
+    write_raw(path, {'pack.json': [HEADER.size, 100]}, b'{}')
+    with pytest.raises(ValueError):
+        LabPack(path)
+
+
+def test_extract_rejects_paths_outside_the_target(tmp_path):
+    path = str(tmp_path / 'evil.labpack')
+    write_raw(path, {'../evil.txt': [HEADER.size, 1]}, b'x')
+    with pytest.raises(ValueError):
+        extract_pack(path, str(tmp_path / 'out'))
+    assert not (tmp_path / 'evil.txt').exists()
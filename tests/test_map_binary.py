@@ -0,0 +1,120 @@
+import random
+import struct
+
+import pytest
+
+from gui.grid import Grid, build_tile_index
+from gui.map_binary import (HEADER, INDEX_ENTRY, BinaryTileIndex, load_binary_map, main, parse_binary_map,
+                            write_binary_map)
+
+
+def random_grid(seed: int, height: int, width: int, tiles: str = '   #@X><^vE') -> Grid:
+    rng = random.Random(seed)
+    cells = [[rng.choice(tiles) for _ in range(width)] for _ in range(height)]
+    cells[height // 2][width // 2] = 'S'
+    return Grid.from_rows(cells)
+
+
+@pytest.mark.parametrize('height, width, chunk_size', [(1, 1, 4), (7, 5, 4), (16, 16, 8), (10, 33, 16)])
+def test_round_trip(tmp_path, height, width, chunk_size):
+    grid = random_grid(height * width, height, width)
+    path = str(tmp_path / 'map.lmap')
+    write_binary_map(grid, path, chunk_size)
+    loaded, index = load_binary_map(path)
+    assert (loaded.height, loaded.width) == (grid.height, grid.width)
+    assert [''.join(row) for row in loaded] == [''.join(row) for row in grid]
+    assert [loaded.row_codes(y) for y in range(height)] == [grid.row_codes(y) for y in range(height)]
+    assert dict(index) == build_tile_index(grid)
+
+
+def test_wide_tiles_round_trip(tmp_path):
+    grid = Grid.from_rows([list('S墙E'), list('门 墙')])
+    path = str(tmp_path / 'map.lmap')
+    write_binary_map(grid, path, 2)
+    loaded, _ = load_binary_map(path)
+    assert [''.join(row) for row in loaded] == ['S墙E', '门 墙']
+    assert loaded.codes == grid.codes
+
+
+def test_identical_chunks_are_stored_once(tmp_path):
+    cells = [list('#' * 32) for _ in range(32)]
+    cells[0][0] = 'S'
+    path = tmp_path / 'map.lmap'
+    write_binary_map(Grid.from_rows(cells), str(path), 8)
+    loaded, _ = load_binary_map(str(path))
+    assert len(set(loaded.directory)) == 2
+    assert path.stat().st_size < 3 * 8 * 8 + 1024
+
+
+def test_writes_go_to_a_private_overlay(tmp_path):
+    grid = random_grid(1, 12, 12)
+    path = str(tmp_path / 'map.lmap')
+    write_binary_map(grid, path, 4)
+    loaded, _ = load_binary_map(path)
+    copied = loaded.copy()
+    copied[5][7] = '#'
+    copied.set(0, 0, 'E')
+    assert copied.get(0, 0) == 'E' and copied[5][7] == '#'
+    assert [''.join(row) for row in loaded] == [''.join(row) for row in grid]
+    assert copied.nbytes == loaded.nbytes + 2 * 4 * 4
+
+
+def test_index_is_decoded_per_tile(tmp_path):
+    grid = random_grid(2, 50, 50)
+    path = str(tmp_path / 'map.lmap')
+    write_binary_map(grid, path)
+    _, index = load_binary_map(path)
+    assert isinstance(index, BinaryTileIndex)
+    assert index.nbytes < 2048
+    assert index['E'] == build_tile_index(grid)['E']
+    assert index['E'] is not index['E']
+
+
+def test_parses_a_memoryview(tmp_path):
+    grid = random_grid(3, 9, 9)
+    path = tmp_path / 'map.lmap'
+    write_binary_map(grid, str(path), 4)
+    loaded, index = parse_binary_map(memoryview(path.read_bytes()))
+    assert [''.join(row) for row in loaded] == [''.join(row) for row in grid]
+    assert index['S'] == [(4, 4)]
+
+
+def test_rejects_files_that_are_not_maps():
+    with pytest.raises(ValueError):
+        parse_binary_map(memoryview(b'LMAP'))
+    with pytest.raises(ValueError):
+        parse_binary_map(memoryview(b'NOPE' + bytes(HEADER.size)))
+
+
+def test_rejects_an_index_that_is_not_grouped_by_tile(tmp_path):
+    grid = Grid.from_rows([list('SE@E')])
+    path = tmp_path / 'map.lmap'
+    write_binary_map(grid, str(path))
+    data = bytearray(path.read_bytes())
+    index_offset = HEADER.unpack_from(data, 0)[-1]
+    # 对调第二个索引项（'E'）与第四个索引项（'@'），索引项不再按 INDEXED_TILES 的顺序排列
+    second = index_offset + INDEX_ENTRY.size
+    fourth = index_offset + 3 * INDEX_ENTRY.size
+    data[second:second + INDEX_ENTRY.size], data[fourth:fourth + INDEX_ENTRY.size] = \
+        data[fourth:fourth + INDEX_ENTRY.size], data[second:second + INDEX_ENTRY.size]
+    with pytest.raises(ValueError):
+        parse_binary_map(memoryview(bytes(data)))
+
+
+def test_rejects_a_truncated_index(tmp_path):
+    grid = Grid.from_rows([list('S E')])
+    path = tmp_path / 'map.lmap'
+    write_binary_map(grid, str(path))
+    data = bytearray(path.read_bytes())
+    fields = list(HEADER.unpack_from(data, 0))
+    # index_count 指向文件之外
+    fields[7] = 1 << 30
+    struct.pack_into(HEADER.format, data, 0, *fields)
+    with pytest.raises(ValueError):
+        parse_binary_map(memoryview(bytes(data)))
+
+
+@pytest.mark.parametrize('argv', [['map.json', '--chunk'], ['map.json', '--chunk', 'abc'], ['map.json', '--chunk', '0']])
+def test_main_rejects_a_bad_chunk_size(capsys, argv):
+    assert main(argv) == 2
+    assert capsys.readouterr().out.startswith('用法')
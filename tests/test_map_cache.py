@@ -0,0 +1,119 @@
+import os
+import sys
+from typing import *
+
+from gui.map_cache import INDEX_ENTRY_BYTES, MapCache
+
+
+class FakeMap:
+    """
+    只有 nbytes 与 copy 的地图网格。
+    """
+
+    def __init__(self, nbytes: int):
+        self.nbytes: int = nbytes
+
+    def copy(self) -> 'FakeMap':
+        return FakeMap(self.nbytes)
+
+
+class LazyIndex(dict):
+    nbytes: int = 10
+
+
+class Files:
+    """
+    代替磁盘：记录每个路径的大小与修改次数，以及 loader 被调用的次数。
+    """
+
+    def __init__(self, sizes: Dict[str, int]):
+        self.sizes: Dict[str, int] = sizes
+        self.versions: Dict[str, int] = {path: 1 for path in sizes}
+        self.loads: List[str] = []
+
+    def stat(self, path: str) -> 'StatResult':
+        # 修改次数充当 mtime
+        return StatResult(self.versions[path], self.sizes[path])
+
+    def load(self, path: str) -> dict:
+        self.loads.append(path)
+        return {'map': FakeMap(self.sizes[path]), 'player_y': 0, 'player_x': 0, 'index': LazyIndex()}
+
+
+class StatResult(NamedTuple):
+    st_mtime_ns: int
+    st_size: int
+
+
+def make_cache(budget: int, **sizes: int) -> Tuple[MapCache, Files]:
+    files = Files(sizes)
+    return MapCache(files.load, budget, files.stat), files
+
+
+def test_hits_return_fresh_copies():
+    cache, files = make_cache(1000, a=100)
+    first = cache.get('a')
+    second = cache.get('a')
+    assert files.loads == ['a']
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first['map'] is not second['map']
+    assert first['index'] is second['index']
+
+
+def test_changed_files_are_reloaded():
+    cache, files = make_cache(1000, a=100)
+    cache.get('a')
+    files.versions['a'] += 1
+    cache.get('a')
+    assert files.loads == ['a', 'a']
+    assert cache.size == 110
+
+
+def test_least_recently_used_maps_are_evicted():
+    cache, files = make_cache(350, a=100, b=100, c=100)
+    cache.get('a')
+    cache.get('b')
+    cache.get('a')
+    cache.get('c')
+    # a、b、c 的占用为 330，未超出预算
+    assert len(cache.entries) == 3
+    files.sizes['d'] = 100
+    files.versions['d'] = 1
+    cache.get('d')
+    # b 最久未使用，被淘汰
+    assert [os.path.basename(key) for key in cache.entries] == ['a', 'c', 'd']
+    assert cache.size == 330
+    cache.get('b')
+    assert files.loads == ['a', 'b', 'c', 'd', 'b']
+
+
+def test_maps_larger_than_the_budget_are_not_cached():
+    cache, files = make_cache(50, a=100)
+    cache.get('a')
+    cache.get('a')
+    assert files.loads == ['a', 'a']
+    assert cache.size == 0 and not cache.entries
+
+
+def test_footprint_counts_the_index():
+    index = {'S': [(0, 0)], 'E': [(1, 1), (2, 2)]}
+    expected = 100 + sys.getsizeof(index['S']) + sys.getsizeof(index['E']) + 3 * INDEX_ENTRY_BYTES
+    assert MapCache.footprint({'map': FakeMap(100), 'index': index}) == expected
+
+
+def test_footprint_uses_the_index_nbytes_when_present():
+    assert MapCache.footprint({'map': FakeMap(100), 'index': LazyIndex()}) == 110
+
+
+def test_footprint_counts_the_transition_table():
+    map_data = {'map': FakeMap(100), 'index': LazyIndex(), 'transitions': FakeMap(40)}
+    assert MapCache.footprint(map_data) == 150
+
+
+def test_clear_keeps_the_counters():
+    cache, files = make_cache(1000, a=100)
+    cache.get('a')
+    cache.get('a')
+    cache.clear()
+    assert cache.size == 0 and not cache.entries
+    assert (cache.hits, cache.misses) == (1, 1)
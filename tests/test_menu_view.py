@@ -0,0 +1,52 @@
+import io
+import time
+
+from gui.menu_source import LazyMenu
+from gui.menu_view import MenuView, SearchIndex
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_search_covers_the_indexed_prefix():
+    items = [f'\x1b[31mPack {i}\x1b[0m' for i in range(20)]
+    index = SearchIndex(items, build=False)
+    index.extend(5)
+    assert index.search('pack 1') == [1]
+    index.extend(15)
+    # 同一个查询在索引增长后补充新的结果
+    assert index.search('pack 1') == [1] + list(range(10, 20))
+    assert index.search('ack 1') == [1] + list(range(10, 20))
+    assert index.search('k 2') == [2]
+
+
+def test_lazy_menu_is_indexed_in_the_background():
+    loaded = []
+
+    def load(i):
+        loaded.append(i)
+        return f'Pack {i}'
+
+    menu = LazyMenu(1000, load, cache_size=8)
+    view = MenuView(menu, io.StringIO())
+    view.set_query('pack 99')
+    wait_for(lambda: view.index.complete)
+    view.refresh()
+    assert list(view.visible) == [99] + list(range(990, 1000))
+    assert not view.indexing()
+    # 建立索引不占用 LazyMenu 的缓存
+    assert len(menu.cache) <= 8
+    view.close()
+
+
+def test_list_menu_is_indexed_immediately():
+    view = MenuView(['alpha', 'beta', 'gamma'], io.StringIO())
+    view.set_query('a')
+    assert list(view.visible) == [0, 1, 2]
+    view.set_query('mm')
+    assert list(view.visible) == [2]
+    assert not view.indexing()
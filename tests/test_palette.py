@@ -0,0 +1,84 @@
+import pytest
+
+from gui.palette import (ALL_COLORS, COLORS_16, COLORS_256, TRUECOLOR, Palette, color_escape, compile_palette,
+                         detect_color_depth, index_to_rgb, rgb_to_index)
+from gui.grid import Grid
+
+
+@pytest.mark.parametrize('environ, depth', [
+    ({'COLORTERM': 'truecolor', 'TERM': 'xterm'}, TRUECOLOR),
+    ({'COLORTERM': '24bit'}, TRUECOLOR),
+    ({'WT_SESSION': '1'}, TRUECOLOR),
+    ({'TERM': 'xterm-256color'}, COLORS_256),
+    ({'TERM': 'xterm'}, COLORS_16),
+    ({}, COLORS_16)
+])
+def test_detect_color_depth(environ, depth):
+    assert detect_color_depth(environ) == depth
+
+
+@pytest.mark.parametrize('depth', [COLORS_16, COLORS_256, TRUECOLOR])
+def test_color_names_always_use_the_basic_table(depth):
+    assert color_escape('red', ALL_COLORS, depth) == ALL_COLORS['red']
+
+
+def test_truecolor_is_used_when_supported():
+    assert color_escape('#ff8000', ALL_COLORS, TRUECOLOR) == '\x1b[38;2;255;128;0m'
+
+
+def test_truecolor_falls_back_to_256_colors():
+    assert color_escape('#ff0000', ALL_COLORS, COLORS_256) == '\x1b[38;5;196m'
+    assert color_escape('#808080', ALL_COLORS, COLORS_256) == '\x1b[38;5;244m'
+
+
+def test_truecolor_falls_back_to_the_nearest_basic_color():
+    assert color_escape('#f00000', ALL_COLORS, COLORS_16) == ALL_COLORS['light_red']
+    assert color_escape('#000010', ALL_COLORS, COLORS_16) == ALL_COLORS['black']
+
+
+@pytest.mark.parametrize('spec', [21, '21'])
+def test_256_color_indexes(spec):
+    assert color_escape(spec, ALL_COLORS, TRUECOLOR) == '\x1b[38;5;21m'
+    assert color_escape(spec, ALL_COLORS, COLORS_256) == '\x1b[38;5;21m'
+    assert color_escape(spec, ALL_COLORS, COLORS_16) == ALL_COLORS['blue']
+
+
+@pytest.mark.parametrize('spec', ['no_such_color', 256, '#12345', True, None, -1])
+def test_unknown_colors_use_reset(spec):
+    assert color_escape(spec, ALL_COLORS, TRUECOLOR) == ALL_COLORS['reset']
+
+
+def test_cube_indexes_round_trip():
+    for index in range(16, 256):
+        assert rgb_to_index(index_to_rgb(index)) == index
+
+
+def test_paint_row_merges_runs_of_the_same_color():
+    palette = Palette({'#': 'white', 'E': 'green'}, ALL_COLORS, COLORS_16)
+    white, green = ALL_COLORS['white'], ALL_COLORS['green']
+    # 空白单元格沿用当前颜色，不打断颜色段
+    assert palette.paint_row('##  E#') == f'{white}##  {green}E{white}#'
+    assert palette.paint_row('# # #') == f'{white}# # #'
+
+
+def test_paint_row_takes_colors_from_tiles():
+    palette = Palette({'#': 'white', 'I': 'red'}, ALL_COLORS, COLORS_16)
+    assert palette.paint_row('#I', '##') == f'{ALL_COLORS["white"]}#I'
+
+
+def test_paint_codes_matches_paint_row():
+    palette = Palette({'#': 'white', 'E': 'green', '中': 'red'}, ALL_COLORS, COLORS_16)
+    grid = Grid.from_rows(['##  E#', '#中 E #'])
+    for y in range(grid.height):
+        assert palette.paint_codes(grid[y].codes(), grid.tiles) == palette.paint_row(grid[y])
+    # 覆盖显示时颜色取自编码，空白由显示的字符决定
+    codes = grid[0].codes()
+    assert palette.paint_codes(codes, grid.tiles, '#~ ~E#') == palette.paint_row('#~ ~E#', '##  E#')
+
+
+def test_compile_palette_reuses_the_last_palette():
+    color_dict = {'#': 'white'}
+    palette = compile_palette(color_dict, ALL_COLORS, COLORS_16)
+    assert compile_palette(color_dict, ALL_COLORS, COLORS_16) is palette
+    assert compile_palette(color_dict, ALL_COLORS, COLORS_256) is not palette
+    assert compile_palette({'#': 'white'}, ALL_COLORS, COLORS_256) is not palette
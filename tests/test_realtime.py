@@ -0,0 +1,190 @@
+import asyncio
+import io
+import selectors
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import *
+
+import pytest
+
+import gui.key_input
+from engine import BACK, IGNORED, MOVE, RESET, WIN, GameState, RealtimeEngine, TICK_RATE
+from engine.realtime import HAZARD_IDLE, HAZARD_OFF, HAZARD_ON, WATER_FRAMES, WATER_PERIOD
+from gui.grid import Grid, build_tile_index
+from gui.key_input import KeyInput
+from gui.palette import ALL_COLORS
+from gui.realtime import RealtimeSession
+from gui.render import PLAYER
+
+
+def level(*lines: str) -> dict:
+    grid = Grid.from_rows([list(line) for line in lines])
+    (player_y, player_x), = build_tile_index(grid)['S']
+    return {'map': grid, 'player_y': player_y, 'player_x': player_x}
+
+
+def test_timed_hazard_toggles_on_schedule():
+    engine = RealtimeEngine(level('S!E'))
+    for _ in range(HAZARD_ON - 1):
+        assert engine.tick()[2] == []
+    assert engine.hazard_active(0, 1)
+    assert engine.step('d') == (GameState(0, 0), RESET)
+
+    assert engine.tick() == (GameState(0, 0), IGNORED, [(0, 1)])
+    assert not engine.hazard_active(0, 1)
+    assert engine.overlay == {(0, 1): HAZARD_IDLE}
+    assert engine.step('d') == (GameState(0, 1), MOVE)
+
+    # 重新开启时站在上面的玩家被送回起点
+    for _ in range(HAZARD_OFF - 1):
+        assert engine.tick()[1] != RESET
+    assert engine.tick() == (GameState(0, 0), RESET, [(0, 1)])
+    assert engine.hazard_active(0, 1)
+    assert engine.overlay == {}
+
+
+def test_water_animates_with_a_phase_per_cell():
+    engine = RealtimeEngine(level('S~~'))
+    changes: Dict[Tuple[int, int], List[Tuple[int, str]]] = {(0, 1): [], (0, 2): []}
+    for _ in range(2 * WATER_PERIOD + 5):
+        for position in engine.tick()[2]:
+            changes[position].append((engine.tick_count, engine.overlay[position]))
+    frames = [WATER_FRAMES[1], WATER_FRAMES[0], WATER_FRAMES[1]]
+    assert changes[(0, 1)] == list(zip((2, 12, 22), frames))
+    assert changes[(0, 2)] == list(zip((3, 13, 23), frames))
+    # 水面只是显示效果
+    assert engine.step('d') == (GameState(0, 1), MOVE)
+
+
+class Clock:
+    """
+    虚拟时钟，只在事件循环或按键输入等待时前进。
+    """
+
+    def __init__(self):
+        self.now: float = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    perf_counter = monotonic
+
+
+class VirtualSelector(selectors.BaseSelector):
+    """
+    事件循环等待超时时直接拨快虚拟时钟，不真正睡眠。
+    """
+
+    def __init__(self, clock: Clock):
+        self.clock = clock
+        self.real = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self.real.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self.real.unregister(fileobj)
+
+    def get_map(self):
+        return self.real.get_map()
+
+    def close(self):
+        self.real.close()
+
+    def select(self, timeout=None):
+        ready = self.real.select(0)
+        if ready or timeout == 0:
+            return ready
+        assert timeout is not None, 'event loop would wait forever'
+        self.clock.now += timeout
+        return []
+
+
+class VirtualLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: Clock):
+        super().__init__(VirtualSelector(clock))
+        self.clock = clock
+
+    def time(self) -> float:
+        return self.clock.now
+
+
+class InlineExecutor(ThreadPoolExecutor):
+    """
+    在调用线程中立即执行任务，输入任务的 to_thread 因此不依赖真实的线程调度。
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class TimedInput(KeyInput):
+    """
+    在虚拟时刻产生按键；等待按键时拨快虚拟时钟。
+    """
+
+    def __init__(self, clock: Clock, script: List[Tuple[float, str]]):
+        super().__init__()
+        self.clock = clock
+        self.script = list(script)
+
+    def poll(self, timeout: Optional[float]) -> None:
+        assert self.script or timeout is not None, 'key script exhausted'
+        if self.script and self.script[0][0] > self.clock.now:
+            wait = self.script[0][0] - self.clock.now
+            self.clock.now += wait if timeout is None else min(wait, timeout)
+        elif not self.script:
+            self.clock.now += timeout
+        while self.script and self.script[0][0] <= self.clock.now:
+            self.queue.append(self.script.pop(0)[1])
+
+
+@pytest.fixture
+def play(monkeypatch):
+    """
+    在虚拟时钟上运行一局实时模式，返回 (结果, 会话, 输出)。
+    """
+    def run(map_data: dict, script: List[Tuple[float, str]]):
+        clock = Clock()
+        monkeypatch.setattr(gui.key_input, 'time', clock)
+        monkeypatch.setattr(gui.key_input, 'KEY_INPUT', TimedInput(clock, script))
+        loop = VirtualLoop(clock)
+        loop.set_default_executor(InlineExecutor())
+        stream = io.StringIO()
+
+        async def main():
+            session = RealtimeSession(map_data, {'~': 'aqua', '!': 'red'}, ALL_COLORS, {'fps': 20})
+            session.renderer.stream = stream
+            return await session.run(), session
+
+        try:
+            result, session = loop.run_until_complete(main())
+        finally:
+            loop.close()
+        return result, session, stream.getvalue(), clock.now
+    return run
+
+
+def test_session_reaches_the_exit(play):
+    result, session, output, now = play(level('S  E'), [(0.1, 'd'), (0.2, 'd'), (0.3, 'd')])
+    assert result == WIN
+    assert session.state == GameState(0, 3)
+    assert now == pytest.approx(0.3)
+    assert PLAYER in output
+
+
+def test_session_ticks_hazards_while_the_player_waits(play):
+    # 陷阱在第 HAZARD_ON 刻关闭时踏上去，之后等它重新开启把玩家送回起点
+    off = HAZARD_ON / TICK_RATE
+    on = (HAZARD_ON + HAZARD_OFF) / TICK_RATE
+    result, session, output, now = play(level('S!~E'), [(off + 0.1, 'd'), (on + 0.5, 'esc')])
+    assert result == BACK
+    assert session.state == GameState(0, 0)
+    assert session.engine.hazard_active(0, 1)
+    assert session.engine.tick_count == pytest.approx((on + 0.5) * TICK_RATE, abs=1)
+    # 水面动画与关闭的陷阱都被绘制出来
+    assert WATER_FRAMES[1] in output and HAZARD_IDLE in output
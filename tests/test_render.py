@@ -0,0 +1,115 @@
+import io
+import re
+from typing import *
+
+import pytest
+
+from engine.generator import generate
+from gui.palette import ALL_COLORS
+from gui.render import FrameRenderer
+
+COLORS: Final[dict] = {'.': 'yellow', '~': 'aqua', 'I': 'yellow', 'E': 'yellow'}
+
+
+class Screen:
+    """
+    最小的终端模拟，只支持渲染器输出的控制序列，记录每个单元格的字符与前景色。
+    """
+
+    def __init__(self, lines: int, columns: int):
+        self.lines, self.columns = lines, columns
+        self.cells = [[(' ', None)] * columns for _ in range(lines)]
+        self.y = self.x = 0
+        self.fg = None
+        self.margins = (0, lines - 1)
+
+    def blank(self, count: int) -> list:
+        return [(' ', None)] * count
+
+    def feed(self, text: str) -> None:
+        for match in re.finditer(r'\x1b\[([0-9;?]*)([A-Za-z@])|(.)', text, re.S):
+            params, final, char = match.groups()
+            if char is not None:
+                if self.x < self.columns:
+                    self.cells[self.y][self.x] = (char, self.fg)
+                self.x += 1
+            elif params.startswith('?'):
+                continue
+            else:
+                args = [int(arg) for arg in params.split(';') if arg]
+                if final == 'H':
+                    self.y, self.x = (args[0] - 1, args[1] - 1) if args else (0, 0)
+                elif final == 'm':
+                    self.fg = None if params in ('', '0', '39') else params
+                elif final == 'J':
+                    self.cells = [self.blank(self.columns) for _ in range(self.lines)]
+                elif final == 'r':
+                    self.margins = (args[0] - 1, args[1] - 1) if args else (0, self.lines - 1)
+                    self.y = self.x = 0
+                elif final in 'ST':
+                    top, bottom = self.margins
+                    region = self.cells[top:bottom + 1]
+                    new = [self.blank(self.columns) for _ in range(args[0])]
+                    self.cells[top:bottom + 1] = region[args[0]:] + new if final == 'S' else new + region[:-args[0]]
+                elif final == 'P':
+                    row = self.cells[self.y]
+                    self.cells[self.y] = row[:self.x] + row[self.x + args[0]:] + self.blank(args[0])
+                elif final == '@':
+                    row = self.cells[self.y]
+                    self.cells[self.y] = (row[:self.x] + self.blank(args[0]) + row[self.x:])[:self.columns]
+                else:
+                    raise ValueError(f'Unexpected sequence: {final}')
+
+    def visible(self) -> list:
+        # 空白单元格的前景色看不出来
+        return [[(char, None if char == ' ' else fg) for char, fg in row] for row in self.cells]
+
+
+@pytest.fixture
+def terminal(monkeypatch):
+    monkeypatch.setenv('COLUMNS', '40')
+    monkeypatch.setenv('LINES', '16')
+    return Screen(16, 40)
+
+
+def reference(renderer: FrameRenderer, map_, player_y: int, player_x: int) -> Screen:
+    """
+    返回：
+        Screen: 在同一视口上整屏重绘得到的画面。
+    """
+    full = FrameRenderer(COLORS, ALL_COLORS, stream=io.StringIO())
+    full.top, full.left, full.height, full.width = renderer.top, renderer.left, renderer.height, renderer.width
+    full.overlay = renderer.overlay
+    full.full_redraw(map_, player_y, player_x)
+    screen = Screen(16, 40)
+    screen.feed(full.stream.getvalue())
+    return screen
+
+
+@pytest.mark.parametrize('direction', [(0, 1), (1, 0), (1, 1), (0, -1), (-1, -1)])
+def test_camera_pans_match_a_full_redraw(terminal, direction):
+    grid = generate(101, 101, 'backtracker', seed=5)
+    stream = io.StringIO()
+    renderer = FrameRenderer(COLORS, ALL_COLORS, stream=stream)
+    renderer.overlay = {(50, 50 + i): '≈' for i in range(-3, 4)}
+    player_y = player_x = 50
+    renderer.render(grid, player_y, player_x)
+    terminal.feed(stream.getvalue())
+    full_size = len(stream.getvalue())
+
+    pan_sizes = []
+    for _ in range(30):
+        player_y += direction[0]
+        player_x += direction[1]
+        top, left = renderer.top, renderer.left
+        stream.seek(0)
+        stream.truncate()
+        renderer.render(grid, player_y, player_x)
+        terminal.feed(stream.getvalue())
+        assert terminal.visible() == reference(renderer, grid, player_y, player_x).visible()
+        if (top, left) != (renderer.top, renderer.left):
+            pan_sizes.append(len(stream.getvalue()))
+
+    # 镜头平移只绘制移入视口的行列
+    assert pan_sizes
+    assert max(pan_sizes) * 3 < full_size
@@ -0,0 +1,107 @@
+import random
+from typing import *
+
+import pytest
+
+from engine import WIN, Engine, solve
+from gui.grid import Grid, build_tile_index
+
+
+def level(*lines: str) -> dict:
+    grid = Grid.from_rows([list(line) for line in lines])
+    (player_y, player_x), = build_tile_index(grid)['S']
+    return {'map': grid, 'player_y': player_y, 'player_x': player_x}
+
+
+def replay(map_data: dict, keys: str) -> Optional[str]:
+    """
+    返回：
+        Optional[str]: 按键序列执行到最后一步时的事件。
+    """
+    engine = Engine(map_data)
+    event = None
+    for key in keys:
+        event = engine.step(key)[1]
+    return event
+
+
+@pytest.mark.parametrize('method', ['bfs', 'astar', 'auto'])
+def test_straight_corridor(method):
+    assert solve(level('S   E'), method) == 'dddd'
+
+
+@pytest.mark.parametrize('method', ['bfs', 'astar'])
+def test_walls_force_a_detour(method):
+    map_data = level('S#E',
+                     ' # ',
+                     '   ')
+    assert solve(map_data, method) == 'ssddww'
+
+
+@pytest.mark.parametrize('method', ['bfs', 'astar'])
+def test_hazards_are_avoided(method):
+    map_data = level('S@E',
+                     '   ')
+    keys = solve(map_data, method)
+    assert len(keys) == 4
+    assert replay(map_data, keys) == WIN
+
+
+def test_conveyor_shortcut_is_used():
+    map_data = level('S>    E')
+    # 踩上传送带后被推到第 3 列，再走三步
+    assert solve(map_data, 'bfs') == 'dddd'
+
+
+def test_conveyor_into_a_dead_end_is_avoided():
+    map_data = level('S v ',
+                     '  # ',
+                     '  #E',
+                     '  # ')
+    keys = solve(map_data, 'bfs')
+    assert replay(map_data, keys) == WIN
+
+
+@pytest.mark.parametrize('method', ['bfs', 'astar'])
+def test_unreachable_exit(method):
+    assert solve(level('S#E'), method) is None
+
+
+def test_no_exit():
+    assert solve(level('S  '), 'bfs') is None
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        solve(level('SE'), 'dfs')
+
+
+def test_astar_matches_bfs_on_random_maps():
+    rng = random.Random(8)
+    for _ in range(200):
+        height, width = rng.randint(2, 9), rng.randint(2, 9)
+        cells = [[rng.choice('    #@') for _ in range(width)] for _ in range(height)]
+        cells[0][0] = 'S'
+        cells[-1][-1] = 'E'
+        map_data = {'map': Grid.from_rows(cells), 'player_y': 0, 'player_x': 0}
+        bfs_keys = solve(map_data, 'bfs')
+        astar_keys = solve(map_data, 'astar')
+        if bfs_keys is None:
+            assert astar_keys is None
+            continue
+        assert len(astar_keys) == len(bfs_keys)
+        assert replay(map_data, bfs_keys) == WIN
+        assert replay(map_data, astar_keys) == WIN
+
+
+def test_solutions_with_conveyors_replay_to_a_win():
+    rng = random.Random(88)
+    for _ in range(200):
+        height, width = rng.randint(2, 8), rng.randint(2, 8)
+        cells = [[rng.choice('   #@X><^v') for _ in range(width)] for _ in range(height)]
+        cells[0][0] = 'S'
+        cells[-1][-1] = 'E'
+        map_data = {'map': Grid.from_rows(cells), 'player_y': 0, 'player_x': 0}
+        keys = solve(map_data)
+        if keys is not None:
+            assert replay(map_data, keys) == WIN
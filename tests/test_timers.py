@@ -0,0 +1,36 @@
+from engine.timers import TimerHeap
+
+
+def test_timers_fire_in_tick_order():
+    timers = TimerHeap()
+    for tick, name in [(5, 'c'), (1, 'a'), (3, 'b'), (9, 'd')]:
+        timers.schedule(tick, name)
+    assert timers.next_due() == 1
+    assert timers.pop_due(0) == []
+    assert timers.pop_due(4) == ['a', 'b']
+    assert timers.pop_due(9) == ['c', 'd']
+    assert timers.next_due() is None
+    assert len(timers) == 0
+
+
+def test_timers_on_the_same_tick_keep_insertion_order():
+    timers = TimerHeap()
+    for name in 'zyxw':
+        timers.schedule(2, name)
+    assert timers.pop_due(2) == list('zyxw')
+
+
+def test_cancelled_timers_never_fire():
+    timers = TimerHeap()
+    first = timers.schedule(1, 'a')
+    second = timers.schedule(2, 'b')
+    timers.schedule(3, 'c')
+    assert timers.cancel(first)
+    assert not timers.cancel(first)
+    assert len(timers) == 2
+    assert timers.next_due() == 2
+    assert timers.pop_due(2) == ['b']
+    # 已经到期的定时器不能再取消
+    assert not timers.cancel(second)
+    assert timers.pop_due(10) == ['c']
+    assert timers.heap == []
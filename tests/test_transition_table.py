@@ -0,0 +1,95 @@
+import json
+import random
+
+import pytest
+
+from engine import Engine, TransitionTable
+from engine.engine import BLOCK, BLOCKED, CONVEYOR, FLOOR, GOAL, HAZARD, MOVE, TIMED, TIMED_RESET
+from gui.grid import Grid
+from gui.map import parse_map
+from gui.map_cache import MapCache
+
+
+def table_of(*lines: str) -> TransitionTable:
+    return TransitionTable(Grid.from_rows([list(line) for line in lines]))
+
+
+def kinds_row(table: TransitionTable, y: int) -> list:
+    return [table.kinds[table.index(y, x)] for x in range(table.width)]
+
+
+def test_kinds_have_a_blocked_border():
+    table = table_of('S ', ' E')
+    assert table.stride == 4
+    assert len(table.kinds) == 4 * 4
+    border = [cell for cell in range(len(table.kinds)) if not 1 <= cell % 4 <= 2 or not 1 <= cell // 4 <= 2]
+    assert all(table.kinds[cell] == BLOCK for cell in border)
+
+
+def test_tiles_compile_to_kinds():
+    table = table_of('S#@X!E  >  ')
+    assert kinds_row(table, 0)[:8] == [FLOOR, BLOCK, HAZARD, HAZARD, TIMED, GOAL, FLOOR, FLOOR]
+    assert kinds_row(table, 0)[8] == CONVEYOR
+
+
+def test_index_and_position_round_trip():
+    table = table_of('S  ', '   ', '  E')
+    for y in range(3):
+        for x in range(3):
+            assert table.position(table.index(y, x)) == (y, x)
+
+
+# 距离所指的地图边缘不超过两格的传送带
+@pytest.mark.parametrize('lines, blocked', [
+    (('S   >>',), [(0, 4), (0, 5)]),
+    (('<<S   ',), [(0, 0), (0, 1)]),
+    (('^S', '^ ', '  ', '  '), [(0, 0), (1, 0)]),
+    (('S ', '  ', 'v ', 'v '), [(2, 0), (3, 0)])
+])
+def test_conveyors_pushing_off_the_map_compile_to_block(lines, blocked):
+    table = table_of(*lines)
+    for y, x in blocked:
+        assert table.kinds[table.index(y, x)] == BLOCK
+
+
+def test_conveyors_three_cells_from_the_edge_stay_conveyors():
+    table = table_of('S  >  ')
+    assert table.kinds[table.index(0, 3)] == CONVEYOR
+
+
+def test_step_pushes_along_the_conveyor():
+    table = table_of('S>   ')
+    assert table.step(table.index(0, 0), 3) == (table.index(0, 3), MOVE)
+
+
+def test_step_reports_timed_hazards_and_blocks():
+    table = table_of('S!', '# ')
+    start = table.index(0, 0)
+    assert table.step(start, 3) == (table.index(0, 1), TIMED_RESET)
+    assert table.step(start, 1) == (start, BLOCKED)
+    assert table.step(start, 0) == (start, BLOCKED)
+
+
+def test_table_engine_matches_tile_engine_on_random_maps():
+    rng = random.Random(25)
+    for _ in range(100):
+        height, width = rng.randint(1, 8), rng.randint(2, 8)
+        cells = [[rng.choice(' #@X!E><^v') for _ in range(width)] for _ in range(height)]
+        cells[0][0] = 'S'
+        map_data = {'map': Grid.from_rows(cells), 'player_y': 0, 'player_x': 0}
+        compiled = Engine(map_data)
+        tiles = Engine(map_data)
+        tiles.table = None
+        for action in rng.choices('wasd', k=50):
+            assert compiled.step(action) == tiles.step(action)
+
+
+def test_parsed_maps_share_one_table(tmp_path):
+    path = tmp_path / 'level.json'
+    path.write_text(json.dumps([['S', '>', ' ', ' '], ['#', ' ', ' ', 'E']]), encoding='utf-8')
+    cache = MapCache(parse_map)
+    first = cache.get(str(path))
+    second = cache.get(str(path))
+    assert first['map'] is not second['map']
+    assert first['transitions'] is second['transitions']
+    assert Engine(first).table is first['transitions']
@@ -0,0 +1,114 @@
+import pytest
+
+from engine import BLOCKED, MOVE, RESET, WIN, Engine, GameState
+from gui.grid import Grid, build_tile_index
+from gui.map import parse_map
+from gui.world import ChunkSource, WorldGrid, import_map, main
+
+# 驻留预算只有一个区块，被修改过的区块不计入
+TIGHT: dict = {'memory_budget_mb': 0, 'prefetch_radius': 0, 'lookahead': 0}
+
+
+def imported(tmp_path, *lines: str) -> dict:
+    """
+    返回：
+        dict: 把地图切分为 4x4 的区块保存为世界后重新读取的地图数据。
+    """
+    grid = Grid.from_rows(list(lines))
+    (start,) = build_tile_index(grid)['S']
+    path = str(tmp_path / 'level.world')
+    import_map(grid, start, path, chunk_size=4)
+    return parse_map(path)
+
+
+def walls(tmp_path, size: int = 16) -> WorldGrid:
+    return WorldGrid(size, size, ChunkSource(str(tmp_path / 'empty.chunks'), 4, None), TIGHT)
+
+
+def test_walls_block_across_chunk_borders(tmp_path):
+    engine = Engine(imported(tmp_path, 'S   #   '))
+    for _ in range(3):
+        engine.step('d')
+    assert engine.step('d') == (GameState(0, 3), BLOCKED)
+
+
+def test_conveyors_push_across_chunk_borders(tmp_path):
+    engine = Engine(imported(tmp_path, 'S  >    '))
+    engine.step('d')
+    engine.step('d')
+    assert engine.step('d') == (GameState(0, 5), MOVE)
+
+    engine = Engine(imported(tmp_path, 'S', ' ', ' ', 'v', ' ', ' ', 'E'))
+    engine.step('s')
+    engine.step('s')
+    assert engine.step('s') == (GameState(5, 0), MOVE)
+    assert engine.step('s') == (GameState(6, 0), WIN)
+
+
+def test_hazards_reset_across_chunk_borders(tmp_path):
+    engine = Engine(imported(tmp_path, 'S   @   '))
+    for _ in range(3):
+        engine.step('d')
+    assert engine.step('d') == (GameState(0, 0), RESET)
+
+
+def test_eviction_respects_the_budget(tmp_path):
+    world = walls(tmp_path)
+    assert world.budget == 1
+    for x in range(0, 16, 4):
+        world.get(0, x)
+        assert len(world.resident) <= world.budget
+    assert list(world.resident) == [(0, 3)]
+
+
+def test_modified_chunks_are_never_evicted(tmp_path):
+    world = walls(tmp_path)
+    world.set(1, 1, ' ')
+    for y in range(0, 16, 4):
+        for x in range(0, 16, 4):
+            world.get(y, x)
+            assert len(world.resident) - len(world.modified) <= world.budget
+    assert (0, 0) in world.resident
+    assert world.get(1, 1) == ' '
+
+
+def test_copy_shares_no_resident_chunks(tmp_path):
+    world = walls(tmp_path)
+    world.set(1, 1, ' ')
+    world.get(5, 5)
+    copy = world.copy()
+    assert set(copy.resident) == {(0, 0)}
+    assert copy.resident[(0, 0)] is not world.resident[(0, 0)]
+
+    copy.set(1, 2, 'E')
+    world.set(1, 3, 'E')
+    assert world.get(1, 2) == '#' and copy.get(1, 3) == '#'
+    assert copy.get(1, 1) == ' '
+
+
+def test_missing_chunks_are_walls_without_a_seed(tmp_path):
+    world = walls(tmp_path)
+    assert all(world.get(y, x) == '#' for y in range(16) for x in range(16))
+
+    # 全是墙的区块不写出，读取时仍然是墙
+    map_data = imported(tmp_path, 'S ', '  ', '  ', '  ', '##', '##', '##', '##')
+    assert not (tmp_path / 'level.chunks' / '1_0.chunk').exists()
+    assert map_data['map'].get(4, 0) == '#'
+    engine = Engine(map_data)
+    engine.step('s')
+    engine.step('s')
+    engine.step('s')
+    assert engine.step('s') == (GameState(3, 0), BLOCKED)
+
+
+@pytest.mark.parametrize('argv', [
+    ['new', 'out.world', '--seed', 'abc'],
+    ['new', 'out.world', '--chunk', 'x'],
+    ['new', 'out.world', '--chunk', '5'],
+    ['import', 'map.json', 'out.world', '--chunk'],
+])
+def test_main_rejects_bad_options(tmp_path, monkeypatch, capsys, argv):
+    monkeypatch.chdir(tmp_path)
+    assert main(argv) == 2
+    assert capsys.readouterr().out.startswith('用法')
+    assert not (tmp_path / 'out.world').exists()